@@ -1,10 +1,133 @@
-from translation.energyModel import EnergyModelClass
+import argparse
+import json
+import sys
 
-if __name__ == "__main__":
-    model = EnergyModelClass()
+# The heavy modules (pandas, the workbook readers, the solvers) are imported by the commands that need them,
+# so that inspecting an instance or merging solutions starts without loading them
+
+def load_model(args):
+    from translation.energyModel import EnergyModelClass
+    return EnergyModelClass(config_file=args.config, overrides=args.overrides)
+
+def generate(args):
+    model = load_model(args)
     model.generate_xml()
 
-    
+    issues = model.check_feasibility()
+    if issues:
+        for issue in issues:
+            print(f"Infeasible constraint {issue['constraint']}: {issue['reason']}", file=sys.stderr)
+        print(model.diagnose_infeasibility(), file=sys.stderr)
+        # Distinct from the exit status 1 of a crash: the same inputs will always be infeasible
+        return 2
+    return 0
+
+def stats(args):
+    import logging
+    from translation.solvers.algorithmSelector import AlgorithmSelectorClass
+    selector = AlgorithmSelectorClass(logger=logging.getLogger(__name__))
+    for instance in args.instances:
+        print(json.dumps({"instance": instance, **selector.inspect(instance)}))
+    return 0
+
+def solve(args):
+    import logging
+    from translation.parsers.configParser import ConfigParserClass
+    from translation.solvers.frodoSolver import create_solver
+
+    config_parser = ConfigParserClass(file_path=args.config, overrides=args.overrides)
+    solver = create_solver(logging.getLogger(__name__), config_parser.get_solver(), config_parser.get_cache())
+    try:
+        solution = solver.solve(args.problem, args.output)
+    finally:
+        if solver.pool is not None:
+            solver.pool.close()
+    print(f"{args.problem}: valuation {solution.valuation}, {len(solution.assignments)} variables assigned")
+    return 0 if solution.is_feasible() else 2
+
+def merge(args):
+    from solutions import merge as merge_module
+    output_file = args.output or merge_module.output_file
+    total_valuation = merge_module.merge_solutions(args.outputs or merge_module.input_folder, output_file)
+    print(f"Combined XML saved to: {output_file} (valuation {total_valuation})")
+    return 0
+
+def sweep(args):
+    import yaml
+    with open(args.scenarios) as file:
+        scenarios = yaml.safe_load(file)
+    output_files = load_model(args).sweep(scenarios, args.output_dir, max_workers=args.max_workers)
+    print("\n".join(output_files))
+    return 0
+
+def refine(args):
+    solution = load_model(args).refine(args.output_dir)
+    if solution is None:
+        return 2
+    print(f"valuation {solution.valuation}, {len(solution.assignments)} variables assigned")
+    return 0
+
+def pathway(args):
+    solutions = load_model(args).pathway(args.output_dir)
+    for year, solution in solutions.items():
+        print(f"{year}: valuation {solution.valuation}")
+    return 0 if solutions else 2
+
+def decompose(args):
+    solution = load_model(args).decompose(args.output_dir)
+    if solution is None:
+        return 2
+    print(f"valuation {solution.valuation}, {len(solution.assignments)} variables assigned")
+    return 0
+
+def parse_arguments(argv):
+    from translation.parsers.configParser import parse_override
+
+    parser = argparse.ArgumentParser(description="Generates, inspects and solves DCOP instances of the energy model.")
+    parser.add_argument("--config", default="config.yaml", help="configuration file (default: config.yaml)")
+    parser.add_argument("--set", dest="overrides", action="append", default=[], metavar="KEY=VALUE",
+                        help="overrides a configuration entry below config, e.g. outline.year=2030, the value being read as YAML")
+    commands = parser.add_subparsers(dest="command")
 
-    
-    
+    commands.add_parser("generate", help="generates the instance of the configuration and screens it for infeasibility (default)")
+
+    stats_parser = commands.add_parser("stats", help="prints the structural statistics of generated instances as JSON lines")
+    stats_parser.add_argument("instances", nargs="+")
+
+    solve_parser = commands.add_parser("solve", help="solves an instance with the solver of the configuration")
+    solve_parser.add_argument("problem")
+    solve_parser.add_argument("output")
+
+    merge_parser = commands.add_parser("merge", help="combines the solutions of the countries into a single one")
+    merge_parser.add_argument("--outputs", help="folder of the solution_<country>.xml files (default: the one of solutions/merge.py)")
+    merge_parser.add_argument("--output", help="combined solution file")
+
+    sweep_parser = commands.add_parser("sweep", help="writes one instance per scenario of a YAML list, see EnergyModelClass.sweep")
+    sweep_parser.add_argument("scenarios")
+    sweep_parser.add_argument("output_dir")
+    sweep_parser.add_argument("--max-workers", type=int, default=None)
+
+    refine_parser = commands.add_parser("refine", help="solves the instance from a coarse to a fine domain grid, see outline.refinement")
+    refine_parser.add_argument("output_dir")
+
+    pathway_parser = commands.add_parser("pathway", help="solves the years of outline.pathway in sequence, carrying the capacity over")
+    pathway_parser.add_argument("output_dir")
+
+    decompose_parser = commands.add_parser("decompose", help="solves the instance as a capacity problem and parallel dispatch subproblems")
+    decompose_parser.add_argument("output_dir")
+
+    args = parser.parse_args(argv)
+    try:
+        args.overrides = dict(parse_override(assignment) for assignment in args.overrides)
+    except ValueError as error:
+        parser.error(str(error))
+    return args
+
+COMMANDS = {"generate": generate, "stats": stats, "solve": solve, "merge": merge, "sweep": sweep, "refine": refine, "pathway": pathway, "decompose": decompose}
+
+def main(argv=None):
+    args = parse_arguments(sys.argv[1:] if argv is None else argv)
+    return COMMANDS[args.command or "generate"](args)
+
+if __name__ == "__main__":
+    sys.exit(main())
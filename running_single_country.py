@@ -1,7 +1,13 @@
 import yaml
-import subprocess
-import time
+import asyncio
 import os
+import logging
+from translation.parsers.configParser import ConfigParserClass
+from translation.parsers.solutionParser import record_instance
+from translation.solvers.frodoSolver import create_solver
+from translation.solvers.solverOrchestrator import SolverOrchestratorClass
+from translation.solvers.resourceMonitor import available_memory, heap_bytes
+from translation.jobManifest import JobManifestClass, PermanentJobError, job_id
 
 countries = ['ZA',] #['AO', 'BW', 'CD', 'LS', 'MW', 'MZ', 'NM', 'SZ', 'TZ', 'ZA', 'ZM', 'ZW']
 year = 2030
@@ -14,54 +20,120 @@ outputs_dir = os.path.join(folder_dir, 'outputs')
 os.makedirs(problems_dir, exist_ok=True)
 os.makedirs(outputs_dir, exist_ok=True)
 
-for country in countries:
+logger = logging.getLogger(__name__)
+config_parser = ConfigParserClass(file_path=config_file_path)
+solver = create_solver(logger, config_parser.get_solver(), config_parser.get_cache())
+
+# Every step of every country is recorded, so that rerunning the script resumes an interrupted sweep
+manifest = JobManifestClass(logger, os.path.join(folder_dir, 'manifest.jsonl'), **(config_parser.get_manifest() or {}))
+
+def report_progress(job, line, elapsed):
+    print(f"[{job['name']} {elapsed:7.1f} s] {line}")
+
+# With a heap predictor, as many JVMs run at once as their predicted heaps fit in the memory of the node
+orchestration_settings = config_parser.get_orchestration() or {}
+if solver.predictor is not None and 'memory_budget' not in orchestration_settings:
+    orchestration_settings['memory_budget'] = available_memory()
+# Every country submits its job on its own once generated, the stragglers are judged against all of them
+orchestration_settings.setdefault('expected_jobs', len(countries))
+orchestrator = SolverOrchestratorClass(logger=logger, on_progress=report_progress, **orchestration_settings)
+
+async def process_country(country, generation_lock):
     #Step 1: Modify the YAML configuration file
     with open(config_file_path, 'r') as file:
         config = yaml.safe_load(file)
 
-    print(f"Running for {country}...")
     config['config']['name'] = f'{country}_limited'
     config['config']['outline']['countries'] = [country]
     config['config']['output_file_path'] = f'{folder_dir}/problems/{country}_limited_output.xml'
     config['config']['outline']['year'] = year
 
-    with open(config_file_path, 'w') as file:
-        yaml.safe_dump(config, file)
-        print(f"Config file updated for {country}.")
-
-    # Step 2: Run main.py and wait for it to finish
-    main_script_path = 'main.py'
-    process = subprocess.Popen(['python', main_script_path], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-    print("Running main.py...")
-    stdout, stderr = process.communicate()
-
-    if process.returncode == 0:
-        print("main.py finished successfully.")
-    else:
-        print(f"main.py encountered an error:\n{stderr.decode()}")
-
-    # Step 3: Run the Java Virtual Machine
-    java_command = [
-        'java', 
-        '-Xmx8G', 
-        '-cp', 
-        'frodo2.18.1.jar:junit-4.13.2.jar:hamcrest-core-1.3.jar', 
-        'frodo2.algorithms.AgentFactory', 
-        '-timeout', 
-        '60000', 
-        f'{folder_dir}/problems/{country}_limited_output.xml', 
-        'agents/DPOP/DPOPagentJaCoP.xml', 
-        '-o', 
-        f'{folder_dir}/outputs/solution_{country}.xml'
-    ]
-    print(f"Starting Java Virtual Machine for {country}...")
-    java_process = subprocess.Popen(java_command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-
-    stdout, stderr = java_process.communicate()
-
-    if java_process.returncode == 0:
-        print(f"Java program finished successfully for {country}.")
-    else:
-        print(f"Java program encountered an error for {country}:\n{stderr.decode()}")
-
-    
\ No newline at end of file
+    job = job_id([country], year, config)
+    problem_file = f'{folder_dir}/problems/{country}_limited_output.xml'
+    output_file = f'{folder_dir}/outputs/solution_{country}.xml'
+
+    # Step 2: Run main.py, one country at a time as they share the configuration file
+    async def generate():
+        async with generation_lock:
+            print(f"Running for {country}...")
+            with open(config_file_path, 'w') as file:
+                yaml.safe_dump(config, file)
+                print(f"Config file updated for {country}.")
+
+            process = await asyncio.create_subprocess_exec('python', 'main.py', stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+            print("Running main.py...")
+            stdout, stderr = await process.communicate()
+
+        if process.returncode == 2:
+            # The pre-solve check proved the instance infeasible: do not launch the JVM, now or on resume
+            raise PermanentJobError(f"main.py found {country} infeasible:\n{stderr.decode()}")
+        if process.returncode != 0:
+            raise RuntimeError(f"main.py encountered an error:\n{stderr.decode()}")
+        print(f"main.py finished successfully for {country}.")
+
+    if await manifest.run_step(job, 'generate', generate, artifacts=[problem_file], countries=[country], year=year) is None:
+        print(f"Skipping the solver for {country}.")
+        return None
+
+    # Step 3: Run the Java Virtual Machine, unless the same problem was already solved with the same solver settings
+    async def solve():
+        if solver.pool is not None:
+            # The warm workers of the pool replace the one-shot JVMs of the orchestrator, the solver handling the cache
+            print(f"Solving {country} on a warm solver worker...")
+            solution = await asyncio.to_thread(solver.solve, problem_file, output_file)
+            print(f"Solver worker finished for {country}.")
+            return {'valuation': solution.valuation, 'worker': True}
+
+        # Parsing the instance and predicting the heap must not hold up the output of the other jobs
+        settings = await asyncio.to_thread(solver.settings_for, problem_file)
+        choice = {'agent_file': settings['agent_file'], 'max_heap': settings['max_heap'], 'selection': settings.get('reason')}
+        key, cached = await asyncio.to_thread(solver.cached_solution, problem_file, output_file, settings)
+        if cached:
+            await asyncio.to_thread(record_instance, output_file, problem_file)
+            print(f"Solution for {country} served from the cache.")
+            return {'cached': True, **choice}
+
+        print(f"Starting Java Virtual Machine for {country} with {settings['agent_file']} and {settings['max_heap']} heap...")
+        result = await orchestrator.submit({
+            'name': country,
+            'command': solver.build_command(problem_file, output_file, settings),
+            'memory': heap_bytes(settings['max_heap']),
+        })
+        solver.record_resources(settings, result['peak_rss'], result['cpu_time'], result['elapsed'], result['status'])
+        if result['status'] != 'ok':
+            raise RuntimeError(f"Java program {result['status']} for {country}:\n" + "\n".join(result['output']))
+        await asyncio.to_thread(record_instance, output_file, problem_file)
+        solver.store_solution(key, output_file)
+        print(f"Java program finished successfully for {country} in {result['elapsed']:.1f} s.")
+        return {'valuation': result['valuation'], 'solver_time': result['solver_time'], 'peak_rss': result['peak_rss'],
+                'cpu_time': result['cpu_time'], **choice}
+
+    return await manifest.run_step(job, 'solve', solve, artifacts=[output_file], countries=[country], year=year)
+
+async def main():
+    generation_lock = asyncio.Lock()
+    try:
+        solved = await asyncio.gather(*[process_country(country, generation_lock) for country in countries])
+    finally:
+        if solver.pool is not None:
+            solver.pool.close()
+
+    # Step 4: Merge the solutions once every country is solved
+    if all(solved):
+        async def merge():
+            process = await asyncio.create_subprocess_exec('python', 'main.py', 'merge', '--outputs', outputs_dir, '--output',
+                                                           os.path.join(folder_dir, 'combined_solution.xml'), stderr=asyncio.subprocess.PIPE)
+            _, stderr = await process.communicate()
+            if process.returncode != 0:
+                raise RuntimeError(f"main.py merge encountered an error:\n{stderr.decode()}")
+
+        merge_job = job_id(countries, year, [state['job'] for state in solved])
+        await manifest.run_step(merge_job, 'merge', merge, artifacts=[os.path.join(folder_dir, 'combined_solution.xml')], countries=countries, year=year)
+
+    for country, state in zip(countries, solved):
+        if state is None:
+            print(f"{country}: not solved")
+        else:
+            print(f"{country}: solved in {state['duration']:.1f} s (attempt {state['attempt']}), {state['artifacts'][0]}")
+
+asyncio.run(main())
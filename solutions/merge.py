@@ -1,27 +1,35 @@
 import os
 import xml.etree.ElementTree as ET
+from translation.parsers.solutionParser import SolutionParserClass, format_valuation, solution_symbol_table
 
 input_folder = "solutions/SAPP-single-country-limited-technology-2030/outputs"
 output_file = "solutions/SAPP-single-country-limited-technology-2030/combined_solution.xml"
 
-combined_root = ET.Element("solution")
+def merge_solutions(input_folder, output_file):
+    """Combines the solution_<country>.xml files of a folder into a single solution, summing their valuations,
+    and returns the total valuation."""
+    combined_root = ET.Element("solution")
 
-total_valuation = 0
-for filename in os.listdir(input_folder):
-    if filename.endswith(".xml"):
-        file_path = os.path.join(input_folder, filename)
-        tree = ET.parse(file_path)
-        root = tree.getroot()
+    total_valuation = 0
+    for filename in sorted(os.listdir(input_folder)):
+        if filename.endswith(".xml"):
+            file_path = os.path.join(input_folder, filename)
+            root = ET.parse(file_path).getroot()
 
-        valuation = int(root.attrib.get("valuation", 0))
-        total_valuation += valuation
+            # Instances generated in compact mode name their variables by short ids, decoded with the symbol
+            # table of the instance the solver recorded in the solution
+            solution = SolutionParserClass(root, solution_symbol_table(file_path, root))
+            total_valuation += solution.valuation or 0
 
-        for assignment in root.findall("assignment"):
-            combined_root.append(assignment)
+            for variable_name, value in solution.assignments.items():
+                ET.SubElement(combined_root, "assignment", {"variable": variable_name, "value": str(value)})
 
-combined_root.set("valuation", str(total_valuation))  # or use "combined"
+    combined_root.set("valuation", format_valuation(total_valuation))  # or use "combined"
 
-tree = ET.ElementTree(combined_root)
-tree.write(output_file, encoding="utf-8", xml_declaration=True)
+    tree = ET.ElementTree(combined_root)
+    tree.write(output_file, encoding="utf-8", xml_declaration=True)
+    return total_valuation
 
-print(f"Combined XML saved to: {output_file}")
+if __name__ == "__main__":
+    merge_solutions(input_folder, output_file)
+    print(f"Combined XML saved to: {output_file}")
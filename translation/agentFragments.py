@@ -0,0 +1,93 @@
+import logging
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+from translation.xmlGenerator import XMLGeneratorClass
+
+def add_agent_model(xml_generator, data, agents):
+    """Adds the variables and constraints of some agents, from the data returned by EnergyModelClass.prepare_model_data."""
+    data = agent_data(data, agents)
+
+    xml_generator.add_variable_from_name(
+        variables=data["timeslice_technologies_modes"],
+        technologies=data["selected_technologies"],
+        agents=agents,
+        variable_domains=data["variable_domains"]
+    )
+    exports_df = data["interconnectors_df"][data["interconnectors_df"]['FROM'].isin(agents)]
+    xml_generator.add_transmission_variables(
+        timeslices=data["year_split_df"]['TIMESLICE'].unique(),
+        interconnectors_df=exports_df,
+        variable_domains=data["variable_domains"]
+    )
+
+    # Maximum rate of activity constraint based on the installed capacity
+    if not data["factors_df"].empty:
+        xml_generator.add_maximum_rate_of_activity_per_all_technology_constraint(modes=data["modes"], factors_df=data["factors_df"])
+        xml_generator.add_maximum_annual_activity_rate_per_timeslice_constraint(modes=data["modes"], factors_df=data["factors_df"])
+        #xml_generator.add_minimum_annual_activity_rate_per_timeslice_constraint(modes=data["modes"], factors_df=data["factors_df"], non_dispatchable_technologies=['HYDMS01X', 'HYDMS02X', 'HYDMS03X', 'SOC1P00X', 'SOC2P00X'])
+
+    #TODO: substitute with add_minimum_rate_of_activity_constraint
+    # Easy version - Energy balance A & B (only electricity without input and output activity ratio)
+    xml_generator.add_minimum_respecting_demand(
+        timeslice_technologies_modes=data["timeslice_technologies_modes"],
+        specified_demand_profile_df=data["specified_demand_profile_df"],
+        specified_annual_demand_df=data["specified_annual_demand_df"],
+        year_split_df=data["year_split_df"],
+        interconnectors_df=data["interconnectors_df"]
+    )
+
+    # Emission caps, accounted per timeslice through auxiliary variables
+    for index, row in data["emission_limits_df"].iterrows():
+        xml_generator.add_emission_accounting_constraint(
+            agent_name=row['COUNTRY'],
+            emission_name=row['EMISSION'],
+            timeslice_technologies_modes=data["timeslice_technologies_modes"],
+            emission_factors_df=data["emission_factors_df"],
+            year_split_df=data["year_split_df"],
+            domain_name=row['DOMAIN']
+        )
+
+    #Soft constraint: Operating cost minimization
+    for index, row in data["technology_parameters_df"].iterrows():
+        capacity_variable = f"{row['TECHNOLOGY']}_capacity"
+        xml_generator.add_installing_cost_minimization_constraint(
+            weight=1,
+            variable_capacity_name=capacity_variable,
+            previous_installed_capacity=int(row["MIN_INSTALLED_CAPACITY"]),
+            cost_per_MW=round(row['AMORTIZED_CAPITAL_COST'] + row['FIXED_COST']),
+            extra_name = 'amortized'
+        )
+
+def agent_data(data, agents):
+    """Keeps the rows of some agents, a technology belonging to the agent of its two-letter prefix like its variables
+    and an interconnector to both its ends."""
+    agents = set(agents)
+    return {
+        **data,
+        "selected_technologies": [technology for technology in data["selected_technologies"] if technology[:2] in agents],
+        "timeslice_technologies_modes": [variable for variable in data["timeslice_technologies_modes"] if variable.split('_')[1][:2] in agents],
+        "factors_df": data["factors_df"][data["factors_df"]['TECHNOLOGY'].str[:2].isin(agents)],
+        "specified_annual_demand_df": data["specified_annual_demand_df"][data["specified_annual_demand_df"]['COUNTRY'].isin(agents)],
+        "specified_demand_profile_df": data["specified_demand_profile_df"][data["specified_demand_profile_df"]['COUNTRY'].isin(agents)],
+        "technology_parameters_df": data["technology_parameters_df"][data["technology_parameters_df"]['COUNTRY'].isin(agents)],
+        "interconnectors_df": data["interconnectors_df"][data["interconnectors_df"]['FROM'].isin(agents) | data["interconnectors_df"]['TO'].isin(agents)],
+        "emission_factors_df": data["emission_factors_df"][data["emission_factors_df"]['COUNTRY'].isin(agents)],
+        "emission_limits_df": data["emission_limits_df"][data["emission_limits_df"]['COUNTRY'].isin(agents)],
+    }
+
+_worker_data = None
+
+def _init_worker(data):
+    global _worker_data
+    _worker_data = data
+
+def _build_fragment(agent):
+    xml_generator = XMLGeneratorClass(logger=logging.getLogger(__name__))
+    add_agent_model(xml_generator, _worker_data, [agent])
+    return ET.tostring(xml_generator.instance)
+
+def generate_fragments(data, agents, max_workers=None):
+    """Builds the fragment of every agent in parallel, each worker process receiving the data only once,
+    and returns the fragment instances in the order of the agents."""
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=(data,)) as executor:
+        return [ET.fromstring(fragment) for fragment in executor.map(_build_fragment, agents)]
@@ -0,0 +1,285 @@
+import copy
+import os
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from translation.feasibilityChecker import FeasibilityCheckerClass
+from translation.infeasibilityDiagnosis import InfeasibilityDiagnosisClass
+from translation.parsers.solutionParser import SolutionParserClass
+from translation.xmlGenerator import SECTION_ORDER, boolean_gt, boolean_or
+
+class DecompositionClass:
+    """Solves an instance as a capacity master problem and dispatch subproblems given its capacities.
+
+    The master problem has the capacity variables, the constraints over them only and the cuts found so
+    far. Once the capacities are fixed, the other variables fall apart into the connected components of
+    the remaining constraints, e.g. one per timeslice and group of interconnected countries, which are
+    solved in parallel with singleton capacity domains. A subproblem that is infeasible yields a
+    combinatorial cut: at least one capacity of its conflicting constraints, or of the whole subproblem
+    if the pre-solve check finds no conflict, must exceed its current value. More capacity never makes a
+    dispatch infeasible, so the cuts only remove infeasible capacities and the first master solution whose
+    subproblems are all feasible is returned, with the assignments and valuations of every problem.
+
+    The cuts are strengthened with the interval relaxation of the feasibility checker: the master starts
+    from the capacity lower bounds the propagation derives from the demand balances, and every cut value
+    is raised as long as the relaxation still proves the subproblem infeasible for all capacities up to
+    it. By default max_iterations is the number of values of the capacity domains.
+    """
+    def __init__(self, logger, solver, max_iterations=None, max_workers=None):
+        self.logger = logger
+        self.solver = solver
+        self.max_iterations = max_iterations
+        self.max_workers = max_workers
+
+    def run(self, problem_file, output_dir):
+        """Solves an instance with full names and returns the combined solution, or None if the master problem
+        becomes infeasible or does not converge within max_iterations."""
+        os.makedirs(output_dir, exist_ok=True)
+        instance = ET.parse(problem_file).getroot()
+        name = instance.find("presentation").attrib["name"]
+        components = subproblem_components(instance)
+        self.logger.info(f"{name} decomposed into a master problem and {len(components)} subproblems")
+
+        checker = FeasibilityCheckerClass(self.logger, instance)
+        cuts = lower_bound_cuts(checker)
+        if cuts is None:
+            self.logger.warning(f"{name} is infeasible whatever the capacities")
+            return None
+        max_iterations = self.max_iterations or capacity_values(checker)
+
+        for iteration in range(max_iterations):
+            master_file = os.path.join(output_dir, f"{name}_master{iteration}.xml")
+            write_instance(master_instance(instance, cuts, f"{name}_master"), master_file)
+            master_solution = self.solver.solve(master_file, os.path.join(output_dir, f"solution_{name}_master{iteration}.xml"))
+            if not master_solution.is_feasible():
+                self.logger.warning(f"Master problem of {name} infeasible after {len(cuts)} cuts")
+                return None
+            capacities = fixed_capacities(instance, master_solution.assignments)
+
+            def solve_subproblem(index):
+                return self.solve_subproblem(instance, components[index], capacities, output_dir, f"{name}_{iteration}_sub{index}")
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                results = list(executor.map(solve_subproblem, range(len(components))))
+
+            new_cuts = [cut for solution, cut in results if solution is None]
+            if any(not cut for cut in new_cuts):
+                self.logger.warning(f"A subproblem of {name} is infeasible whatever the capacities")
+                return None
+            if not new_cuts:
+                self.logger.info(f"{name} converged after {iteration + 1} master problems")
+                return combine_solutions(master_solution, [solution for solution, cut in results], os.path.join(output_dir, f"solution_{name}.xml"))
+
+            self.logger.info(f"Iteration {iteration} of {name}: {len(new_cuts)} infeasible subproblems")
+            cuts += new_cuts
+
+        self.logger.warning(f"{name} did not converge within {max_iterations} master problems")
+        return None
+
+    def solve_subproblem(self, instance, variables, capacities, output_dir, name):
+        """Returns the solution of a subproblem and no cut, or None and the {capacity variable: value} cut."""
+        subproblem = subproblem_instance(instance, variables, capacities, name)
+        conflicting_set = InfeasibilityDiagnosisClass(self.logger, subproblem).find_conflicting_set()
+        if conflicting_set:
+            # The pre-solve check proves the subproblem infeasible, no need to launch the solver
+            constraints = {constraint.attrib["name"]: constraint for constraint in subproblem.find("constraints")}
+            scope = {variable for constraint_name in conflicting_set for variable in constraints[constraint_name].attrib["scope"].split()}
+        else:
+            problem_file = os.path.join(output_dir, f"{name}.xml")
+            write_instance(subproblem, problem_file)
+            solution = self.solver.solve(problem_file, os.path.join(output_dir, f"solution_{name}.xml"))
+            if solution.is_feasible():
+                return solution, None
+            scope = {variable.attrib["name"] for variable in subproblem.find("variables")}
+
+        cut = {variable: capacities[variable] for variable in sorted(scope) if is_capacity(variable)}
+        variables = set(variables)
+        relaxation = FeasibilityCheckerClass(self.logger, restricted_instance(instance, name, lambda scope: any(variable in variables for variable in scope)))
+        return None, lift_cut(relaxation, cut)
+
+def is_capacity(variable_name):
+    return variable_name.endswith("_capacity")
+
+def capacity_values(checker):
+    return sum(len(checker.sorted_domains[variable["domain"]]) for name, variable in checker.instance.variables.items() if is_capacity(name))
+
+def lower_bound_cuts(checker):
+    """Returns the unary cuts raising every capacity to the lower bound propagated over the whole instance,
+    or None if the relaxation is infeasible whatever the capacities."""
+    bounds = checker.initial_bounds()
+    conflict, _ = checker.propagate(list(checker.hard_constraints), bounds)
+    if conflict is not None:
+        return None
+    cuts = []
+    for name, variable in checker.instance.variables.items():
+        below = [value for value in checker.sorted_domains[variable["domain"]] if value < bounds[name][0]]
+        if is_capacity(name) and below:
+            cuts.append({name: below[-1]})
+    return cuts
+
+def lift_cut(checker, cut):
+    """Raises the value of every capacity of a cut, one after the other, as long as the relaxation of the
+    subproblem is infeasible with each capacity of the cut between the lowest value of its domain and its
+    cut value, the other capacities being free. A capacity raised to the highest value of its domain
+    cannot exceed it and is dropped from the cut."""
+    def infeasible(lifted):
+        bounds = checker.initial_bounds()
+        for variable, value in lifted.items():
+            bounds[variable][1] = value
+        return not checker.is_feasible(bounds=bounds)
+
+    lifted = dict(cut)
+    for variable in cut:
+        values = [value for value in checker.sorted_domains[checker.instance.variables[variable]["domain"]] if value > cut[variable]]
+        # The first `low` values are proven infeasible
+        low, high = 0, len(values)
+        while low < high:
+            middle = (low + high) // 2
+            if infeasible({**lifted, variable: values[middle]}):
+                low = middle + 1
+            else:
+                high = middle
+        if low == len(values):
+            del lifted[variable]
+        elif low:
+            lifted[variable] = values[low - 1]
+    return lifted
+
+def subproblem_components(instance):
+    """Returns the sorted variable lists of the connected components of the non-capacity variables, two
+    variables being connected when they share a constraint."""
+    parent = {}
+    def find(variable):
+        parent.setdefault(variable, variable)
+        while parent[variable] != variable:
+            parent[variable] = parent[parent[variable]]
+            variable = parent[variable]
+        return variable
+
+    for variable in instance.find("variables"):
+        if not is_capacity(variable.attrib["name"]):
+            find(variable.attrib["name"])
+    for constraint in instance.find("constraints"):
+        scope = [variable for variable in constraint.attrib["scope"].split() if not is_capacity(variable)]
+        for variable in scope[1:]:
+            parent[find(variable)] = find(scope[0])
+
+    components = {}
+    for variable in parent:
+        components.setdefault(find(variable), []).append(variable)
+    return sorted(sorted(component) for component in components.values())
+
+def fixed_capacities(instance, assignments):
+    """Returns the value of every capacity variable, the smallest of its domain if the solution has none."""
+    domains = {domain.attrib["name"]: domain.text.split() for domain in instance.find("domains")}
+    return {
+        variable.attrib["name"]: assignments.get(variable.attrib["name"], min(int(value) for value in domains[variable.attrib["domain"]]))
+        for variable in instance.find("variables") if is_capacity(variable.attrib["name"])
+    }
+
+def master_instance(instance, cuts, name):
+    """Returns the instance restricted to the capacity variables and their constraints, with the cuts."""
+    master = restricted_instance(instance, name, lambda scope: all(is_capacity(variable) for variable in scope), keep_capacities=True)
+
+    predicates = master.find("predicates")
+    if predicates is None:
+        predicates = ET.SubElement(master, "predicates")
+    constraints = master.find("constraints")
+    for index, cut in enumerate(cuts):
+        arity = len(cut)
+        predicate_name = f"capacityCut_{arity}"
+        if predicates.find(f"predicate[@name='{predicate_name}']") is None:
+            expression = boolean_gt(f"capacity_{arity - 1}", f"value_{arity - 1}")
+            for position in reversed(range(arity - 1)):
+                expression = boolean_or(boolean_gt(f"capacity_{position}", f"value_{position}"), expression)
+            predicate = ET.SubElement(predicates, "predicate", {"name": predicate_name})
+            ET.SubElement(predicate, "parameters").text = " ".join(
+                [f"int capacity_{position}" for position in range(arity)] + [f"int value_{position}" for position in range(arity)]
+            )
+            ET.SubElement(ET.SubElement(predicate, "expression"), "functional").text = expression
+
+        constraint = ET.SubElement(constraints, "constraint", {
+            "name": f"capacityCut_{index}",
+            "arity": str(arity),
+            "scope": " ".join(cut),
+            "reference": predicate_name,
+        })
+        ET.SubElement(constraint, "parameters").text = " ".join(list(cut) + [str(value) for value in cut.values()])
+
+    set_max_arity(master)
+    return master
+
+def subproblem_instance(instance, variables, capacities, name):
+    """Returns the instance restricted to some non-capacity variables and their constraints, the capacity
+    variables of these constraints being fixed by singleton domains."""
+    variables = set(variables)
+    subproblem = restricted_instance(instance, name, lambda scope: any(variable in variables for variable in scope))
+
+    domains = subproblem.find("domains")
+    for variable in subproblem.find("variables"):
+        if is_capacity(variable.attrib["name"]):
+            value = capacities[variable.attrib["name"]]
+            if domains.find(f"domain[@name='fixed_{value}']") is None:
+                ET.SubElement(domains, "domain", {"name": f"fixed_{value}", "nbValues": "1"}).text = str(value)
+            variable.attrib["domain"] = f"fixed_{value}"
+
+    set_max_arity(subproblem)
+    return subproblem
+
+def restricted_instance(instance, name, keep_scope, keep_capacities=False):
+    """Returns a copy of an instance with the constraints whose scope is kept, the variables of these scopes
+    (and every capacity variable with keep_capacities) and the agents owning them."""
+    restricted = copy.deepcopy(instance)
+    restricted.find("presentation").attrib["name"] = name
+
+    constraints = restricted.find("constraints")
+    if constraints is None:
+        constraints = ET.SubElement(restricted, "constraints")
+    for constraint in list(constraints):
+        if not keep_scope(constraint.attrib["scope"].split()):
+            constraints.remove(constraint)
+    in_scope = {variable for constraint in constraints for variable in constraint.attrib["scope"].split()}
+
+    variables = restricted.find("variables")
+    for variable in list(variables):
+        if variable.attrib["name"] not in in_scope and not (keep_capacities and is_capacity(variable.attrib["name"])):
+            variables.remove(variable)
+
+    agents = {variable.attrib["agent"] for variable in variables}
+    agents_element = restricted.find("agents")
+    for agent in list(agents_element):
+        if agent.attrib["name"] not in agents:
+            agents_element.remove(agent)
+
+    references = {constraint.attrib["reference"] for constraint in constraints}
+    for tag in ("predicates", "functions"):
+        section = restricted.find(tag)
+        if section is not None:
+            for definition in list(section):
+                if definition.attrib["name"] not in references:
+                    section.remove(definition)
+    return restricted
+
+def set_max_arity(instance):
+    arities = [int(constraint.attrib["arity"]) for constraint in instance.find("constraints")]
+    instance.find("presentation").attrib["maxConstraintArity"] = str(max(arities, default=0))
+
+def write_instance(instance, output_file):
+    """Writes an instance with its sections in the XCSP order."""
+    instance = copy.deepcopy(instance)
+    sections = sorted(instance, key=lambda section: SECTION_ORDER.index(section.tag) if section.tag in SECTION_ORDER else len(SECTION_ORDER))
+    for section in list(instance):
+        instance.remove(section)
+    instance.extend(sections)
+    tree = ET.ElementTree(instance)
+    ET.indent(tree, space="  ", level=0)
+    tree.write(output_file, encoding="utf-8", xml_declaration=True)
+
+def combine_solutions(master_solution, solutions, output_file):
+    """Writes and returns the solution made of the master and subproblem assignments, valuations summed."""
+    root = ET.Element("solution", {"valuation": str(master_solution.valuation + sum(solution.valuation for solution in solutions))})
+    assignments = dict(master_solution.assignments)
+    for solution in solutions:
+        assignments.update({variable: value for variable, value in solution.assignments.items() if not is_capacity(variable)})
+    for variable, value in sorted(assignments.items()):
+        ET.SubElement(root, "assignment", {"variable": variable, "value": str(value)})
+    ET.ElementTree(root).write(output_file, encoding="utf-8", xml_declaration=True)
+    return SolutionParserClass(root)
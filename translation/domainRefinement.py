@@ -0,0 +1,87 @@
+import os
+
+class DomainRefinementClass:
+    """Solves an energy model on a coarse grid first and then on finer grids around the previous solution.
+
+    Every level divides the domain steps by factor until the target steps are reached, by default the
+    configured steps divided by factor twice, i.e. three solves. From the second level on, every variable
+    is restricted to window steps of the previous level on each side of its previous value, so the
+    domains stay about as small as on the coarse grid.
+    """
+    def __init__(self, logger, model, solver, factor=5, window=2, target_steps=None):
+        if factor < 2:
+            raise ValueError(f"Refinement factor must be at least 2, got {factor}")
+        self.logger = logger
+        self.model = model
+        self.solver = solver
+        self.factor = factor
+        self.window = window
+        self.target_steps = target_steps or {}
+
+    def levels(self):
+        """Returns the steps of every domain at every level, from the coarse grid to the target resolution."""
+        steps = {name: values.step for name, values in self.model.generate_domains().items()}
+        target_steps = {name: self.target_steps.get(name, max(1, step // self.factor ** 2)) for name, step in steps.items()}
+        levels = [steps]
+        while True:
+            steps = {name: max(target_steps[name], step // self.factor) for name, step in levels[-1].items()}
+            if steps == levels[-1]:
+                return levels
+            levels.append(steps)
+
+    def run(self, output_dir):
+        """Solves every level and returns the solution of the finest level that could be solved, or None."""
+        os.makedirs(output_dir, exist_ok=True)
+        solution = None
+        previous_steps = None
+        for level, steps in enumerate(self.levels()):
+            # The shared domains keep the coarse grid, only the windows are cut from the finer one
+            self.model.refined_steps = {}
+            self.model.domain_windows = {}
+            if solution is not None:
+                self.model.refined_steps = steps
+                self.model.domain_windows = solution_windows(solution.assignments, previous_steps, self.window)
+
+            self.model.reset_xml()
+            self.model.build_xml()
+            problem_file = os.path.join(output_dir, f"{self.model.name}_level{level}.xml")
+            self.model.xml_generator.print_xml(output_file=problem_file)
+            self.logger.info(f"Refinement level {level} with steps {steps} written to {problem_file}")
+
+            candidate = self.solver.solve(problem_file, os.path.join(output_dir, f"solution_{self.model.name}_level{level}.xml"))
+            if not candidate.is_feasible():
+                self.logger.warning(f"Refinement level {level} has no feasible solution, keeping level {level - 1}")
+                break
+            solution = candidate
+            previous_steps = steps
+
+        self.model.refined_steps = {}
+        self.model.domain_windows = {}
+        return solution
+
+def variable_domain_name(variable_name):
+    """Returns the shared domain a capacity or rate of activity variable is drawn from."""
+    if variable_name.endswith("_capacity"):
+        return "installable_capacity_domain"
+    return "rate_activity_domain"
+
+def solution_windows(assignments, steps, window):
+    """Returns the (min, max) window of window steps on each side of every assigned value."""
+    windows = {}
+    for variable_name, value in assignments.items():
+        step = steps.get(variable_domain_name(variable_name))
+        if step is None:
+            continue
+        windows[variable_name] = (value - window * step, value + window * step)
+    return windows
+
+def intersect_bounds(bounds, windows):
+    """Returns the intersection of two {variable: (min, max)} mappings, None standing for an open bound."""
+    intersection = dict(bounds)
+    for variable_name, (window_min, window_max) in windows.items():
+        min_value, max_value = intersection.get(variable_name, (None, None))
+        intersection[variable_name] = (
+            window_min if min_value is None else max(min_value, window_min),
+            window_max if max_value is None else min(max_value, window_max)
+        )
+    return intersection
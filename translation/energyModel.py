@@ -1,24 +1,62 @@
 from translation.parsers.configParser import ConfigParserClass
 from translation.parsers.osemosysDataParser import localDataParserClass
-from translation.xmlGenerator import XMLGeneratorClass
+from translation.parsers.dataStore import DataStoreClass
+from translation.xmlGenerator import XMLGeneratorClass, transmission_variable_name
+from translation.timesliceAggregator import TimesliceAggregatorClass
+from translation.scenarioSweep import ModelSkeletonClass, write_scenarios
+from translation.feasibilityChecker import FeasibilityCheckerClass
+from translation.infeasibilityDiagnosis import InfeasibilityDiagnosisClass, format_report
+from translation.domainRefinement import DomainRefinementClass, intersect_bounds
+from translation.pathway import PathwayClass
+from translation.decomposition import DecompositionClass
+from translation.agentFragments import add_agent_model, generate_fragments
+from translation.solvers.frodoSolver import create_solver
 from deprecated import deprecated
+import numpy as np
 import pandas as pd
 import logging
 import os
-from itertools import product
+DEFAULT_DOMAINS = {
+    "rate_activity_domain": {"max": 2000000, "step": 5000}, #TJ/year
+    "installable_capacity_domain": {"max": 40000, "step": 500}, #MW
+}
+# Technology codes, without the country prefix, modelled unless outline.technologies says otherwise
+DEFAULT_POWER_TECHNOLOGIES = ['NGGCP04N', 'NGCCP03N', 'HYDMS03X', 'HYDMS02X', 'HYDMS01X', 'WINDP00X', 'LFRCP01N']#['HYDMS03X', 'HYDMS02X', 'HYDMS01X', 'SOC1P00X', 'BMCHC02N', 'WINDP01X', 'WINDP00X', 'NGGCP04N', 'NGCCP03N', 'LFRCP01N', 'HFGCP02N']
+POWER_TECHNOLOGIES_FILE_PATH = 'data/input_data/power_tech.csv'
+DEFAULT_TRANSMISSION_STEP = 5000 #TJ/year
+# Number of emission domain steps per timeslice, the accounting overestimating the emission by at most a step per timeslice
+DEFAULT_EMISSION_RESOLUTION = 10
+
 class EnergyModelClass:
-    def __init__(self):
-        self.config_parser = ConfigParserClass(file_path='config.yaml')
+    def __init__(self, config_file='config.yaml', overrides=None):
+        self.config_parser = ConfigParserClass(file_path=config_file, overrides=overrides)
         self.log_level, log_file = self.config_parser.get_log_info()
         self.logger = self.create_logger(self.log_level, log_file)
         self.config_parser.set_logger(self.logger)
 
-        self.data_parser = localDataParserClass(logger = self.logger, file_path=self.config_parser.get_file_path())
-        self.xml_generator = XMLGeneratorClass(logger = self.logger)
-
         self.name = self.config_parser.get_problem_name()
         self.countries = self.config_parser.get_countries()
         self.year = self.config_parser.get_year()
+        self.domain_settings = self.config_parser.get_domains()
+        # Per-variable (min, max) windows and the finer steps of their domains, set by the domain refinement
+        self.domain_windows = {}
+        self.refined_steps = {}
+        # Capacity in MW installed by the previous years of a pathway and still in service, added to the minimum capacity
+        self.carried_capacity = {}
+
+        self.data_store = DataStoreClass(logger=self.logger, **(self.config_parser.get_data_store() or {}))
+        self.data_parser = localDataParserClass(logger = self.logger, file_path=self.config_parser.get_file_path(), data_store=self.data_store)
+        self.xml_generator = XMLGeneratorClass(logger = self.logger)
+
+        timeslice_aggregation = self.config_parser.get_timeslice_aggregation()
+        if timeslice_aggregation is not None:
+            self.data_parser = TimesliceAggregatorClass(
+                logger=self.logger,
+                data_parser=self.data_parser,
+                year=self.year,
+                countries=self.countries,
+                **timeslice_aggregation
+            )
 
         self.logger.info("Energy model initialized")
 
@@ -35,24 +73,38 @@ class EnergyModelClass:
         )
         return logging.getLogger(__name__)
     
-    def add_extra_power_tech(self, extra_power_tech):
-        self.power_tech = [tech for tech in self.power_tech if tech[-1] == 'N' or tech[-1] == 'X']
-        self.power_tech.extend(extra_power_tech)
-        self.power_tech = list(set(self.power_tech))
-    
+    def select_technologies(self, residual_capacity_df):
+        """Sets the technology codes, without the country prefix, of the modelled technologies and the full
+        names they have in the modelled countries, which filter_data keeps.
+
+        outline.technologies lists the codes, DEFAULT_POWER_TECHNOLOGIES by default. With 'all', they are the
+        new and extendable ('N' and 'X') technologies of power_tech.csv and every power technology with some
+        residual capacity in residual_capacity_df.
+        """
+        technologies = self.config_parser.get_technologies() or DEFAULT_POWER_TECHNOLOGIES
+        if technologies == 'all':
+            power_technologies = self.data_store.read_csv(POWER_TECHNOLOGIES_FILE_PATH)['power_tech'].dropna()
+            power_technologies = power_technologies[~power_technologies.str.contains('BACKSTOP')]
+            residual_technologies = residual_capacity_df.loc[residual_capacity_df['MIN_INSTALLED_CAPACITY'] > 0, 'TECHNOLOGY'].str[2:]
+            technologies = set(power_technologies[power_technologies.str[-1].isin(['N', 'X'])])
+            technologies |= set(residual_technologies[residual_technologies.isin(power_technologies)])
+        self.power_tech = sorted(set(technologies))
+        self.technology_selection = pd.Index([country + technology for country in self.countries for technology in self.power_tech])
+        self.logger.debug(f"{len(self.power_tech)} technologies selected: {self.power_tech}")
+
     def filter_data(self, data, only_powerplants=True):
+        """Keeps the rows of the modelled countries and, with only_powerplants, of the selected technologies."""
         if 'COUNTRY' not in data.columns: 
             raise ValueError("Data does not have a 'COUNTRY' column")
-        data = data.loc[data['COUNTRY'].isin(self.countries)]
+        mask = data['COUNTRY'].isin(self.countries)
 
-        self.power_tech = ['NGGCP04N', 'NGCCP03N', 'HYDMS03X', 'HYDMS02X', 'HYDMS01X', 'WINDP00X', 'LFRCP01N']#['HYDMS03X', 'HYDMS02X', 'HYDMS01X', 'SOC1P00X', 'BMCHC02N', 'WINDP01X', 'WINDP00X', 'NGGCP04N', 'NGCCP03N', 'LFRCP01N', 'HFGCP02N']
         if only_powerplants:
             if 'TECH' in data.columns:
-                data = data.loc[data['TECH'].isin(self.power_tech)]
+                mask &= data['TECH'].isin(self.power_tech)
             
             if 'TECHNOLOGY' in data.columns:
-                data = data.loc[data['TECHNOLOGY'].map(lambda x: str(x)[2:]).isin(self.power_tech)]
-        return data
+                mask &= data['TECHNOLOGY'].isin(self.technology_selection)
+        return data.loc[mask]
         
     @deprecated(reason="Data directly connected in generate_xml function")
     def collect_data(self):
@@ -64,50 +116,79 @@ class EnergyModelClass:
         self.logger.debug("Annual demand data collected")
 
     def generate_xml(self):
+        self.build_xml()
+        compact = (self.config_parser.get_generation() or {}).get('compact_names', False)
+        self.xml_generator.print_xml(output_file=self.config_parser.get_output_file_path(), compact=compact)
+        self.logger.info("XML generated")
+
+    def reset_xml(self):
+        """Starts a new instance, so that the model can be built again with other domains."""
+        self.xml_generator = XMLGeneratorClass(logger = self.logger)
+
+    def refined_domain_values(self, domain_name):
+        """Returns the grid the bounded domains are cut from: the shared domain, at the refined step if any."""
+        values = self.domains[domain_name]
+        return range(values.start, values.stop, self.refined_steps.get(domain_name, values.step))
+
+    def build_xml(self):
         self.logger.debug("Generating XML...")
         
         self.xml_generator.add_presentation(name=self.name, maximize='False') # For some reason i get a lower cost value in this case
         self.xml_generator.add_agents(self.countries)
 
         domains = self.generate_domains()
+        self.domains = domains
         self.xml_generator.add_domains(domains)
 
-        power_technologies = pd.read_csv('data/input_data/power_tech.csv')
-        self.power_tech = power_technologies['power_tech'].unique()
-        self.power_tech = [tech for tech in self.power_tech if 'BACKSTOP' not in tech]
+        data = self.prepare_model_data()
+
+        # Every constraint is local to one agent and its interconnectors: the agents can be built apart and merged
+        max_workers = (self.config_parser.get_generation() or {}).get('max_workers', 1)
+        if max_workers != 1 and len(self.countries) > 1:
+            for fragment in generate_fragments(data, self.countries, max_workers=max_workers):
+                self.xml_generator.merge_fragment(fragment)
+        else:
+            add_agent_model(self.xml_generator, data, self.countries)
+        self.variables = [variable.attrib["name"] for variable in self.xml_generator.instance.find("variables")]
+
+    def prepare_model_data(self):
+        """Extracts the data of every agent and adds the bounded domains, returning what add_agent_model needs."""
+        # The selection is built once per build, every extracted table being filtered against it
+        residual_capacity_df = self.filter_data(self.data_parser.extract_minimum_installed_capacity(year=self.year, unit='MW'), only_powerplants=False)
+        self.select_technologies(residual_capacity_df)
 
         input_data=self.filter_data(self.data_parser.extract_technologies_per_country(impose_one_mode=True))
         selected_technologies = input_data['TECHNOLOGY'].unique()
         timeslice_technologies_modes = input_data['VARIABLE'].values
         modes = input_data['MODE_OF_OPERATION'].unique()
-        self.variables = self.xml_generator.add_variable_from_name(
-            variables = timeslice_technologies_modes,
-            technologies=selected_technologies, 
-            agents=self.countries
-        )
 
-        residual_capacity_df = self.filter_data(self.data_parser.extract_minimum_installed_capacity(year=self.year, unit='MW'), only_powerplants=False)
         residual_capacity_df = residual_capacity_df[(residual_capacity_df['MIN_INSTALLED_CAPACITY'] > 0) & (residual_capacity_df['TECHNOLOGY'].isin(selected_technologies))]
-        self.add_extra_power_tech(residual_capacity_df['TECHNOLOGY'].unique())
-
-
-        # Minimum installed capacity constraint    
-        residual_capacity_df = self.filter_data(residual_capacity_df)
-        for index, row in residual_capacity_df.iterrows():
-            self.xml_generator.add_minimum_capacity_constraint(
-                variable_name=f"{row['TECHNOLOGY']}_capacity", 
-                min_capacity=round(row['MIN_INSTALLED_CAPACITY'])
-            )
-
-        # Maximum rate of activity constraint based on the installed capacity
-        factors_df = self.collect_factors(selected_technologies)
-        self.xml_generator.add_maximum_rate_of_activity_per_all_technology_constraint(modes=modes, factors_df=factors_df)
-        self.xml_generator.add_maximum_annual_activity_rate_per_timeslice_constraint(modes=modes, factors_df=factors_df)
-        #self.xml_generator.add_minimum_annual_activity_rate_per_timeslice_constraint(modes=modes, factors_df=factors_df, non_dispatchable_technologies=['HYDMS01X', 'HYDMS02X', 'HYDMS03X', 'SOC1P00X', 'SOC2P00X'])
 
+        # Minimum and total annual maximum capacity are folded into the capacity domains
+        max_capacity_installable_df = self.filter_data(self.data_parser.extract_total_annual_max_capacity(year=self.year, unit='MW'))
+        self.capacity_bounds = self.collect_capacity_bounds(residual_capacity_df, max_capacity_installable_df)
+        capacity_windows = {name: window for name, window in self.domain_windows.items() if name.endswith('_capacity')}
+        variable_domains = self.xml_generator.add_bounded_domains(
+            domain_name="installable_capacity_domain",
+            domain_values=self.refined_domain_values("installable_capacity_domain"),
+            bounds=intersect_bounds(self.capacity_bounds, capacity_windows)
+        )
+        variable_domains.update(self.xml_generator.add_bounded_domains(
+            domain_name="rate_activity_domain",
+            domain_values=self.refined_domain_values("rate_activity_domain"),
+            bounds={name: window for name, window in self.domain_windows.items() if name.endswith('_rateActivity')}
+        ))
+
+        # Every per-technology parameter is joined, clipped and filled once, the constraint families reading this table
+        technology_parameters_df = self.collect_technology_parameters(selected_technologies, residual_capacity_df)
+        factors_df = self.collect_factors(technology_parameters_df)
         
         input_output_activity_ratio_df, specified_annual_demand_df, specified_demand_profile_df, year_split_df = self.collect_ratio_annual_demand()
 
+        # Only the physically connected countries trade, each link within its own capacity
+        interconnectors_df = self.collect_interconnectors()
+        variable_domains.update(self.add_transmission_domains(interconnectors_df, year_split_df['TIMESLICE'].unique()))
+
         #TODO: check again
         # self.xml_generator.add_minimum_rate_of_activity_constraint(
         #     input_output_activity_ratio_df=input_output_activity_ratio_df,
@@ -116,23 +197,6 @@ class EnergyModelClass:
         #     year_split_df = year_split_df
         # )
 
-        #TODO: substitute the following code with the previous one
-        # Easy version - Energy balance A & B (only electricity without input and output activity ratio)
-        self.xml_generator.add_minimum_respecting_demand(
-            timeslice_technologies_modes=timeslice_technologies_modes,
-            specified_demand_profile_df=specified_demand_profile_df,
-            specified_annual_demand_df=specified_annual_demand_df,
-            year_split_df=year_split_df
-        )   
-
-        # Total annual maximum capacity constraint
-        max_capacity_installable_df = self.filter_data(self.data_parser.extract_total_annual_max_capacity(year=self.year, unit='MW'))
-        for index, row in max_capacity_installable_df.iterrows():
-            self.xml_generator.add_maximum_capacity_constraint(
-                variable_name=f"{row['TECHNOLOGY']}_capacity", 
-                max_capacity=round(row['TOTAL_ANNUAL_CAPACITY'])
-            )
-
         # Annual activity constraint
         # TODO: It is doing sth else
         # upper_limit_technological_demand_df = self.filter_data(self.data_parser.extract_total_technology_annual_activity_upper_limit(year=self.year, unit='TJ'))
@@ -147,60 +211,16 @@ class EnergyModelClass:
         #         lower_limit=row['TOTAL_ANNUAL_ACTIVITY_LOWER_LIMIT'] 
         #     )
 
-        #Emission accounting
+        # Emission accounting, the annual limits being the largest values of the emission domains
         #TODO: note that some emission factor can be negative - atm there is no management for negative values
-        # emission_factors_df = self.filter_data(self.data_parser.extract_emission_activity_ratio(year=self.year))
-        # emission_annual_limit_df = self.filter_data(self.data_parser.extract_annual_emission_limit(year=self.year))
-        # for index, row in emission_annual_limit_df.iterrows():
-        #     variables_per_country_emission = [f"{var}_rateActivity" for var in timeslice_technologies_modes if row['COUNTRY'] == var.split('_')[1][:2]]
-        #     self.xml_generator.add_emission_accounting_constraint(
-        #         emission_name = row['EMISSION'],
-        #         max_emission_limit = row['ANNUAL_EMISSION_LIMIT'],
-        #         variables = variables_per_country_emission,
-        #         modes = modes,
-        #         emission_factors_df=emission_factors_df,
-        #         year_split_df=year_split_df
-        #     )
-
-        #Soft constraint: Operating cost minimization
-        capital_costs_df = self.filter_data(self.data_parser.extract_capital_costs(year=self.year, unit='M$'))
-        lifetime_df = self.filter_data(self.data_parser.extract_technology_operational_life())
-        amortized_capital_costs_df = capital_costs_df.merge(lifetime_df, on=['COUNTRY', 'TECHNOLOGY'], how='left')
-        amortized_capital_costs_df['AMORTIZED_CAPITAL_COST'] = amortized_capital_costs_df['CAPITAL_COST'] / amortized_capital_costs_df['OPERATIONAL_LIFETIME']
-        amortized_capital_costs_df = amortized_capital_costs_df.merge(residual_capacity_df, on=['COUNTRY', 'TECHNOLOGY'], how='left')
-        amortized_capital_costs_df['AMORTIZED_CAPITAL_COST'] = amortized_capital_costs_df['AMORTIZED_CAPITAL_COST'].apply(lambda x: min(x, 2**31 - 1))
-
-        full_index = pd.DataFrame(
-            list(product(self.countries, selected_technologies)),
-            columns=['COUNTRY', 'TECHNOLOGY']
+        emission_factors_df = self.filter_data(self.data_parser.extract_emission_activity_ratio(year=self.year))
+        emission_factors_df = emission_factors_df.dropna(subset=['EMISSION_ACTIVITY_RATIO'])
+        emission_limits_df = self.add_emission_domains(
+            self.filter_data(self.data_parser.extract_annual_emission_limit(year=self.year)),
+            len(year_split_df['TIMESLICE'].unique())
         )
 
-        amortized_capital_costs_df = full_index.merge(amortized_capital_costs_df, on=['COUNTRY', 'TECHNOLOGY'], how='left')
-        amortized_capital_costs_df['MIN_INSTALLED_CAPACITY'] = amortized_capital_costs_df['MIN_INSTALLED_CAPACITY'].fillna(0)
-        amortized_capital_costs_df['AMORTIZED_CAPITAL_COST'] = amortized_capital_costs_df['AMORTIZED_CAPITAL_COST'].fillna(4999)
-        amortized_capital_costs_df = self.filter_data(amortized_capital_costs_df)
-        amortized_capital_costs_df.sort_values(by=['AMORTIZED_CAPITAL_COST'], ascending=False, inplace=True)
-
-        fixed_costs_df = self.filter_data(self.data_parser.extract_fixed_costs(year=self.year, unit='M$'))
-        fixed_costs_df['FIXED_COST'] = fixed_costs_df['FIXED_COST'].apply(lambda x: min(x, 2**31 - 1))
-        fixed_costs_df = full_index.merge(fixed_costs_df, on=['COUNTRY', 'TECHNOLOGY'], how='left')
-        fixed_costs_df['FIXED_COST'] = fixed_costs_df['FIXED_COST'].fillna(4999)
-        fixed_costs_df = self.filter_data(fixed_costs_df)
-
-        amortized_capital_costs_df = amortized_capital_costs_df.merge(fixed_costs_df, on=['COUNTRY', 'TECHNOLOGY'], how='left')
-
-
-        for index, row in amortized_capital_costs_df.iterrows():
-            capacity_variable = f"{row['TECHNOLOGY']}_capacity"
-            self.xml_generator.add_installing_cost_minimization_constraint(
-                weight=1,
-                variable_capacity_name=capacity_variable,
-                previous_installed_capacity=int(row["MIN_INSTALLED_CAPACITY"]),
-                cost_per_MW=round(row['AMORTIZED_CAPITAL_COST'] + row['FIXED_COST']),
-                extra_name = 'amortized'
-            )
-
-
+        #Soft constraint: Operating cost minimization, from the costs of technology_parameters_df
         # for index, row in fixed_costs_df.iterrows():
         #     capacity_variable = f"{row['TECHNOLOGY']}_capacity"
         #     self.xml_generator.add_installing_cost_minimization_constraint(
@@ -214,7 +234,7 @@ class EnergyModelClass:
 
         # variable_costs_df = self.filter_data(self.data_parser.extract_variable_costs(year=self.year, unit='$'))
         # variable_costs_df['VARIABLE_COST'] = variable_costs_df['VARIABLE_COST'].apply(lambda x: min(x, 2**31 - 1))
-        # variable_costs_df = full_index.merge(variable_costs_df, on=['COUNTRY', 'TECHNOLOGY'], how='left')
+        # variable_costs_df = technology_parameters_df[['COUNTRY', 'TECHNOLOGY']].merge(variable_costs_df, on=['COUNTRY', 'TECHNOLOGY'], how='left')
         # variable_costs_df['VARIABLE_COST'] = variable_costs_df['VARIABLE_COST'].fillna(9999)
         # variable_costs_df = self.filter_data(variable_costs_df)
         # for index, row in variable_costs_df.iterrows():
@@ -226,43 +246,253 @@ class EnergyModelClass:
         #             year_split_df=year_split_df,
         #         )
 
-        self.xml_generator.print_xml(output_file=self.config_parser.get_output_file_path())
-        self.logger.info("XML generated")
+        return {
+            "selected_technologies": selected_technologies,
+            "timeslice_technologies_modes": timeslice_technologies_modes,
+            "modes": modes,
+            "variable_domains": variable_domains,
+            "factors_df": factors_df,
+            "specified_annual_demand_df": specified_annual_demand_df,
+            "specified_demand_profile_df": specified_demand_profile_df,
+            "year_split_df": year_split_df,
+            "technology_parameters_df": technology_parameters_df,
+            "interconnectors_df": interconnectors_df,
+            "emission_factors_df": emission_factors_df,
+            "emission_limits_df": emission_limits_df,
+        }
+
+    def check_feasibility(self):
+        """Screens the generated instance for infeasibility before any solver is launched."""
+        checker = FeasibilityCheckerClass(logger=self.logger, instance=self.xml_generator.instance)
+        issues = checker.check()
+        if issues:
+            self.logger.warning(f"{len(issues)} infeasible constraints found in {self.name}")
+        else:
+            self.logger.info("No infeasibility found by the pre-solve check")
+        return issues
+
+    def diagnose_infeasibility(self):
+        """Returns a report of an irreducible infeasible subset of the generated instance and its source data rows."""
+        diagnosis = InfeasibilityDiagnosisClass(logger=self.logger, instance=self.xml_generator.instance).diagnose()
+        report = format_report(diagnosis)
+        self.logger.warning(report)
+        return report
+
+    def create_solver(self):
+        """Returns the FRODO2 solver configured in the solver section, with a result cache if a cache section is given."""
+        return create_solver(self.logger, self.config_parser.get_solver(), self.config_parser.get_cache())
+
+    def refine(self, output_dir, solver=None):
+        """Solves the model from a coarse to a fine domain grid, see DomainRefinementClass, and returns the finest solution."""
+        owned_solver = solver is None
+        if owned_solver:
+            solver = self.create_solver()
+        refinement = DomainRefinementClass(
+            logger=self.logger,
+            model=self,
+            solver=solver,
+            **(self.config_parser.get_refinement() or {})
+        )
+        try:
+            return refinement.run(output_dir)
+        finally:
+            if owned_solver and solver.pool is not None:
+                solver.pool.close()
+
+    def pathway(self, output_dir, solver=None):
+        """Solves the years of the pathway section in sequence, see PathwayClass, and returns their solutions."""
+        owned_solver = solver is None
+        if owned_solver:
+            solver = self.create_solver()
+        pathway = PathwayClass(
+            logger=self.logger,
+            model=self,
+            solver=solver,
+            **self.config_parser.get_pathway()
+        )
+        try:
+            return pathway.run(output_dir)
+        finally:
+            if owned_solver and solver.pool is not None:
+                solver.pool.close()
+
+    def decompose(self, output_dir, solver=None):
+        """Solves the model as a capacity master problem and parallel dispatch subproblems, see DecompositionClass,
+        and returns the combined solution, or None if no feasible one was found."""
+        owned_solver = solver is None
+        if owned_solver:
+            solver = self.create_solver()
+        decomposition = DecompositionClass(
+            logger=self.logger,
+            solver=solver,
+            **(self.config_parser.get_decomposition() or {})
+        )
+        os.makedirs(output_dir, exist_ok=True)
+        problem_file = os.path.join(output_dir, f"{self.name}.xml")
+        self.reset_xml()
+        self.build_xml()
+        # The decomposition tells capacity variables from the others by their full names
+        self.xml_generator.print_xml(output_file=problem_file)
+        try:
+            return decomposition.run(problem_file, output_dir)
+        finally:
+            if owned_solver and solver.pool is not None:
+                solver.pool.close()
+
+    def sweep(self, scenarios, output_dir, max_workers=None):
+        """Builds the model once and writes one instance per scenario by substituting its numeric parameters.
+
+        Every scenario is a dictionary with a 'name' and any of:
+        - 'parameters': {reference pattern: {formal parameter: multiplier}}, e.g. {'minimize_installingCost': {'cost_per_MW': 1.2}}
+        - 'overrides': {constraint name pattern: {formal parameter: value}}
+        - 'capacity_bounds': {capacity variable pattern: (min, max)}, None keeping the original bound
+        """
+        self.reset_xml()
+        self.build_xml()
+        self.xml_generator.set_max_arity_contraints()
+        self.xml_generator.canonicalize()
+        # The skeleton merges the definitions itself, after reading the references the scenarios refer to
+        skeleton = ModelSkeletonClass(
+            instance=self.xml_generator.instance,
+            capacity_domain_name="installable_capacity_domain",
+            capacity_domain_values=self.refined_domain_values("installable_capacity_domain"),
+            capacity_bounds=self.capacity_bounds,
+            deduplicate=True
+        )
+        self.logger.info(f"Model skeleton built, writing {len(scenarios)} scenarios to {output_dir}")
+
+        output_files = write_scenarios(skeleton, scenarios, output_dir, self.name, max_workers=max_workers)
+        self.logger.info(f"{len(output_files)} scenarios written")
+        return output_files
     
-    def collect_factors(self, selected_technologies):
+    def collect_capacity_bounds(self, residual_capacity_df, max_capacity_installable_df):
+        """Collects the (min, max) installed capacity of every bounded capacity variable, the capacity carried over
+        by a pathway being added to the minimum."""
+        bounds = {}
+        for index, row in residual_capacity_df.iterrows():
+            bounds[f"{row['TECHNOLOGY']}_capacity"] = (round(row['MIN_INSTALLED_CAPACITY']), None)
+        for index, row in max_capacity_installable_df.iterrows():
+            variable_name = f"{row['TECHNOLOGY']}_capacity"
+            min_capacity, _ = bounds.get(variable_name, (None, None))
+            bounds[variable_name] = (min_capacity, round(row['TOTAL_ANNUAL_CAPACITY']))
+        for variable_name, capacity in self.carried_capacity.items():
+            min_capacity, max_capacity = bounds.get(variable_name, (None, None))
+            min_capacity = round((min_capacity or 0) + capacity)
+            if max_capacity is not None and min_capacity > max_capacity:
+                self.logger.warning(f"Capacity carried over to {variable_name} exceeds its maximum {max_capacity}, keeping the maximum")
+                min_capacity = max_capacity
+            bounds[variable_name] = (min_capacity, max_capacity)
+        return bounds
+
+    def collect_technology_parameters(self, selected_technologies, residual_capacity_df):
+        """Returns the parameters of every selected technology in the country of its two-letter prefix, indexed
+        by (COUNTRY, TECHNOLOGY) in one table: the minimum installed capacity, the amortized capital and fixed
+        costs clipped to 32-bit integers, and the availability and conversion factors, left NaN when missing
+        for collect_factors to tell the timeslices with a capacity factor from the others."""
+        index = pd.MultiIndex.from_arrays(
+            [[technology[:2] for technology in selected_technologies], list(selected_technologies)],
+            names=['COUNTRY', 'TECHNOLOGY']
+        )
+        tables = [
+            (residual_capacity_df, 'MIN_INSTALLED_CAPACITY'),
+            (self.data_parser.extract_capital_costs(year=self.year, unit='M$'), 'CAPITAL_COST'),
+            (self.data_parser.extract_technology_operational_life(), 'OPERATIONAL_LIFETIME'),
+            (self.data_parser.extract_fixed_costs(year=self.year, unit='M$'), 'FIXED_COST'),
+            (self.data_parser.extract_availability_factors(year=self.year), 'AVAILABILITY_FACTOR'),
+            (self.data_parser.extract_capacity_to_activity_unit(), 'CAPACITY_TO_ACTIVITY_UNIT'),
+        ]
+        columns = []
+        for table, column in tables:
+            values = table.set_index(['COUNTRY', 'TECHNOLOGY'])[column]
+            columns.append(values[~values.index.duplicated()].reindex(index).astype('float64'))
+        parameters_df = pd.concat(columns, axis=1)
+
+        parameters_df['AMORTIZED_CAPITAL_COST'] = parameters_df['CAPITAL_COST'] / parameters_df['OPERATIONAL_LIFETIME']
+        costs = ['AMORTIZED_CAPITAL_COST', 'FIXED_COST']
+        parameters_df[costs] = parameters_df[costs].clip(upper=2**31 - 1).fillna(4999)
+        parameters_df['MIN_INSTALLED_CAPACITY'] = parameters_df['MIN_INSTALLED_CAPACITY'].fillna(0)
+        return parameters_df.reset_index()
+
+    def collect_factors(self, technology_parameters_df):
+        """Returns the capacity, availability and conversion factors and the year split of every technology
+        of every country in every timeslice, a technology belonging to the country of its two-letter prefix."""
         capacity_factor_df = self.filter_data(self.data_parser.extract_capacity_factors(year=self.year, timeslices=True))
-        availability_factor_df = self.filter_data(self.data_parser.extract_availability_factors(year=self.year))
-        conversion_factor_df = self.data_parser.extract_capacity_to_activity_unit()
         year_split_df = self.data_parser.extract_year_split(year=self.year)
-        factors_df = capacity_factor_df.set_index(['COUNTRY', 'TECHNOLOGY']).join(
-            availability_factor_df.set_index(['COUNTRY', 'TECHNOLOGY']), how='outer'
-        ).join(
-            conversion_factor_df.set_index(['COUNTRY', 'TECHNOLOGY']), how='outer'
-        ).reset_index()
-        factors_df = factors_df[factors_df['TECHNOLOGY'].isin(selected_technologies)]
-        #TODO: how should i treat the NaN values? - At the moment filling them with 1
-        factors_df['CAPACITY_FACTOR'] = factors_df['CAPACITY_FACTOR'].fillna(1)
-        factors_df['AVAILABILITY_FACTOR'] = factors_df['AVAILABILITY_FACTOR'].fillna(1)
-        factors_df = factors_df[~factors_df['TIMESLICE'].isna()]
+        parameters_df = technology_parameters_df.set_index(['COUNTRY', 'TECHNOLOGY'])
+        capacity_factor_df = capacity_factor_df[capacity_factor_df['TECHNOLOGY'].isin(parameters_df.index.get_level_values('TECHNOLOGY'))]
+        capacity_factor = capacity_factor_df.dropna(subset=['TIMESLICE']).set_index(['COUNTRY', 'TECHNOLOGY', 'TIMESLICE'])['CAPACITY_FACTOR']
+        capacity_factor = capacity_factor[~capacity_factor.index.duplicated()]
 
-        countries = factors_df['COUNTRY'].unique()
+        # Only the technologies of the countries with capacity factors are expanded to every timeslice, in the order of the year split
+        parameters_df = parameters_df[parameters_df.index.get_level_values('COUNTRY').isin(capacity_factor.index.get_level_values('COUNTRY'))]
         timeslices = year_split_df['TIMESLICE'].unique()
-
-        from itertools import product
-        full_index = pd.DataFrame(
-            list(product(countries, selected_technologies, timeslices)),
-            columns=['COUNTRY', 'TECHNOLOGY', 'TIMESLICE']
+        index = pd.MultiIndex.from_arrays(
+            [
+                np.repeat(parameters_df.index.get_level_values('COUNTRY'), len(timeslices)),
+                np.repeat(parameters_df.index.get_level_values('TECHNOLOGY'), len(timeslices)),
+                np.tile(timeslices, len(parameters_df)),
+            ],
+            names=['COUNTRY', 'TECHNOLOGY', 'TIMESLICE']
         )
-
-        factors_df = full_index.merge(factors_df, on=['COUNTRY', 'TECHNOLOGY', 'TIMESLICE'], how='left')
-        factors_df['CAPACITY_FACTOR'] = factors_df['CAPACITY_FACTOR'].fillna(0)
-        factors_df['AVAILABILITY_FACTOR'] = factors_df['AVAILABILITY_FACTOR'].fillna(0)
-        factors_df['CAPACITY_TO_ACTIVITY_UNIT'] = factors_df['CAPACITY_TO_ACTIVITY_UNIT'].fillna(31.536)
-        factors_df = factors_df.merge(year_split_df, on='TIMESLICE', how='left')
-        factors_df['YEAR_SPLIT'] = factors_df['YEAR_SPLIT'].map(lambda x: 1/round(1/x))
+        # A timeslice without capacity factor is left out: no capacity factor, no availability, default conversion
+        measured = index.isin(capacity_factor.index)
+        parameters = parameters_df.reindex(index.droplevel('TIMESLICE'))
+        #TODO: how should i treat the NaN values? - At the moment filling them with 1
+        factors_df = pd.DataFrame({
+            'CAPACITY_FACTOR': np.where(measured, capacity_factor.reindex(index).fillna(1), 0),
+            'AVAILABILITY_FACTOR': np.where(measured, parameters['AVAILABILITY_FACTOR'].fillna(1), 0),
+            'CAPACITY_TO_ACTIVITY_UNIT': np.where(measured, parameters['CAPACITY_TO_ACTIVITY_UNIT'].fillna(31.536), 31.536),
+        }, index=index).reset_index()
+
+        year_split = year_split_df.drop_duplicates('TIMESLICE').set_index('TIMESLICE')['YEAR_SPLIT']
+        factors_df['YEAR_SPLIT'] = 1 / np.round(1 / factors_df['TIMESLICE'].map(year_split))
  
         return factors_df
     
+    def collect_interconnectors(self):
+        """Returns the directed interconnectors between the modelled countries, with their capacity in TJ/year."""
+        file_path = self.config_parser.get_interconnectors_file_path()
+        if file_path is None:
+            return pd.DataFrame({'FROM': pd.Series(dtype=object), 'TO': pd.Series(dtype=object), 'CAPACITY': pd.Series(dtype='int64')})
+
+        interconnectors_df = self.data_parser.extract_interconnectors(file_path, unit='MW')
+        interconnectors_df = interconnectors_df[interconnectors_df['FROM'].isin(self.countries) & interconnectors_df['TO'].isin(self.countries)]
+        interconnectors_df = interconnectors_df.reset_index(drop=True)
+        interconnectors_df['CAPACITY'] = (interconnectors_df['CAPACITY'] * 31.536).round().astype('int64') # MW to TJ/year
+        return interconnectors_df
+
+    def add_transmission_domains(self, interconnectors_df, timeslices):
+        """Adds the shared transmission domain and one bounded domain per link capacity, returning the variable domains."""
+        if interconnectors_df.empty:
+            return {}
+
+        step = self.domain_settings.get("transmission_domain", {}).get("step", DEFAULT_TRANSMISSION_STEP)
+        transmission_values = range(0, int(interconnectors_df['CAPACITY'].max()) + 1, step)
+        self.xml_generator.add_domains({"transmission_domain": transmission_values})
+        return self.xml_generator.add_bounded_domains(
+            domain_name="transmission_domain",
+            domain_values=transmission_values,
+            bounds={
+                transmission_variable_name(l, from_country, to_country): (0, capacity)
+                for l in timeslices
+                for from_country, to_country, capacity in interconnectors_df[['FROM', 'TO', 'CAPACITY']].itertuples(index=False)
+            }
+        )
+
+    def add_emission_domains(self, emission_limits_df, timeslices_count):
+        """Adds an emission domain per annual emission limit, from 0 to the limit in t, and returns the limits with
+        the name of their domain."""
+        emission_limits_df = emission_limits_df.dropna(subset=['ANNUAL_EMISSION_LIMIT']).reset_index(drop=True)
+        emission_limits_df['DOMAIN'] = 'emission_domain_' + emission_limits_df['EMISSION']
+
+        domains = {}
+        for index, row in emission_limits_df.iterrows():
+            limit = round(row['ANNUAL_EMISSION_LIMIT'] * 10**6) # Mt to t
+            step = self.domain_settings.get("emission_domain", {}).get("step", max(1, limit // (DEFAULT_EMISSION_RESOLUTION * timeslices_count)))
+            domains[row['DOMAIN']] = range(0, limit + 1, step)
+        self.xml_generator.add_domains(domains)
+        return emission_limits_df
+
     def collect_ratio_annual_demand(self):
         output_activity_ratio_df = self.filter_data(self.data_parser.extract_output_activity_ratio(year=self.year))
         input_activity_ratio_df = self.filter_data(self.data_parser.extract_input_activity_ratio(year=self.year))
@@ -279,11 +509,11 @@ class EnergyModelClass:
         return input_output_activity_ratio_df, specified_annual_demand_df, specified_demand_profile_df, year_split_df
         
     def generate_domains(self):
-        #TODO: Do not hard code this values
         self.logger.debug("Generating domains...")
         domains = {}
-        domains["rate_activity_domain"] = range(0, 2000000, 5000) #TJ/year
-        domains["installable_capacity_domain"] = range(0, 40000, 500) #MW 
+        for name, default in DEFAULT_DOMAINS.items():
+            settings = {**default, **self.domain_settings.get(name, {})}
+            domains[name] = range(0, settings['max'], settings['step'])
         #domains["trasferable_capacity_domain"] = range(0, 3000, 500) #TJ/year
         return domains
     
@@ -0,0 +1,275 @@
+import math
+from bisect import bisect_left, bisect_right
+from collections import deque
+from translation.parsers.instanceParser import InstanceParserClass
+
+class InfeasibleBoundsError(ValueError):
+    def __init__(self, variable_name, lower, upper):
+        super().__init__(f"No value of {variable_name} lies within [{lower}, {upper}]")
+        self.variable_name = variable_name
+
+class FeasibilityCheckerClass:
+    """Screens an instance for infeasibility before it is handed to the solver.
+
+    The hard constraints are relaxed to intervals: every variable is represented by the lowest and
+    highest value of its domain and the bounds are propagated through the constraint expressions until
+    a fixed point is reached. Bounds are always snapped to the domain grid, so a demand that cannot be
+    met on the grid is detected as well. An empty interval proves infeasibility; passing the check does
+    not prove feasibility.
+    """
+    def __init__(self, logger, instance):
+        self.logger = logger
+        self.instance = instance if isinstance(instance, InstanceParserClass) else InstanceParserClass(instance)
+
+        self.sorted_domains = {name: sorted(set(values)) for name, values in self.instance.domains.items()}
+        self.hard_constraints = {}
+        for constraint in self.instance.constraints:
+            if self.instance.is_hard(constraint):
+                expression, bindings = self.instance.bind_parameters(constraint)
+                self.hard_constraints[constraint["name"]] = (constraint, expression, bindings)
+
+    def initial_bounds(self):
+        bounds = {}
+        for variable_name, variable in self.instance.variables.items():
+            values = self.sorted_domains[variable["domain"]]
+            bounds[variable_name] = [values[0], values[-1]] if values else [math.inf, -math.inf]
+        return bounds
+
+    def check(self, max_issues=20):
+        """Returns the constraints found unsatisfiable, each with the reason, as a list of dictionaries.
+
+        After every conflict the offending constraint is set aside and propagation restarts, so that
+        independent problems (e.g. several infeasible demand balances) are all reported.
+        """
+        issues = []
+        for variable_name, variable in self.instance.variables.items():
+            if not self.sorted_domains[variable["domain"]]:
+                issues.append({"constraint": variable_name, "reason": f"domain {variable['domain']} is empty"})
+        if issues:
+            return issues
+
+        remaining = list(self.hard_constraints)
+        while len(issues) < max_issues:
+            conflict, reason = self.propagate(remaining, self.initial_bounds())
+            if conflict is None:
+                break
+            issues.append({"constraint": conflict, "reason": reason})
+            remaining.remove(conflict)
+
+        for issue in issues:
+            self.logger.warning(f"Infeasible constraint {issue['constraint']}: {issue['reason']}")
+        return issues
+
+    def is_feasible(self, constraint_names=None, bounds=None):
+        """Returns False if the relaxation of the given hard constraints (all by default) is infeasible."""
+        if constraint_names is None:
+            constraint_names = list(self.hard_constraints)
+        if bounds is None:
+            bounds = self.initial_bounds()
+        conflict, _ = self.propagate(constraint_names, bounds)
+        return conflict is None
+
+    def propagate(self, constraint_names, bounds, active=None):
+        """Propagates bounds in place and returns the first unsatisfiable constraint with the reason, or (None, None).
+
+        If a set is given as active, it collects the constraints that tightened a bound or failed: propagating
+        only those constraints reproduces the same conflict.
+        """
+        watchers = {}
+        for index, name in enumerate(constraint_names):
+            for variable_name in self.hard_constraints[name][0]["scope"]:
+                watchers.setdefault(variable_name, []).append(index)
+
+        queue = deque(range(len(constraint_names)))
+        queued = set(queue)
+        while queue:
+            index = queue.popleft()
+            queued.discard(index)
+            name = constraint_names[index]
+            _, expression, bindings = self.hard_constraints[name]
+
+            changed = set()
+            try:
+                self.propagate_boolean(expression, bindings, bounds, changed)
+            except InfeasibleBoundsError as error:
+                if active is not None:
+                    active.add(name)
+                return name, str(error)
+            if not self.possible(expression, bindings, bounds):
+                if active is not None:
+                    active.add(name)
+                return name, self.describe(expression, bindings, bounds)
+            if changed and active is not None:
+                active.add(name)
+
+            for variable_name in changed:
+                for watcher in watchers.get(variable_name, []):
+                    if watcher != index and watcher not in queued:
+                        queue.append(watcher)
+                        queued.add(watcher)
+        return None, None
+
+    def interval(self, expression, bindings, bounds):
+        """Returns the lowest and highest value an integer expression can take within the bounds."""
+        if isinstance(expression, int):
+            return expression, expression
+        if isinstance(expression, str):
+            actual = bindings.get(expression, expression)
+            if isinstance(actual, int):
+                return actual, actual
+            return tuple(bounds[actual])
+
+        operator, arguments = expression
+        intervals = [self.interval(argument, bindings, bounds) for argument in arguments]
+        if operator == "add":
+            return intervals[0][0] + intervals[1][0], intervals[0][1] + intervals[1][1]
+        if operator == "sub":
+            return intervals[0][0] - intervals[1][1], intervals[0][1] - intervals[1][0]
+        if operator == "neg":
+            return -intervals[0][1], -intervals[0][0]
+        if operator == "abs":
+            lower, upper = intervals[0]
+            if lower >= 0:
+                return lower, upper
+            if upper <= 0:
+                return -upper, -lower
+            return 0, max(-lower, upper)
+        if operator == "mul":
+            products = [safe_product(a, b) for a in intervals[0] for b in intervals[1]]
+            return min(products), max(products)
+        if operator == "div":
+            (a_lower, a_upper), (b_lower, b_upper) = intervals
+            if b_lower <= 0 <= b_upper:
+                return -math.inf, math.inf
+            quotients = [safe_quotient(a, b) for a in (a_lower, a_upper) for b in (b_lower, b_upper)]
+            return math.floor(min(quotients)), math.ceil(max(quotients))
+        if operator == "min":
+            return min(intervals[0][0], intervals[1][0]), min(intervals[0][1], intervals[1][1])
+        if operator == "max":
+            return max(intervals[0][0], intervals[1][0]), max(intervals[0][1], intervals[1][1])
+        if operator == "if":
+            return min(intervals[1][0], intervals[2][0]), max(intervals[1][1], intervals[2][1])
+        return -math.inf, math.inf
+
+    def possible(self, expression, bindings, bounds):
+        """Returns False only if a boolean expression cannot hold anywhere within the bounds."""
+        operator, arguments = expression
+        if operator == "and":
+            return all(self.possible(argument, bindings, bounds) for argument in arguments)
+        if operator == "or":
+            return any(self.possible(argument, bindings, bounds) for argument in arguments)
+        if operator not in ("le", "lt", "ge", "gt", "eq"):
+            return True
+
+        (a_lower, a_upper), (b_lower, b_upper) = [self.interval(argument, bindings, bounds) for argument in arguments]
+        if operator == "le":
+            return a_lower <= b_upper
+        if operator == "lt":
+            return a_lower < b_upper
+        if operator == "ge":
+            return a_upper >= b_lower
+        if operator == "gt":
+            return a_upper > b_lower
+        return a_lower <= b_upper and b_lower <= a_upper
+
+    def describe(self, expression, bindings, bounds):
+        operator, arguments = expression
+        if operator in ("le", "lt", "ge", "gt", "eq"):
+            left, right = [self.interval(argument, bindings, bounds) for argument in arguments]
+            return f"{operator} cannot hold: left side within [{left[0]}, {left[1]}], right side within [{right[0]}, {right[1]}]"
+        return f"{operator} cannot hold within the propagated bounds"
+
+    def propagate_boolean(self, expression, bindings, bounds, changed):
+        operator, arguments = expression
+        if operator == "and":
+            for argument in arguments:
+                self.propagate_boolean(argument, bindings, bounds, changed)
+            return
+        if operator not in ("le", "lt", "ge", "gt", "eq"):
+            return
+
+        left, right = arguments
+        if operator in ("ge", "gt"):
+            left, right = right, left
+        strict = 1 if operator in ("lt", "gt") else 0
+
+        left_lower, left_upper = self.interval(left, bindings, bounds)
+        right_lower, right_upper = self.interval(right, bindings, bounds)
+        if operator == "eq":
+            self.tighten(left, right_lower, right_upper, bindings, bounds, changed)
+            self.tighten(right, left_lower, left_upper, bindings, bounds, changed)
+        else:
+            self.tighten(left, -math.inf, right_upper - strict, bindings, bounds, changed)
+            self.tighten(right, left_lower + strict, math.inf, bindings, bounds, changed)
+
+    def tighten(self, expression, lower, upper, bindings, bounds, changed):
+        """Restricts the variables of an integer expression so that its value can lie within [lower, upper]."""
+        if lower == -math.inf and upper == math.inf:
+            return
+        if isinstance(expression, str):
+            expression = bindings.get(expression, expression)
+        if isinstance(expression, int):
+            return
+        if isinstance(expression, str):
+            self.tighten_variable(expression, lower, upper, bounds, changed)
+            return
+
+        operator, arguments = expression
+        if operator == "add":
+            x, y = arguments
+            y_lower, y_upper = self.interval(y, bindings, bounds)
+            self.tighten(x, lower - y_upper, upper - y_lower, bindings, bounds, changed)
+            x_lower, x_upper = self.interval(x, bindings, bounds)
+            self.tighten(y, lower - x_upper, upper - x_lower, bindings, bounds, changed)
+        elif operator == "sub":
+            x, y = arguments
+            y_lower, y_upper = self.interval(y, bindings, bounds)
+            self.tighten(x, lower + y_lower, upper + y_upper, bindings, bounds, changed)
+            x_lower, x_upper = self.interval(x, bindings, bounds)
+            self.tighten(y, x_lower - upper, x_upper - lower, bindings, bounds, changed)
+        elif operator == "neg":
+            self.tighten(arguments[0], -upper, -lower, bindings, bounds, changed)
+        elif operator == "mul":
+            x, y = arguments
+            for factor, other in ((y, x), (x, y)):
+                factor_lower, factor_upper = self.interval(factor, bindings, bounds)
+                other_lower, _ = self.interval(other, bindings, bounds)
+                if factor_lower > 0 and other_lower >= 0:
+                    # other * factor <= upper and other * factor >= lower with a positive factor
+                    self.tighten(other, safe_quotient(lower, factor_upper) if lower > 0 else -math.inf, safe_quotient(upper, factor_lower), bindings, bounds, changed)
+        elif operator == "div":
+            x, y = arguments
+            x_lower, _ = self.interval(x, bindings, bounds)
+            y_lower, y_upper = self.interval(y, bindings, bounds)
+            if y_lower > 0 and x_lower >= 0:
+                # Integer division of non-negative values: x // y in [lower, upper]
+                self.tighten(x, lower * y_lower if lower > 0 else -math.inf, (upper + 1) * y_upper - 1 if upper != math.inf else math.inf, bindings, bounds, changed)
+
+    def tighten_variable(self, variable_name, lower, upper, bounds, changed):
+        current_lower, current_upper = bounds[variable_name]
+        if lower <= current_lower and upper >= current_upper:
+            return
+
+        values = self.sorted_domains[self.instance.variables[variable_name]["domain"]]
+        new_lower, new_upper = current_lower, current_upper
+        if lower > current_lower:
+            position = bisect_left(values, math.ceil(lower))
+            new_lower = values[position] if position < len(values) else math.inf
+        if upper < current_upper:
+            position = bisect_right(values, math.floor(upper)) - 1
+            new_upper = values[position] if position >= 0 else -math.inf
+        if new_lower > new_upper:
+            raise InfeasibleBoundsError(variable_name, max(lower, current_lower), min(upper, current_upper))
+        if (new_lower, new_upper) != (current_lower, current_upper):
+            bounds[variable_name] = [new_lower, new_upper]
+            changed.add(variable_name)
+
+def safe_product(a, b):
+    if a == 0 or b == 0:
+        return 0
+    return a * b
+
+def safe_quotient(a, b):
+    if b in (math.inf, -math.inf):
+        return 0 if not math.isinf(a) else math.copysign(math.inf, a) * math.copysign(1, b)
+    return a / b
@@ -0,0 +1,155 @@
+from translation.feasibilityChecker import FeasibilityCheckerClass
+
+# Workbook sheets the parameters of every constraint family are computed from, matched on the
+# longest prefix of the referenced predicate
+FAMILY_SOURCES = {
+    "minimumRespectingDemand": ["SpecifiedAnnualDemand", "SpecifiedDemandProfile", "YearSplit"],
+    "maximumAnnualRateActivityPerTimeslice": ["CapacityFactor", "AvailabilityFactor", "CapacityToActivityUnit"],
+    "minimumAnnualRateActivityPerTimeslice": ["CapacityFactor", "AvailabilityFactor", "CapacityToActivityUnit"],
+    "maximumRateOfActivity": ["CapacityFactor", "AvailabilityFactor", "CapacityToActivityUnit", "YearSplit"],
+    "annual_technological_maximumRateOfActivity": ["TotalTechnologyAnnualActivityUp", "YearSplit"],
+    "annual_technological_minimumRateOfActivity": ["TotalTechnologyAnnualActivityLo", "YearSplit"],
+    "alreadyInstalledCapacity": ["ResidualCapacity"],
+    "withinMaxCapacity": ["TotalAnnualMaxCapacity"],
+    "withinMaxEmission": ["EmissionActivityRatio", "AnnualEmissionLimit"],
+    "emissionAccounting": ["EmissionActivityRatio", "AnnualEmissionLimit", "YearSplit"],
+}
+
+# Sources of the bounds folded into the domains of the capacity variables
+DOMAIN_SOURCES = ["ResidualCapacity", "TotalAnnualMaxCapacity"]
+
+SHEET_KEYS = {
+    "SpecifiedAnnualDemand": ("COUNTRY",),
+    "SpecifiedDemandProfile": ("COUNTRY", "TIMESLICE"),
+    "YearSplit": ("TIMESLICE",),
+    "CapacityFactor": ("TECHNOLOGY", "TIMESLICE"),
+    "AvailabilityFactor": ("TECHNOLOGY",),
+    "CapacityToActivityUnit": ("TECHNOLOGY",),
+    "TotalTechnologyAnnualActivityUp": ("TECHNOLOGY",),
+    "TotalTechnologyAnnualActivityLo": ("TECHNOLOGY",),
+    "ResidualCapacity": ("TECHNOLOGY",),
+    "TotalAnnualMaxCapacity": ("TECHNOLOGY",),
+    "EmissionActivityRatio": ("TECHNOLOGY",),
+    "AnnualEmissionLimit": ("COUNTRY",),
+}
+
+class InfeasibilityDiagnosisClass:
+    """Computes an irreducible infeasible subset (IIS) of the hard constraints of an instance.
+
+    The interval relaxation of the feasibility checker is the oracle: a set of constraints is
+    infeasible when propagating only these constraints empties a variable. Deletion filtering
+    starts from the constraints that took part in the first conflict and, whenever a constraint
+    can be dropped, continues from the constraints that took part in the new conflict only.
+    """
+    def __init__(self, logger, instance):
+        self.logger = logger
+        self.checker = FeasibilityCheckerClass(logger, instance)
+        self.instance = self.checker.instance
+
+    def conflict(self, constraint_names):
+        """Returns the constraints that took part in the conflict of the relaxation, or None if it is feasible."""
+        active = set()
+        conflict, _ = self.checker.propagate(constraint_names, self.checker.initial_bounds(), active=active)
+        if conflict is None:
+            return None
+        return [name for name in constraint_names if name in active]
+
+    def find_conflicting_set(self):
+        """Returns the names of an irreducible infeasible subset, or an empty list if no conflict is found."""
+        candidates = self.conflict(list(self.checker.hard_constraints))
+        if candidates is None:
+            return []
+
+        necessary = []
+        while candidates:
+            name = candidates.pop(0)
+            reduced = self.conflict(necessary + candidates)
+            if reduced is None:
+                necessary.append(name)
+            else:
+                # Warm start: only the constraints of the reduced conflict are still candidates
+                reduced = set(reduced)
+                candidates = [candidate for candidate in candidates if candidate in reduced]
+        return necessary
+
+    def diagnose(self):
+        """Returns the IIS as a list of constraint dictionaries with the source data rows they depend on.
+
+        A variable whose domain is empty is reported on its own, as no constraint is needed to make it infeasible.
+        """
+        for variable_name, variable in self.instance.variables.items():
+            if not self.checker.sorted_domains[variable["domain"]]:
+                return [{
+                    "constraint": variable_name,
+                    "reference": variable["domain"],
+                    "sources": source_rows(DOMAIN_SOURCES, [variable_name]),
+                }]
+
+        constraints = {constraint["name"]: constraint for constraint in self.instance.constraints}
+        diagnosis = []
+        bounded_variables = set()
+        for name in self.find_conflicting_set():
+            constraint = constraints[name]
+            diagnosis.append({
+                "constraint": name,
+                "reference": constraint["reference"],
+                "sources": source_rows(family_sources(constraint["reference"]), constraint["scope"]),
+            })
+            bounded_variables.update(variable_name for variable_name in constraint["scope"] if self.is_bounded(variable_name))
+
+        for variable_name in sorted(bounded_variables):
+            values = self.checker.sorted_domains[self.instance.variables[variable_name]["domain"]]
+            diagnosis.append({
+                "constraint": variable_name,
+                "reference": f"domain [{values[0]}, {values[-1]}]",
+                "sources": source_rows(DOMAIN_SOURCES, [variable_name]),
+            })
+
+        self.logger.info(f"Irreducible infeasible subset of {len(diagnosis)} members found")
+        return diagnosis
+
+    def is_bounded(self, variable_name):
+        """Returns True if the variable uses one of the bounded capacity domains, named <domain>_<min>_<max>."""
+        parts = self.instance.variables[variable_name]["domain"].rsplit("_", 2)
+        return len(parts) == 3 and all(part.lstrip("-").isdigit() for part in parts[1:])
+
+def family_sources(reference):
+    matches = [family for family in FAMILY_SOURCES if reference.startswith(family)]
+    if not matches:
+        return []
+    return FAMILY_SOURCES[max(matches, key=len)]
+
+def split_variable_name(variable_name):
+    """Returns the keys encoded in a <timeslice>_<technology>_<mode>_rateActivity, <technology>_capacity
+    or <timeslice>_emission_<emission> name."""
+    if variable_name.endswith("_rateActivity"):
+        parts = variable_name[:-len("_rateActivity")].split("_")
+        if len(parts) == 3:
+            return {"TIMESLICE": parts[0], "TECHNOLOGY": parts[1], "COUNTRY": parts[1][:2]}
+    if variable_name.endswith("_capacity"):
+        technology = variable_name[:-len("_capacity")]
+        return {"TECHNOLOGY": technology, "COUNTRY": technology[:2]}
+    parts = variable_name.split("_")
+    if len(parts) == 3 and parts[1] == "emission":
+        return {"TIMESLICE": parts[0], "COUNTRY": parts[2][:2]}
+    return {}
+
+def source_rows(sheets, variable_names):
+    """Returns the workbook rows, e.g. CapacityFactor[TECHNOLOGY=ZAWINDP00X, TIMESLICE=S1D1], behind the variables."""
+    keys = [split_variable_name(variable_name) for variable_name in variable_names]
+    rows = []
+    for sheet in sheets:
+        columns = SHEET_KEYS[sheet]
+        values = sorted({tuple(key[column] for column in columns) for key in keys if all(column in key for column in columns)})
+        rows += [f"{sheet}[{', '.join(f'{column}={value}' for column, value in zip(columns, row))}]" for row in values]
+    return rows
+
+def format_report(diagnosis):
+    """Returns a human readable report of a diagnosis."""
+    if not diagnosis:
+        return "No conflicting constraint set found"
+    lines = [f"Irreducible infeasible subset of {len(diagnosis)} members:"]
+    for member in diagnosis:
+        lines.append(f"  {member['constraint']} ({member['reference']})")
+        lines += [f"    {row}" for row in member["sources"]]
+    return "\n".join(lines)
@@ -0,0 +1,112 @@
+import asyncio
+import hashlib
+import json
+import os
+import time
+
+class PermanentJobError(RuntimeError):
+    """Raised by a step that would fail again with the same inputs, e.g. a proven infeasible instance: it is not retried."""
+
+class JobManifestClass:
+    """Append-only JSON lines record of the steps of a batch of jobs, used to resume an interrupted batch.
+
+    Every line records one step of one job (e.g. generate, solve or merge) with its status, attempt,
+    duration and artifact paths; the last line of a (job, step) pair is its current state. A step is
+    done when its last status is 'done' and its artifacts still exist. Steps that are not done are run
+    again on resume, and failed attempts are retried with an exponential backoff up to max_attempts
+    attempts per run. A step that failed with a PermanentJobError is not run again for the same job.
+    """
+    def __init__(self, logger, path, max_attempts=3, backoff=30, backoff_factor=2):
+        self.logger = logger
+        self.path = path
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.backoff_factor = backoff_factor
+
+        self.states = {}
+        if os.path.exists(path):
+            with open(path) as manifest:
+                for line in manifest:
+                    if line.strip():
+                        record = json.loads(line)
+                        self.states[(record["job"], record["step"])] = record
+        elif os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    def record(self, job_id, step, status, **fields):
+        """Appends the new state of a step and returns it."""
+        previous = self.states.get((job_id, step), {})
+        record = {
+            "job": job_id,
+            "step": step,
+            "status": status,
+            "attempt": fields.pop("attempt", previous.get("attempt", 0)),
+            "time": time.time(),
+            **fields,
+        }
+        with open(self.path, "a") as manifest:
+            manifest.write(json.dumps(record) + "\n")
+            manifest.flush()
+            os.fsync(manifest.fileno())
+        self.states[(job_id, step)] = record
+        return record
+
+    def state(self, job_id, step):
+        return self.states.get((job_id, step))
+
+    def is_done(self, job_id, step):
+        state = self.state(job_id, step)
+        return state is not None and state["status"] == "done" and all(os.path.exists(path) for path in state.get("artifacts", []))
+
+    def retry_delay(self, attempt):
+        """Returns the seconds to wait before an attempt, the first attempt starting immediately."""
+        if attempt <= 1:
+            return 0
+        return self.backoff * self.backoff_factor ** (attempt - 2)
+
+    async def run_step(self, job_id, step, action, artifacts=(), **fields):
+        """Runs an asynchronous action unless the step is done, retrying it on failure.
+
+        The action may return a dictionary of fields to record with the done state. Returns the done
+        state, or None once every attempt has failed.
+        """
+        if self.is_done(job_id, step):
+            self.logger.info(f"{step} of {job_id} already done, skipped")
+            return self.state(job_id, step)
+        if (self.state(job_id, step) or {}).get("permanent"):
+            self.logger.info(f"{step} of {job_id} failed permanently before, skipped")
+            return None
+
+        attempt = (self.state(job_id, step) or {}).get("attempt", 0)
+        for tries in range(1, self.max_attempts + 1):
+            attempt += 1
+            if tries > 1:
+                delay = self.retry_delay(tries)
+                self.logger.info(f"Retrying {step} of {job_id} in {delay} s (attempt {attempt})")
+                await asyncio.sleep(delay)
+
+            start = time.monotonic()
+            self.record(job_id, step, "running", attempt=attempt, **fields)
+            try:
+                extra = await action() or {}
+            except PermanentJobError as error:
+                self.record(job_id, step, "failed", attempt=attempt, duration=time.monotonic() - start, error=str(error), permanent=True, **fields)
+                self.logger.warning(f"{step} of {job_id} failed permanently: {error}")
+                return None
+            except Exception as error:
+                self.record(job_id, step, "failed", attempt=attempt, duration=time.monotonic() - start, error=str(error), **fields)
+                self.logger.warning(f"{step} of {job_id} failed on attempt {attempt}: {error}")
+                continue
+            return self.record(job_id, step, "done", attempt=attempt, duration=time.monotonic() - start,
+                               artifacts=list(artifacts), **fields, **extra)
+
+        self.logger.error(f"{step} of {job_id} failed {self.max_attempts} times, giving up")
+        return None
+
+def config_hash(config):
+    """Returns a stable hash of a configuration dictionary."""
+    return hashlib.sha256(json.dumps(config, sort_keys=True, default=str).encode()).hexdigest()
+
+def job_id(countries, year, config):
+    """Returns the identifier of the job of some countries and a year under a configuration."""
+    return f"{'-'.join(countries)}_{year}_{config_hash(config)[:12]}"
@@ -1,9 +1,8 @@
 import yaml
-import pandas as pd
 from deprecated import deprecated
 
 class ConfigParserClass:
-    def __init__(self, file_path='config.yaml'):
+    def __init__(self, file_path='config.yaml', overrides=None):
 
         try:
             with open(file_path, 'r') as file:
@@ -11,6 +10,7 @@ class ConfigParserClass:
                 self.config = self.config['config']
         except FileNotFoundError:
             raise FileNotFoundError(f"File {file_path} not found")
+        apply_overrides(self.config, overrides or {})
         
     def get_file_path(self):
         return self.config['outline']['data_file_path']
@@ -33,9 +33,49 @@ class ConfigParserClass:
     
     def get_year(self):
         return self.config['outline']['year']
+
+    def get_technologies(self):
+        return self.config['outline'].get('technologies')
+
+    def get_timeslice_aggregation(self):
+        return self.config['outline'].get('timeslice_aggregation')
+
+    def get_domains(self):
+        return self.config['outline'].get('domains', {})
+
+    def get_interconnectors_file_path(self):
+        return self.config['outline'].get('interconnectors_file_path')
+
+    def get_refinement(self):
+        return self.config['outline'].get('refinement')
+
+    def get_pathway(self):
+        return {'years': [self.get_year()], **(self.config['outline'].get('pathway') or {})}
+
+    def get_decomposition(self):
+        return self.config['outline'].get('decomposition')
+
+    def get_solver(self):
+        return self.config.get('solver', {})
+
+    def get_cache(self):
+        return self.config.get('cache')
+
+    def get_orchestration(self):
+        return self.config.get('orchestration')
+
+    def get_manifest(self):
+        return self.config.get('manifest')
+
+    def get_generation(self):
+        return self.config.get('generation')
+
+    def get_data_store(self):
+        return self.config.get('data_store')
     
     @deprecated(reason="Data extracted by dataParser class")
     def get_powerplants_data(self):
+        import pandas as pd
         powerplants = []
         for plant, details in self.powerplants_config.items():
             for country, capacity in details["max_installable_capacity_MW"].items():
@@ -55,5 +95,22 @@ class ConfigParserClass:
 
         df = pd.DataFrame(powerplants)
         return df
-    
 
+def apply_overrides(config, overrides):
+    """Sets the values of a {dotted key: value} mapping, e.g. {'outline.year': 2030}, in a config,
+    creating the missing sections."""
+    for dotted_key, value in overrides.items():
+        section = config
+        *path, key = dotted_key.split('.')
+        for name in path:
+            if not isinstance(section.get(name), dict):
+                section[name] = {}
+            section = section[name]
+        section[key] = value
+
+def parse_override(assignment):
+    """Parses a key=value command line override, the value being read as YAML (e.g. outline.countries=[ZA, MZ])."""
+    if '=' not in assignment:
+        raise ValueError(f"Override {assignment} must be of the form key=value")
+    dotted_key, value = assignment.split('=', 1)
+    return dotted_key.strip(), yaml.safe_load(value)
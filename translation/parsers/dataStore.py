@@ -0,0 +1,52 @@
+import hashlib
+import json
+import os
+import pandas as pd
+
+class DataStoreClass:
+    """Reads every data table once and hands out copies, the parsers being free to modify them.
+
+    Tables are kept in memory for the lifetime of the store. With a directory they are also pickled
+    there with their dtypes, keyed by the path, size and modification time of the source file and the
+    read arguments, so that later runs skip parsing the workbooks and CSV files altogether.
+    """
+    def __init__(self, logger, directory=None):
+        self.logger = logger
+        self.directory = directory
+        self.tables = {}
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def read_excel(self, path, **kwargs):
+        return self.load(path, "excel", kwargs, pd.read_excel)
+
+    def read_csv(self, path, **kwargs):
+        return self.load(path, "csv", kwargs, pd.read_csv)
+
+    def load(self, path, kind, kwargs, reader, transform=None):
+        """Returns a copy of a table, read with reader(path, **kwargs) and passed to transform the first time only.
+        kind names the reader and the transform in the cache key."""
+        key = self.key(path, kind, kwargs)
+        if key not in self.tables:
+            self.tables[key] = self.read_cached(key, lambda: reader(path, **kwargs), transform)
+        return self.tables[key].copy()
+
+    def key(self, path, kind, kwargs):
+        try:
+            stat = os.stat(path)
+            version = [stat.st_size, stat.st_mtime_ns]
+        except OSError:
+            version = None
+        return hashlib.sha256(json.dumps([os.path.abspath(path), version, kind, kwargs], sort_keys=True, default=str).encode()).hexdigest()
+
+    def read_cached(self, key, read, transform):
+        cache_file = None if self.directory is None else os.path.join(self.directory, f"{key}.pkl")
+        if cache_file is not None and os.path.exists(cache_file):
+            return pd.read_pickle(cache_file)
+
+        table = read()
+        if transform is not None:
+            table = transform(table)
+        if cache_file is not None:
+            table.to_pickle(cache_file)
+        return table
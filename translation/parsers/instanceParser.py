@@ -0,0 +1,127 @@
+import xml.etree.ElementTree as ET
+
+class InstanceParserClass:
+    """Reads a generated XCSP instance back into plain Python structures."""
+    def __init__(self, instance):
+        if isinstance(instance, str):
+            instance = ET.parse(instance).getroot()
+        self.instance = instance
+
+        self.name = None
+        presentation = instance.find("presentation")
+        if presentation is not None:
+            self.name = presentation.attrib.get("name")
+
+        self.agents = [agent.attrib["name"] for agent in instance.iter("agent")]
+
+        self.domains = {}
+        for domain in instance.iter("domain"):
+            self.domains[domain.attrib["name"]] = parse_domain_values(domain.text)
+
+        self.variables = {}
+        for variable in instance.iter("variable"):
+            self.variables[variable.attrib["name"]] = {
+                "domain": variable.attrib["domain"],
+                "agent": variable.attrib.get("agent"),
+            }
+
+        self.predicates = {}
+        for predicate in instance.iter("predicate"):
+            self.predicates[predicate.attrib["name"]] = self.parse_definition(predicate)
+
+        self.functions = {}
+        for function in instance.iter("function"):
+            self.functions[function.attrib["name"]] = self.parse_definition(function)
+
+        self.constraints = []
+        for constraint in instance.iter("constraint"):
+            parameters = constraint.find("parameters")
+            self.constraints.append({
+                "name": constraint.attrib["name"],
+                "arity": int(constraint.attrib["arity"]),
+                "scope": constraint.attrib["scope"].split(),
+                "reference": constraint.attrib["reference"],
+                "parameters": parameters.text.split() if parameters is not None and parameters.text else [],
+            })
+
+    def parse_definition(self, element):
+        """Returns the formal parameter names and the parsed functional expression of a predicate or function."""
+        tokens = element.find("parameters").text.split()
+        functional = element.find("expression/functional")
+        if functional is None:
+            functional = element.find("expression")
+        return {
+            "parameters": tokens[1::2],
+            "expression": parse_expression(functional.text),
+        }
+
+    def is_hard(self, constraint):
+        return constraint["reference"] in self.predicates
+
+    def domain_values(self, variable_name):
+        return self.domains[self.variables[variable_name]["domain"]]
+
+    def bind_parameters(self, constraint):
+        """Maps the formal parameters of the referenced predicate or function to variable names or integers."""
+        definition = self.predicates.get(constraint["reference"]) or self.functions.get(constraint["reference"])
+        if definition is None:
+            raise ValueError(f"Constraint {constraint['name']} references the unknown {constraint['reference']}")
+        if len(definition["parameters"]) != len(constraint["parameters"]):
+            raise ValueError(f"Constraint {constraint['name']} does not match the parameters of {constraint['reference']}")
+
+        bindings = {}
+        for formal, actual in zip(definition["parameters"], constraint["parameters"]):
+            if actual in self.variables:
+                bindings[formal] = actual
+            elif actual.lstrip("-").isdigit():
+                bindings[formal] = int(actual)
+            else:
+                raise ValueError(f"Constraint {constraint['name']} uses the undeclared variable {actual}")
+        return definition["expression"], bindings
+
+def parse_domain_values(text):
+    """Parses the values of a domain, including the a..b interval notation."""
+    values = []
+    for token in (text or "").split():
+        if ".." in token:
+            start, end = token.split("..")
+            values.extend(range(int(start), int(end) + 1))
+        else:
+            values.append(int(token))
+    return values
+
+def parse_expression(text):
+    """Parses a functional expression such as ge(add(a, b), c) into nested (operator, arguments) tuples."""
+    tokens = []
+    token = ""
+    for char in text:
+        if char in "(),":
+            if token.strip():
+                tokens.append(token.strip())
+            tokens.append(char)
+            token = ""
+        else:
+            token += char
+    if token.strip():
+        tokens.append(token.strip())
+
+    def parse(position):
+        name = tokens[position]
+        if position + 1 < len(tokens) and tokens[position + 1] == "(":
+            arguments = []
+            position += 2
+            while tokens[position] != ")":
+                argument, position = parse(position)
+                arguments.append(argument)
+                if tokens[position] == ",":
+                    position += 1
+            return (name, arguments), position + 1
+        try:
+            return int(name), position + 1
+        except ValueError:
+            return name, position + 1
+
+    expression, position = parse(0)
+    if position != len(tokens):
+        raise ValueError(f"Unexpected trailing tokens in expression {text}")
+    return expression
@@ -1,46 +1,67 @@
 import pandas as pd
+from translation.parsers.dataStore import DataStoreClass
+
+POWERPLANTS_FILE_PATH = './data/custom_powerplants_ssp126_2050.csv'
+DEMAND_FILE_PATH = './data/demand_TEMBA_SSP1-2.6.csv'
+SECONDS_PER_YEAR = 365*24*60*60
 
 class localDataParserClass:
-    def __init__(self, logger):
+    def __init__(self, logger, data_store=None):
         self.logger = logger
+        self.data_store = data_store or DataStoreClass(logger)
         self.logger.info("Local Data parser initialized")
-    
-    def get_already_installed_powerplants_data(self, countries):
+
+    def load_powerplants(self):
+        """Returns the powerplants indexed by country, with their capacity and dates typed once."""
+        def index_powerplants(data):
+            data = data.astype({'Capacity': 'float64', 'DateIn': 'float64', 'DateOut': 'float64'})
+            return data.set_index('Country').sort_index()
+
+        return self.data_store.load(
+            POWERPLANTS_FILE_PATH, "powerplants", {'usecols': ['Fueltype', 'Country', 'Capacity', 'DateIn', 'DateOut']},
+            pd.read_csv, transform=index_powerplants
+        )
+
+    def get_already_installed_powerplants_data(self, countries, commissioned_by=2020, in_service_year=2030):
+        """Returns the capacity per fuel type and country of the powerplants commissioned by a year and still in service in another."""
         self.logger.debug("Getting powerplants data")
 
-        data = pd.read_csv('./data/custom_powerplants_ssp126_2050.csv', index_col=0)
+        data = self.load_powerplants()
+        filtered_data = data.loc[data.index.isin(countries)]
+        filtered_data = filtered_data[(filtered_data['DateIn'] <= commissioned_by) & (filtered_data['DateOut'] >= in_service_year)]
 
-        filtered_data = data[data['DateIn'] <= 2020]
-        filtered_data = filtered_data[filtered_data['DateOut'] >= 2030]
-        filtered_data = filtered_data[filtered_data['Country'].isin(countries)]
-        
         grouped_data = filtered_data.groupby(['Fueltype', 'Country'])['Capacity'].sum().reset_index()
         grouped_data['Fueltype'] = grouped_data['Fueltype'].str.replace(' ', '')
         grouped_data = grouped_data.rename(columns={'Fueltype': 'fueltype', 'Country': 'country', 'Capacity': 'already_installed_capacity'})
 
-        grouped_data['fueltype'] = grouped_data['fueltype'].apply(lambda x: x + '_RunOfRiver' if x == 'Hydro' else x)
+        grouped_data.loc[grouped_data['fueltype'] == 'Hydro', 'fueltype'] = 'Hydro_RunOfRiver'
 
         return grouped_data
-    
+
+    def load_demand(self):
+        """Returns the annual demand in GW indexed by country and region, converted once."""
+        def index_demand(df):
+            df = ((df / SECONDS_PER_YEAR) * 10**6).round(3) # Convert from PJ/year to GW
+            df.index = pd.MultiIndex.from_arrays([df.index.str[:2], df.index], names=['country', None])
+            return df
+
+        return self.data_store.load(DEMAND_FILE_PATH, "demand", {'index_col': 0, 'sep': ';'}, pd.read_csv, transform=index_demand)
+
     def get_annual_demand_data(self, year, countries):
         self.logger.debug("Getting demand data")
 
+        if isinstance(year, int):
+            year = str(year)
         if not isinstance(year, str) or len(year) != 4 or not year.isdigit():
             raise ValueError("Year must be a string of 4 digits")
 
         if not isinstance(countries, list) or not all(isinstance(country, str) and len(country) == 2 for country in countries):
             raise ValueError("Countries must be a list of strings with exactly 2 characters each")
 
-        df = pd.read_csv('./data/demand_TEMBA_SSP1-2.6.csv', index_col=0, sep=';')
-
-        df = df.map(lambda x: round((x/(365*24*60*60))*10**6, 3)) # Convert from PJ/year to GW
-
-        df['country'] = df.index.map(lambda x: x[:2])
-        filtered_data = df[df['country'].isin(countries)]
-        filtered_data = filtered_data[[str(year), 'country']]
+        df = self.load_demand()
+        filtered_data = df.loc[df.index.get_level_values('country').isin(countries), [year]]
+        filtered_data['country'] = filtered_data.index.get_level_values('country')
         filtered_data.reset_index(drop=True, inplace=True)
-        filtered_data = filtered_data.rename(columns={str(year): f'annual_demand_{year}_GW'})
+        filtered_data = filtered_data.rename(columns={year: f'annual_demand_{year}_GW'})
 
         return filtered_data
-
-    
\ No newline at end of file
@@ -1,10 +1,14 @@
+import numpy as np
 import pandas as pd
+from translation.parsers.dataStore import DataStoreClass
 
 class localDataParserClass:
-    def __init__(self, logger, file_path, ): #tech_path, fuel_path):
+    def __init__(self, logger, file_path, data_store=None): #tech_path, fuel_path):
         self.logger = logger
+        self.data_store = data_store or DataStoreClass(logger)
         self.logger.info("Local Data parser initialized")
         self.data_file_path = file_path
+        self.aha_index = None
         #self.tech_file_path = tech_path
         #self.fuel_file_path = fuel_path
 
@@ -18,31 +22,48 @@ class localDataParserClass:
         return data
     
 
-    def extract_AHA_dataset(self, year):
-        aha_df = pd.read_excel("./data/input_data/African_Hydropower_Atlas_v2-0_PoliTechM.xlsx", sheet_name='6 - Inputs code and GIS')
-        aha_df['Country'] = aha_df['Country'].map(lambda x: x.lower())
-        countrycode_df = pd.read_csv('./data/input_data/countrycode.csv')
-        countrycode_df['Country Name'] = countrycode_df['Country Name'].map(lambda x: x.lower())
+    def load_AHA_index(self):
+        """Reads the African Hydropower Atlas once and indexes the cumulative capacity of every (country, size class) by first year."""
+        aha_df = self.data_store.read_excel("./data/input_data/African_Hydropower_Atlas_v2-0_PoliTechM.xlsx", sheet_name='6 - Inputs code and GIS')
+        aha_df['Country'] = aha_df['Country'].str.lower()
+        countrycode_df = self.data_store.read_csv('./data/input_data/countrycode.csv')
+        countrycode_df['Country Name'] = countrycode_df['Country Name'].str.lower()
         aha_df = aha_df.merge(countrycode_df, left_on='Country', right_on='Country Name', how='inner')
         aha_df['COUNTRY'] = aha_df['Country code']
-        
-        aha_df = aha_df[(aha_df['First Year'] <= year) & (aha_df['First Year'] >= year - 100)]
-        aha_df = aha_df[['COUNTRY', 'Capacity', 'Size Type']]
-        aha_df = aha_df.groupby(['COUNTRY', 'Size Type'], as_index=False).agg({'Capacity': 'sum'})
-        
-        aha_df['TECH'] = aha_df['Size Type'].map({'Large': 'HYDMS03X', 'Middle': 'HYDMS02X', 'Small': 'HYDMS01X'})
 
+        aha_df['TECH'] = aha_df['Size Type'].map({'Large': 'HYDMS03X', 'Middle': 'HYDMS02X', 'Small': 'HYDMS01X'})
         if aha_df['TECH'].isna().any():
             raise ValueError("NaN values found in TECHNOLOGY column")
-        
-        aha_df['Capacity'] = aha_df['Capacity'] / 1000 # GW
-        aha_df['TECHNOLOGY'] = aha_df['COUNTRY'] + aha_df['TECH']
-        aha_df.drop(columns=['Size Type', 'TECH'], inplace=True)
-        return aha_df
+
+        aha_df = aha_df.sort_values(['COUNTRY', 'Size Type', 'First Year'], kind='stable')
+        self.aha_index = {}
+        for (country, size_type), group in aha_df.groupby(['COUNTRY', 'Size Type'], sort=True):
+            self.aha_index[(country, size_type)] = (
+                group['TECH'].iloc[0],
+                group['First Year'].to_numpy(),
+                np.concatenate([[0], np.cumsum(group['Capacity'].to_numpy(dtype=float))]),
+            )
+        self.logger.debug(f"Hydropower atlas indexed for {len(self.aha_index)} countries and size classes")
+        return self.aha_index
+
+    def extract_AHA_dataset(self, year):
+        """Returns the hydropower capacity (GW) commissioned in the 100 years up to a year per country and size class."""
+        if self.aha_index is None:
+            self.load_AHA_index()
+
+        aha_df = {'COUNTRY': [], 'Capacity': [], 'TECHNOLOGY': []}
+        for (country, size_type), (tech, first_years, cumulative_capacity) in self.aha_index.items():
+            start = np.searchsorted(first_years, year - 100, side='left')
+            stop = np.searchsorted(first_years, year, side='right')
+            if stop > start:
+                aha_df['COUNTRY'].append(country)
+                aha_df['Capacity'].append(float(cumulative_capacity[stop] - cumulative_capacity[start]) / 1000) # GW
+                aha_df['TECHNOLOGY'].append(country + tech)
+        return pd.DataFrame(aha_df).astype({'COUNTRY': object, 'Capacity': 'float64', 'TECHNOLOGY': object})
 
     def extract_minimum_installed_capacity(self, year, unit='GW'):
         aha_df = self.extract_AHA_dataset(year)
-        residualCapacity_df = pd.read_excel(self.data_file_path, sheet_name="ResidualCapacity")
+        residualCapacity_df = self.data_store.read_excel(self.data_file_path, sheet_name="ResidualCapacity")
         residualCapacity_df['COUNTRY'] = residualCapacity_df['TECHNOLOGY'].map(lambda x: x[:2])
         residualCapacity_df['TECH'] = residualCapacity_df['TECHNOLOGY'].map(lambda x: x[2:])
         new_df = residualCapacity_df[['COUNTRY', 'TECHNOLOGY', year]].rename(columns={year: 'MIN_INSTALLED_CAPACITY'})
@@ -57,7 +78,7 @@ class localDataParserClass:
         return new_df
     
     def extract_capacity_factors(self, year, timeslices=False):
-        capacity_factors_df = pd.read_excel(self.data_file_path, sheet_name="CapacityFactor")
+        capacity_factors_df = self.data_store.read_excel(self.data_file_path, sheet_name="CapacityFactor")
         capacity_factors_df['COUNTRY'] = capacity_factors_df['TECHNOLOGY'].map(lambda x: x[:2])
         capacity_factors_df['TECH'] = capacity_factors_df['TECHNOLOGY'].map(lambda x: x[2:])
 
@@ -72,7 +93,7 @@ class localDataParserClass:
         return new_df
     
     def extract_availability_factors(self, year):
-        availability_factors_df = pd.read_excel(self.data_file_path, sheet_name="AvailabilityFactor")
+        availability_factors_df = self.data_store.read_excel(self.data_file_path, sheet_name="AvailabilityFactor")
         availability_factors_df['COUNTRY'] = availability_factors_df['TECHNOLOGY'].map(lambda x: x[:2])
         availability_factors_df['TECH'] = availability_factors_df['TECHNOLOGY'].map(lambda x: x[2:])
 
@@ -82,7 +103,7 @@ class localDataParserClass:
         return new_df
     
     def extract_capacity_to_activity_unit(self):
-        capacity_to_activity_unit_df = pd.read_excel(self.data_file_path, sheet_name="CapacityToActivityUnit")
+        capacity_to_activity_unit_df = self.data_store.read_excel(self.data_file_path, sheet_name="CapacityToActivityUnit")
         capacity_to_activity_unit_df['COUNTRY'] = capacity_to_activity_unit_df['TECHNOLOGY'].map(lambda x: x[:2])
         capacity_to_activity_unit_df['TECH'] = capacity_to_activity_unit_df['TECHNOLOGY'].map(lambda x: x[2:])
 
@@ -93,7 +114,7 @@ class localDataParserClass:
     
     def extract_specified_annual_demand(self, year, unit='PJ'):
         #Assuming that we are interesting only to the electricity demand
-        specified_annual_demand_df = pd.read_excel(self.data_file_path, sheet_name="SpecifiedAnnualDemand")
+        specified_annual_demand_df = self.data_store.read_excel(self.data_file_path, sheet_name="SpecifiedAnnualDemand")
         specified_annual_demand_df['COUNTRY'] = specified_annual_demand_df['FUEL'].map(lambda x: x[:2])
 
         new_df = specified_annual_demand_df[['COUNTRY', 'FUEL', year]].rename(columns={year: 'SPECIFIED_ANNUAL_DEMAND'})
@@ -109,7 +130,7 @@ class localDataParserClass:
         return new_df
 
     def extract_specified_demand_profile(self, year, timeslices=False):
-        specifiedDemandProfile_df = pd.read_excel(self.data_file_path, sheet_name="SpecifiedDemandProfile")
+        specifiedDemandProfile_df = self.data_store.read_excel(self.data_file_path, sheet_name="SpecifiedDemandProfile")
         specifiedDemandProfile_df['COUNTRY'] = specifiedDemandProfile_df['FUEL'].map(lambda x: x[:2])
 
         new_df = specifiedDemandProfile_df[['COUNTRY', 'FUEL', 'TIMESLICE', year]].rename(columns={year: 'SPECIFIED_DEMAND_PROFILE'})
@@ -123,14 +144,14 @@ class localDataParserClass:
         return new_df
     
     def extract_year_split(self, year):
-        year_split_df = pd.read_excel(self.data_file_path, sheet_name="YearSplit")
+        year_split_df = self.data_store.read_excel(self.data_file_path, sheet_name="YearSplit")
         year_split_df.rename(columns={'Unnamed: 0': 'TIMESLICE'}, inplace=True)
 
         new_df = year_split_df[['TIMESLICE', year]].rename(columns={year: 'YEAR_SPLIT'})
         return new_df
     
     def extract_accumulated_annual_demand(self, year):
-        accumulated_annual_demand_df = pd.read_excel(self.data_file_path, sheet_name="AccumulatedAnnualDemand")
+        accumulated_annual_demand_df = self.data_store.read_excel(self.data_file_path, sheet_name="AccumulatedAnnualDemand")
         accumulated_annual_demand_df['COUNTRY'] = accumulated_annual_demand_df['FUEL'].map(lambda x: x[:2])
         accumulated_annual_demand_df['FUEL_NAME'] = accumulated_annual_demand_df['FUEL'].map(lambda x: x[2:])
 
@@ -153,7 +174,7 @@ class localDataParserClass:
         return data
     
     def extract_capital_costs(self, year, unit='M$'):
-        capital_costs_df = pd.read_excel(self.data_file_path, sheet_name="CapitalCost")
+        capital_costs_df = self.data_store.read_excel(self.data_file_path, sheet_name="CapitalCost")
         capital_costs_df['COUNTRY'] = capital_costs_df['TECHNOLOGY'].map(lambda x: x[:2])
         capital_costs_df['TECHNOLOGY'] = capital_costs_df['TECHNOLOGY']
 
@@ -165,7 +186,7 @@ class localDataParserClass:
         return new_df
     
     def extract_fixed_costs(self, year, unit='M$'):
-        fixed_costs_df = pd.read_excel(self.data_file_path, sheet_name="FixedCost")
+        fixed_costs_df = self.data_store.read_excel(self.data_file_path, sheet_name="FixedCost")
         fixed_costs_df['COUNTRY'] = fixed_costs_df['TECHNOLOGY'].map(lambda x: x[:2])
         fixed_costs_df['TECHNOLOGY'] = fixed_costs_df['TECHNOLOGY']
 
@@ -177,7 +198,7 @@ class localDataParserClass:
         return new_df
     
     def extract_variable_costs(self, year, unit='M$'):
-        variable_costs_df = pd.read_excel(self.data_file_path, sheet_name="VariableCost")
+        variable_costs_df = self.data_store.read_excel(self.data_file_path, sheet_name="VariableCost")
         variable_costs_df['COUNTRY'] = variable_costs_df['TECHNOLOGY'].map(lambda x: x[:2])
         variable_costs_df['TECHNOLOGY'] = variable_costs_df['TECHNOLOGY']
 
@@ -189,11 +210,11 @@ class localDataParserClass:
         return new_df
     
     def extract_discount_rate(self):
-        discount_rate_df = pd.read_excel(self.data_file_path, sheet_name="DiscountRate", header=None)
+        discount_rate_df = self.data_store.read_excel(self.data_file_path, sheet_name="DiscountRate", header=None)
         return discount_rate_df.iloc[0, 0]
     
     def extract_technology_operational_life(self):
-        operational_lifetime_df = pd.read_excel(self.data_file_path, sheet_name="OperationalLife")
+        operational_lifetime_df = self.data_store.read_excel(self.data_file_path, sheet_name="OperationalLife")
         operational_lifetime_df['COUNTRY'] = operational_lifetime_df['TECHNOLOGY'].map(lambda x: x[:2])
         operational_lifetime_df['TECHNOLOGY'] = operational_lifetime_df['TECHNOLOGY']
 
@@ -203,9 +224,8 @@ class localDataParserClass:
         return new_df
     
     def extract_total_annual_max_capacity(self, year, unit='GW'):
-        total_annual_capacity_df = pd.read_excel(self.data_file_path, sheet_name="TotalAnnualMaxCapacity")
+        total_annual_capacity_df = self.data_store.read_excel(self.data_file_path, sheet_name="TotalAnnualMaxCapacity")
         total_annual_capacity_df['COUNTRY'] = total_annual_capacity_df['TECHNOLOGY'].map(lambda x: x[:2])
-        total_annual_capacity_df['TECHNOLOGY'] = total_annual_capacity_df['TECHNOLOGY'].map(lambda x: x[2:])
 
         new_df = total_annual_capacity_df[['COUNTRY', 'TECHNOLOGY', year]].rename(columns={year: 'TOTAL_ANNUAL_CAPACITY'})
         new_df['TOTAL_ANNUAL_CAPACITY'] = pd.to_numeric(new_df['TOTAL_ANNUAL_CAPACITY'], errors='coerce')
@@ -225,7 +245,7 @@ class localDataParserClass:
         return data
 
     def extract_total_technology_annual_activity_upper_limit(self, year, unit='PJ'):
-        total_annual_activity_upper_limit_df = pd.read_excel(self.data_file_path, sheet_name="TotalTechnologyAnnualActivityUp")
+        total_annual_activity_upper_limit_df = self.data_store.read_excel(self.data_file_path, sheet_name="TotalTechnologyAnnualActivityUp")
         total_annual_activity_upper_limit_df['COUNTRY'] = total_annual_activity_upper_limit_df['TECHNOLOGY'].map(lambda x: x[:2])
         total_annual_activity_upper_limit_df['TECHNOLOGY'] = total_annual_activity_upper_limit_df['TECHNOLOGY']
 
@@ -237,7 +257,7 @@ class localDataParserClass:
         return new_df
     
     def extract_total_technology_annual_activity_lower_limit(self, year, unit='PJ'):
-        total_annual_activity_upper_limit_df = pd.read_excel(self.data_file_path, sheet_name="TotalTechnologyAnnualActivityLo")
+        total_annual_activity_upper_limit_df = self.data_store.read_excel(self.data_file_path, sheet_name="TotalTechnologyAnnualActivityLo")
         total_annual_activity_upper_limit_df['COUNTRY'] = total_annual_activity_upper_limit_df['TECHNOLOGY'].map(lambda x: x[:2])
         total_annual_activity_upper_limit_df['TECHNOLOGY'] = total_annual_activity_upper_limit_df['TECHNOLOGY']
 
@@ -249,7 +269,7 @@ class localDataParserClass:
         return new_df
     
     def extract_emission_activity_ratio(self, year):
-        emission_activity_ratio_df = pd.read_excel(self.data_file_path, sheet_name="EmissionActivityRatio")
+        emission_activity_ratio_df = self.data_store.read_excel(self.data_file_path, sheet_name="EmissionActivityRatio")
         emission_activity_ratio_df['COUNTRY_TECH'] = emission_activity_ratio_df['TECHNOLOGY'].map(lambda x: x[:2])
         emission_activity_ratio_df['TECHNOLOGY'] = emission_activity_ratio_df['TECHNOLOGY']
         emission_activity_ratio_df['COUNTRY_EMI'] = emission_activity_ratio_df['EMISSION'].map(lambda x: x[:2])
@@ -258,13 +278,13 @@ class localDataParserClass:
         #TODO: check if it makes sense to filter only the rows where the country of the technology is the same as the country of the emission
         emission_activity_ratio_df = emission_activity_ratio_df[emission_activity_ratio_df['COUNTRY_TECH'] == emission_activity_ratio_df['COUNTRY_EMI']]
 
-        new_df = emission_activity_ratio_df[['COUNTRY_TECH', 'TECHNOLOGY', 'EMISSION', 'MODEOFOPERATION', year]].rename(columns={year: 'EMISSION_ACTIVITY_RATIO', 'COUNTRY_TECH': 'COUNTRY'})
+        new_df = emission_activity_ratio_df[['COUNTRY_TECH', 'TECHNOLOGY', 'EMISSION', 'MODEOFOPERATION', year]].rename(columns={year: 'EMISSION_ACTIVITY_RATIO', 'COUNTRY_TECH': 'COUNTRY', 'MODEOFOPERATION': 'MODE_OF_OPERATION'})
         new_df['EMISSION_ACTIVITY_RATIO'] = pd.to_numeric(new_df['EMISSION_ACTIVITY_RATIO'], errors='coerce')
 
         return new_df
 
     def extract_emissions_penalty(self, year):
-        emissions_penalty_df = pd.read_excel(self.data_file_path, sheet_name="EmissionsPenalty")
+        emissions_penalty_df = self.data_store.read_excel(self.data_file_path, sheet_name="EmissionsPenalty")
         emissions_penalty_df['COUNTRY'] = emissions_penalty_df['EMISSION'].map(lambda x: x[:2])
         emissions_penalty_df['EMISSION'] = emissions_penalty_df['EMISSION'].map(lambda x: x[2:])
 
@@ -274,7 +294,7 @@ class localDataParserClass:
         return new_df
 
     def extract_annual_emission_limit(self, year):
-        annual_emission_limit_df = pd.read_excel(self.data_file_path, sheet_name="AnnualEmissionLimit")
+        annual_emission_limit_df = self.data_store.read_excel(self.data_file_path, sheet_name="AnnualEmissionLimit")
         annual_emission_limit_df['COUNTRY'] = annual_emission_limit_df['EMISSION'].map(lambda x: x[:2])
         annual_emission_limit_df['EMISSION'] = annual_emission_limit_df['EMISSION']
 
@@ -286,14 +306,14 @@ class localDataParserClass:
         return new_df
     
     def extract_technologies_per_country(self, impose_one_mode=False):
-        technologies_df = pd.read_excel(self.data_file_path, sheet_name="TECHNOLOGY", header=None)
+        technologies_df = self.data_store.read_excel(self.data_file_path, sheet_name="TECHNOLOGY", header=None)
         technologies_df['COUNTRY'] = technologies_df[0].map(lambda x: x[:2])
         technologies_df['TECHNOLOGY'] = technologies_df[0]
         technologies_df.drop(columns=[0], inplace=True)
-        timeslice_df = pd.read_excel(self.data_file_path, sheet_name="TIMESLICE", header=None)
+        timeslice_df = self.data_store.read_excel(self.data_file_path, sheet_name="TIMESLICE", header=None)
         timeslice_df['TIMESLICE'] = timeslice_df[0]
         timeslice_df.drop(columns=[0], inplace=True)
-        modeofoperation_df = pd.read_excel(self.data_file_path, sheet_name="MODE_OF_OPERATION", header=None)
+        modeofoperation_df = self.data_store.read_excel(self.data_file_path, sheet_name="MODE_OF_OPERATION", header=None)
         modeofoperation_df['MODE_OF_OPERATION'] = modeofoperation_df[0]
         modeofoperation_df.drop(columns=[0], inplace=True)
         if impose_one_mode:
@@ -310,7 +330,7 @@ class localDataParserClass:
         return completely_expanded_df[['COUNTRY', 'TECHNOLOGY', 'VARIABLE', 'MODE_OF_OPERATION']]
 
     def extract_output_activity_ratio(self, year):
-        technologies_df = pd.read_excel(self.data_file_path, sheet_name="OutputActivityRatio")
+        technologies_df = self.data_store.read_excel(self.data_file_path, sheet_name="OutputActivityRatio")
         technologies_df['COUNTRY'] = technologies_df['TECHNOLOGY'].map(lambda x: x[:2])
         technologies_df['TECHNOLOGY'] = technologies_df['TECHNOLOGY']
         technologies_df = technologies_df[['COUNTRY', 'TECHNOLOGY', 'FUEL', 'MODEOFOPERATION', year]].rename(columns={year: 'OUTPUT_ACTIVITY_RATIO', 'MODEOFOPERATION': 'MODE_OF_OPERATION'})
@@ -319,7 +339,7 @@ class localDataParserClass:
         return technologies_df
     
     def extract_input_activity_ratio(self, year):
-        technologies_df = pd.read_excel(self.data_file_path, sheet_name="InputActivityRatio")
+        technologies_df = self.data_store.read_excel(self.data_file_path, sheet_name="InputActivityRatio")
         technologies_df['COUNTRY'] = technologies_df['TECHNOLOGY'].map(lambda x: x[:2])
         technologies_df['TECHNOLOGY'] = technologies_df['TECHNOLOGY']
         technologies_df = technologies_df[['COUNTRY', 'TECHNOLOGY', 'FUEL', 'MODEOFOPERATION', year]].rename(columns={year: 'INPUT_ACTIVITY_RATIO', 'MODEOFOPERATION': 'MODE_OF_OPERATION'})
@@ -328,8 +348,21 @@ class localDataParserClass:
         return technologies_df
     
     def extract_fuels(self):
-        fuels_df = pd.read_excel(self.data_file_path, sheet_name="FUEL", header=None)
+        fuels_df = self.data_store.read_excel(self.data_file_path, sheet_name="FUEL", header=None)
         fuels_df['FUEL'] = fuels_df[0]
         fuels_df.drop(columns=[0], inplace=True)
         return fuels_df
 
+
+    def extract_interconnectors(self, file_path, unit='GW'):
+        """Returns the directed links FROM, TO of the interconnectors listed in a FROM,TO,CAPACITY csv file.
+        Every interconnector can be used both ways, the capacity of parallel ones being summed."""
+        interconnectors_df = self.data_store.read_csv(file_path)
+        interconnectors_df = interconnectors_df[['FROM', 'TO', 'CAPACITY']]
+        interconnectors_df = interconnectors_df[interconnectors_df['FROM'] != interconnectors_df['TO']]
+        reversed_df = interconnectors_df.rename(columns={'FROM': 'TO', 'TO': 'FROM'})
+
+        new_df = pd.concat([interconnectors_df, reversed_df]).groupby(['FROM', 'TO'], as_index=False)['CAPACITY'].sum()
+        new_df['CAPACITY'] = self.convert_fromGW_capacity_unit(pd.to_numeric(new_df['CAPACITY'], errors='coerce'), unit)
+
+        return new_df
@@ -0,0 +1,64 @@
+import json
+import math
+import os
+import xml.etree.ElementTree as ET
+
+class SolutionParserClass:
+    """Reads a FRODO2 solution file: the valuation and the value assigned to every variable.
+    The variables of an instance written in compact mode are decoded with its symbol table."""
+    def __init__(self, solution, symbol_table=None):
+        if isinstance(solution, str):
+            solution = ET.parse(solution).getroot()
+        self.solution = solution
+
+        variable_names = (symbol_table or {}).get("variables", {})
+        self.valuation = parse_valuation(solution.attrib.get("valuation"))
+        self.assignments = {}
+        for assignment in solution.iter("assignment"):
+            variable_name = assignment.attrib["variable"]
+            self.assignments[variable_names.get(variable_name, variable_name)] = int(assignment.attrib["value"])
+
+    def is_feasible(self):
+        """Returns False if the solver reported an infinite cost or assigned no variable."""
+        return self.valuation is not None and math.isfinite(self.valuation) and len(self.assignments) > 0
+
+def symbol_table_path(instance_file):
+    """Returns the path of the symbol table written next to an instance in compact mode."""
+    return f"{os.path.splitext(instance_file)[0]}_names.json"
+
+def load_symbol_table(instance_file):
+    """Returns the symbol table of an instance written in compact mode, or None."""
+    if not os.path.exists(symbol_table_path(instance_file)):
+        return None
+    with open(symbol_table_path(instance_file)) as file:
+        return json.load(file)
+
+def record_instance(solution_file, instance_file):
+    """Records the instance a solution was found for in its root, relative to the solution file, so that the
+    solution can be decoded with the symbol table of the instance whatever the files are named."""
+    tree = ET.parse(solution_file)
+    tree.getroot().attrib["instance"] = os.path.relpath(instance_file, os.path.dirname(os.path.abspath(solution_file)))
+    tree.write(solution_file, encoding="utf-8", xml_declaration=True)
+
+def solution_symbol_table(solution_file, solution=None):
+    """Returns the symbol table of the instance recorded in a solution, or None."""
+    if solution is None:
+        solution = ET.parse(solution_file).getroot()
+    instance_file = solution.attrib.get("instance")
+    if instance_file is None:
+        return None
+    return load_symbol_table(os.path.join(os.path.dirname(os.path.abspath(solution_file)), instance_file))
+
+def parse_valuation(text):
+    """Parses a valuation, including the infinity and -infinity of a violated hard constraint."""
+    if text is None:
+        return None
+    if text.lstrip("+-") == "infinity":
+        return -math.inf if text.startswith("-") else math.inf
+    return float(text)
+
+def format_valuation(valuation):
+    """Writes a valuation the way FRODO2 does, an infinite one as infinity or -infinity."""
+    if math.isinf(valuation):
+        return "infinity" if valuation > 0 else "-infinity"
+    return str(int(valuation)) if valuation == int(valuation) else str(valuation)
@@ -0,0 +1,91 @@
+import os
+
+class PathwayClass:
+    """Solves an energy model year after year, carrying the capacity built in every year over to the next ones.
+
+    The capacity a year installs above its lower bound is a vintage, in service until its operational life
+    is over. The vintages still in service in a year are added to its minimum capacities, and its capacity
+    domains are cut to window steps above the larger of the carried-over capacity and the previous solution,
+    so that the later years are solved on small domains with fixed lower bounds. A year the windows make
+    infeasible, e.g. because its demand grows faster than the windows, is solved again on the full domains.
+    """
+    def __init__(self, logger, model, solver, years, window=4):
+        if list(years) != sorted(set(years)):
+            raise ValueError(f"Pathway years must be increasing, got {years}")
+        self.logger = logger
+        self.model = model
+        self.solver = solver
+        self.years = list(years)
+        self.window = window
+        # (capacity variable, year built, capacity in MW) of the capacity installed by the solved years
+        self.vintages = []
+
+    def carried_capacity(self, year, operational_lives):
+        """Returns the capacity of every variable installed by the previous years and still in service in year."""
+        carried = {}
+        for variable_name, built, capacity in self.vintages:
+            if built + operational_lives.get(variable_name, float("inf")) > year:
+                carried[variable_name] = carried.get(variable_name, 0) + capacity
+        return carried
+
+    def capacity_windows(self, carried, assignments, step):
+        """Returns the (min, max) window of every capacity variable, from its carried-over capacity to window
+        steps above the larger of that capacity and its previous value."""
+        windows = {}
+        for variable_name, value in assignments.items():
+            if variable_name.endswith("_capacity"):
+                reference = max(value, carried.get(variable_name, 0))
+                windows[variable_name] = (carried.get(variable_name, 0), reference + self.window * step)
+        return windows
+
+    def record_vintages(self, year, assignments):
+        """Records the capacity installed in year above the minimum capacity of its variables."""
+        for variable_name, value in assignments.items():
+            if not variable_name.endswith("_capacity"):
+                continue
+            min_capacity, _ = self.model.capacity_bounds.get(variable_name, (None, None))
+            if value > (min_capacity or 0):
+                self.vintages.append((variable_name, year, value - (min_capacity or 0)))
+
+    def solve_year(self, year, windows, output_dir, name):
+        """Writes the instance of the model year with the given capacity windows and returns its solution."""
+        self.model.domain_windows = windows
+        self.model.reset_xml()
+        self.model.build_xml()
+        problem_file = os.path.join(output_dir, f"{name}.xml")
+        self.model.xml_generator.print_xml(output_file=problem_file)
+        self.logger.info(f"Pathway year {year} with {round(sum(self.model.carried_capacity.values()))} MW carried over written to {problem_file}")
+        return self.solver.solve(problem_file, os.path.join(output_dir, f"solution_{name}.xml"))
+
+    def run(self, output_dir):
+        """Solves every year and returns the {year: solution} of the years solved, stopping at the first infeasible one."""
+        os.makedirs(output_dir, exist_ok=True)
+        operational_lives = {
+            f"{row['TECHNOLOGY']}_capacity": row['OPERATIONAL_LIFETIME']
+            for index, row in self.model.data_parser.extract_technology_operational_life().dropna().iterrows()
+        }
+        step = self.model.generate_domains()["installable_capacity_domain"].step
+        first_year = self.model.year
+        solutions = {}
+        solution = None
+        try:
+            for year in self.years:
+                self.model.year = year
+                carried = self.carried_capacity(year, operational_lives)
+                self.model.carried_capacity = carried
+                windows = {} if solution is None else self.capacity_windows(carried, solution.assignments, step)
+
+                solution = self.solve_year(year, windows, output_dir, f"{self.model.name}_{year}")
+                if not solution.is_feasible() and windows:
+                    self.logger.info(f"Pathway year {year} infeasible within the capacity windows, solving it on the full domains")
+                    solution = self.solve_year(year, {}, output_dir, f"{self.model.name}_{year}_full")
+                if not solution.is_feasible():
+                    self.logger.warning(f"Pathway year {year} has no feasible solution, stopping the pathway")
+                    break
+                solutions[year] = solution
+                self.record_vintages(year, solution.assignments)
+        finally:
+            self.model.year = first_year
+            self.model.carried_capacity = {}
+            self.model.domain_windows = {}
+        return solutions
@@ -0,0 +1,172 @@
+import copy
+import fnmatch
+import os
+import re
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+from translation.xmlGenerator import bounded_domain_values, bounded_domain_name, merge_definitions
+
+SLOT_PATTERN = re.compile(r"@@(.+?)@@")
+DOMAINS_SLOT_PATTERN = re.compile(r'[ \t]*<domain name="@@domains@@"[^>]*/>')
+
+class ModelSkeletonClass:
+    """Serialized model structure in which only numeric parameters change between scenarios.
+
+    The instance is serialized once into a template with one slot per constraint parameter list,
+    one slot per bounded capacity variable domain and one slot for the bounded capacity domains.
+    A scenario only fills the slots, so no XML tree has to be built or indented again.
+
+    With deduplicate, the structurally identical definitions are merged in the template only: the
+    scenario rules keep matching the references and formal parameters of the generated instance.
+    """
+    def __init__(self, instance, capacity_domain_name, capacity_domain_values, capacity_bounds, deduplicate=False):
+        self.capacity_domain_name = capacity_domain_name
+        self.capacity_domain_values = list(capacity_domain_values)
+        self.capacity_bounds = dict(capacity_bounds)
+
+        instance = copy.deepcopy(instance)
+        self.formal_parameters = self.collect_formal_parameters(instance)
+
+        self.constraints = []
+        for constraint in instance.iter("constraint"):
+            parameters = constraint.find("parameters")
+            self.constraints.append((constraint.attrib["name"], constraint.attrib["reference"], parameters.text.split()))
+            parameters.text = f"@@constraint:{len(self.constraints) - 1}@@"
+        if deduplicate:
+            merge_definitions(instance)
+
+        # The bounded domains are replaced by a slot where the first of them was, which keeps the
+        # canonical (sorted by name) order of the domains
+        domains_element = instance.find("domains")
+        slot_position = None
+        for position, domain in reversed(list(enumerate(domains_element))):
+            if domain.attrib["name"].startswith(f"{capacity_domain_name}_"):
+                domains_element.remove(domain)
+                slot_position = position
+        if slot_position is None:
+            names = [domain.attrib["name"] for domain in domains_element]
+            slot_position = names.index(capacity_domain_name) + 1 if capacity_domain_name in names else len(names)
+        domains_element.insert(slot_position, ET.Element("domain", {"name": "@@domains@@"}))
+
+        self.capacity_variables = []
+        for variable in instance.iter("variable"):
+            if variable.attrib["domain"].startswith(capacity_domain_name):
+                self.capacity_variables.append(variable.attrib["name"])
+                variable.attrib["domain"] = f"@@variable:{variable.attrib['name']}@@"
+
+        tree = ET.ElementTree(instance)
+        ET.indent(tree, space="  ", level=0)
+        template = ET.tostring(instance, encoding="unicode")
+        self.domains_indent = re.search(r'([ \t]*)<domain name="@@domains@@"', template).group(1)
+        template = DOMAINS_SLOT_PATTERN.sub("@@domains@@", template)
+        self.template = SLOT_PATTERN.split(template)
+
+    def collect_formal_parameters(self, instance):
+        """Returns the formal parameter names of every predicate and function."""
+        formal_parameters = {}
+        for element in list(instance.iter("predicate")) + list(instance.iter("function")):
+            tokens = element.find("parameters").text.split()
+            formal_parameters[element.attrib["name"]] = tokens[1::2]
+        return formal_parameters
+
+    def scenario_parameters(self, scenario):
+        """Returns the parameter list of every constraint with the scenario multipliers and overrides applied."""
+        multipliers = scenario.get("parameters", {})
+        overrides = scenario.get("overrides", {})
+
+        constraint_parameters = []
+        for name, reference, tokens in self.constraints:
+            formal_parameters = self.formal_parameters.get(reference)
+            rules = [(rule, False) for pattern, rule in multipliers.items() if fnmatch.fnmatchcase(reference, pattern)]
+            rules += [(rule, True) for pattern, rule in overrides.items() if fnmatch.fnmatchcase(name, pattern)]
+            if not rules:
+                constraint_parameters.append(" ".join(tokens))
+                continue
+            if formal_parameters is None or len(formal_parameters) != len(tokens):
+                raise ValueError(f"Parameters of {name} do not match the definition of {reference}")
+
+            tokens = list(tokens)
+            for rule, is_override in rules:
+                for parameter, value in rule.items():
+                    position = formal_parameters.index(parameter)
+                    if is_override:
+                        tokens[position] = str(round(value))
+                    else:
+                        tokens[position] = str(round(float(tokens[position]) * value))
+            constraint_parameters.append(" ".join(tokens))
+        return constraint_parameters
+
+    def scenario_capacity_domains(self, scenario):
+        """Returns the bounded capacity domains and the domain of every capacity variable."""
+        bounds = dict(self.capacity_bounds)
+        for pattern, (min_value, max_value) in scenario.get("capacity_bounds", {}).items():
+            for variable_name in fnmatch.filter(self.capacity_variables, pattern):
+                previous_min, previous_max = bounds.get(variable_name, (None, None))
+                bounds[variable_name] = (
+                    previous_min if min_value is None else min_value,
+                    previous_max if max_value is None else max_value
+                )
+
+        bounded_domains = {}
+        variable_domains = {}
+        for variable_name in self.capacity_variables:
+            min_value, max_value = bounds.get(variable_name, (None, None))
+            values = bounded_domain_values(self.capacity_domain_values, min_value, max_value)
+            # Bounds leaving no value give the empty domain, as in XMLGeneratorClass.add_bounded_domains
+            if len(values) == len(self.capacity_domain_values):
+                variable_domains[variable_name] = self.capacity_domain_name
+                continue
+            name = bounded_domain_name(self.capacity_domain_name, values)
+            bounded_domains[name] = values
+            variable_domains[variable_name] = name
+        return bounded_domains, variable_domains
+
+    def render(self, scenario):
+        """Returns the XML document of a scenario."""
+        constraint_parameters = self.scenario_parameters(scenario)
+        bounded_domains, variable_domains = self.scenario_capacity_domains(scenario)
+        domains = "\n".join(
+            f'{self.domains_indent}<domain name="{name}" nbValues="{len(values)}">{" ".join(map(str, values))}</domain>'
+            for name, values in sorted(bounded_domains.items())
+        )
+
+        chunks = ["<?xml version='1.0' encoding='utf-8'?>\n"]
+        for index, chunk in enumerate(self.template):
+            if index % 2 == 0:
+                chunks.append(chunk)
+                continue
+            slot, _, key = chunk.partition(":")
+            if slot == "constraint":
+                chunks.append(constraint_parameters[int(key)])
+            elif slot == "variable":
+                chunks.append(variable_domains[key])
+            else:
+                chunks.append(domains)
+        return "".join(chunks)
+
+    def write(self, scenario, output_file):
+        """Writes the XML document of a scenario to a file."""
+        with open(output_file, "w", encoding="utf-8") as file:
+            file.write(self.render(scenario))
+        return output_file
+
+_worker_skeleton = None
+
+def _init_worker(skeleton):
+    global _worker_skeleton
+    _worker_skeleton = skeleton
+
+def _write_scenario(scenario_and_output_file):
+    scenario, output_file = scenario_and_output_file
+    return _worker_skeleton.write(scenario, output_file)
+
+def write_scenarios(skeleton, scenarios, output_dir, problem_name, max_workers=None):
+    """Writes every scenario in parallel, each worker process receiving the skeleton only once."""
+    os.makedirs(output_dir, exist_ok=True)
+    jobs = [(scenario, os.path.join(output_dir, f"{problem_name}_{scenario['name']}.xml")) for scenario in scenarios]
+
+    if max_workers == 1:
+        return [skeleton.write(scenario, output_file) for scenario, output_file in jobs]
+
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=(skeleton,)) as executor:
+        return list(executor.map(_write_scenario, jobs, chunksize=max(1, len(jobs) // (4 * (max_workers or os.cpu_count() or 1)))))
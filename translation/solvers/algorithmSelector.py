@@ -0,0 +1,118 @@
+import heapq
+import math
+from translation.parsers.instanceParser import InstanceParserClass
+
+DEFAULT_AGENTS = {
+    "DPOP": "agents/DPOP/DPOPagentJaCoP.xml",
+    "MB-DPOP": "agents/MB-DPOP/MB-DPOPagentJaCoP.xml",
+    "MaxSum": "agents/MaxSum/MaxSumAgentJaCoP.xml",
+    "MGM": "agents/MGM/MGMagentJaCoP.xml",
+}
+
+class AlgorithmSelectorClass:
+    """Picks the FRODO2 agent and the JVM heap of an instance from its structure.
+
+    The variables are eliminated in min-degree order on the primal graph (variables sharing a
+    constraint are neighbours). The largest product of the neighbour domain sizes met on the way
+    estimates the largest DPOP UTIL message, the number of neighbours the induced width.
+    - DPOP is chosen when that message fits in the heap, the heap being sized to the message.
+    - MB-DPOP when the message is too large but below 10^mbdpop_log10_limit entries.
+    - Max-Sum when every constraint table stays below 10^maxsum_log10_limit entries.
+    - MGM (local search) otherwise.
+    """
+    def __init__(self, logger, agents=None, min_heap_gb=2, max_heap_gb=8, bytes_per_entry=16, heap_overhead=4,
+                 mbdpop_log10_limit=12, maxsum_log10_limit=7):
+        self.logger = logger
+        self.agents = {**DEFAULT_AGENTS, **(agents or {})}
+        self.min_heap_gb = min_heap_gb
+        self.max_heap_gb = max_heap_gb
+        self.bytes_per_entry = bytes_per_entry
+        self.heap_overhead = heap_overhead
+        self.mbdpop_log10_limit = mbdpop_log10_limit
+        self.maxsum_log10_limit = maxsum_log10_limit
+
+    def inspect(self, instance):
+        """Returns the structural statistics of an instance (a path, an element or a parsed instance)."""
+        if not isinstance(instance, InstanceParserClass):
+            instance = InstanceParserClass(instance)
+
+        log_sizes = {
+            variable_name: math.log10(max(1, len(instance.domain_values(variable_name))))
+            for variable_name in instance.variables
+        }
+        scopes = [[variable_name for variable_name in constraint["scope"] if variable_name in log_sizes] for constraint in instance.constraints]
+        induced_width, log10_max_message = eliminate(log_sizes, scopes)
+
+        return {
+            "agents": len(instance.agents),
+            "variables": len(instance.variables),
+            "constraints": len(instance.constraints),
+            "max_domain_size": round(10 ** max(log_sizes.values(), default=0)),
+            "max_arity": max((len(scope) for scope in scopes), default=0),
+            "induced_width": induced_width,
+            "log10_max_message": log10_max_message,
+            "log10_max_constraint": max((sum(log_sizes[variable_name] for variable_name in scope) for scope in scopes), default=0),
+        }
+
+    def select(self, instance):
+        """Returns the agent file, heap size, algorithm, reason and statistics chosen for an instance."""
+        stats = self.inspect(instance)
+        max_heap_bytes = self.max_heap_gb * 1024 ** 3
+        log10_message_bytes = stats["log10_max_message"] + math.log10(self.bytes_per_entry * self.heap_overhead)
+
+        if log10_message_bytes <= math.log10(max_heap_bytes):
+            algorithm = "DPOP"
+            heap_gb = min(self.max_heap_gb, max(self.min_heap_gb, math.ceil(10 ** log10_message_bytes / 1024 ** 3)))
+            reason = f"largest UTIL message of 10^{stats['log10_max_message']:.1f} entries fits in {heap_gb}G"
+        elif stats["log10_max_message"] <= self.mbdpop_log10_limit:
+            algorithm = "MB-DPOP"
+            heap_gb = self.max_heap_gb
+            reason = f"largest UTIL message of 10^{stats['log10_max_message']:.1f} entries exceeds {self.max_heap_gb}G, memory-bounded"
+        elif stats["log10_max_constraint"] <= self.maxsum_log10_limit:
+            algorithm = "MaxSum"
+            heap_gb = self.max_heap_gb
+            reason = f"induced width {stats['induced_width']} too large for DPOP, constraint tables up to 10^{stats['log10_max_constraint']:.1f} entries"
+        else:
+            algorithm = "MGM"
+            heap_gb = self.min_heap_gb
+            reason = f"induced width {stats['induced_width']} and constraint tables up to 10^{stats['log10_max_constraint']:.1f} entries, local search"
+
+        choice = {
+            "algorithm": algorithm,
+            "agent_file": self.agents[algorithm],
+            "max_heap": f"{heap_gb}G",
+            "reason": reason,
+            "stats": stats,
+        }
+        self.logger.info(f"{algorithm} selected with {choice['max_heap']} heap: {reason}")
+        return choice
+
+def eliminate(log_sizes, scopes):
+    """Eliminates the variables in min-degree order and returns the induced width and the log10 of the largest message."""
+    neighbours = {variable_name: set() for variable_name in log_sizes}
+    for scope in scopes:
+        for variable_name in scope:
+            neighbours[variable_name].update(scope)
+    for variable_name in neighbours:
+        neighbours[variable_name].discard(variable_name)
+
+    heap = [(len(adjacent), variable_name) for variable_name, adjacent in neighbours.items()]
+    heapq.heapify(heap)
+    eliminated = set()
+    induced_width = 0
+    log10_max_message = 0
+    while heap:
+        degree, variable_name = heapq.heappop(heap)
+        if variable_name in eliminated or degree != len(neighbours[variable_name]):
+            continue
+        adjacent = neighbours.pop(variable_name)
+        eliminated.add(variable_name)
+        induced_width = max(induced_width, len(adjacent))
+        log10_max_message = max(log10_max_message, sum(log_sizes[neighbour] for neighbour in adjacent))
+
+        # The neighbours of an eliminated variable become a clique
+        for neighbour in adjacent:
+            neighbours[neighbour].discard(variable_name)
+            neighbours[neighbour].update(other for other in adjacent if other != neighbour)
+            heapq.heappush(heap, (len(neighbours[neighbour]), neighbour))
+    return induced_width, log10_max_message
@@ -0,0 +1,133 @@
+import os
+import subprocess
+import time
+from translation.parsers.solutionParser import SolutionParserClass, load_symbol_table, record_instance
+from translation.solvers.resultCache import ResultCacheClass, file_hash
+from translation.solvers.workerPool import SolverWorkerPoolClass, WorkerError
+from translation.solvers.algorithmSelector import AlgorithmSelectorClass
+from translation.solvers.resourceMonitor import HeapPredictorClass, ProcessMonitorClass
+
+class FrodoSolverClass:
+    """Runs the FRODO2 AgentFactory on a generated instance."""
+    def __init__(self, logger, agent_file='agents/DPOP/DPOPagentJaCoP.xml', timeout=60000, max_heap='8G',
+                 classpath='frodo2.18.1.jar:junit-4.13.2.jar:hamcrest-core-1.3.jar', cache=None, pool=None, selector=None, predictor=None):
+        self.logger = logger
+        self.cache = cache
+        self.pool = pool
+        self.selector = selector
+        self.predictor = predictor
+        self.agent_file = agent_file
+        self.timeout = timeout
+        self.max_heap = max_heap
+        self.classpath = classpath
+
+    def settings_for(self, problem_file):
+        """Returns the agent file and heap to solve a problem with, chosen by the selector if there is one.
+        The heap is then predicted from the resource history if there is a predictor."""
+        if self.selector is None:
+            settings = {'agent_file': self.agent_file, 'max_heap': self.max_heap}
+        else:
+            settings = self.selector.select(problem_file)
+        if self.predictor is not None:
+            if 'stats' not in settings:
+                settings['stats'] = AlgorithmSelectorClass(self.logger).inspect(problem_file)
+            settings['max_heap'] = self.predictor.heap_for(settings['stats'], settings['max_heap'])
+        return settings
+
+    def build_command(self, problem_file, output_file, settings=None):
+        settings = settings or {'agent_file': self.agent_file, 'max_heap': self.max_heap}
+        return [
+            'java',
+            f'-Xmx{settings["max_heap"]}',
+            '-cp',
+            self.classpath,
+            'frodo2.algorithms.AgentFactory',
+            '-timeout',
+            str(self.timeout),
+            problem_file,
+            settings['agent_file'],
+            '-o',
+            output_file
+        ]
+
+    def run_once(self, problem_file, output_file, settings=None):
+        """Launches a fresh JVM for a single problem, recording its resource usage if there is a predictor."""
+        start = time.monotonic()
+        process = subprocess.Popen(self.build_command(problem_file, output_file, settings), stdout=subprocess.PIPE,
+                                   stderr=subprocess.PIPE, text=True)
+        with ProcessMonitorClass(process.pid) as monitor:
+            _, stderr = process.communicate()
+        if settings is not None:
+            self.record_resources(settings, monitor.peak_rss, monitor.cpu_time, time.monotonic() - start,
+                                  'ok' if process.returncode == 0 else 'failed')
+        if process.returncode != 0:
+            raise RuntimeError(f"FRODO2 failed on {problem_file}:\n{stderr}")
+
+    def record_resources(self, settings, peak_rss, cpu_time, elapsed, status):
+        """Records the resources used by a run in the history of the heap predictor, if there is one."""
+        if self.predictor is not None and 'stats' in settings:
+            self.predictor.history.record(settings['stats'], peak_rss, cpu_time, elapsed, settings['max_heap'], status)
+
+    def cached_solution(self, problem_file, output_file, settings):
+        """Returns the cache key of a problem, None without a cache, and whether its solution was copied from
+        the cache to output_file."""
+        if self.cache is None:
+            return None, False
+        key = self.cache.key(problem_file, self.solver_config(settings))
+        return key, self.cache.get(key, output_file)
+
+    def store_solution(self, key, output_file):
+        """Stores a solution under the key returned by cached_solution."""
+        if key is not None:
+            self.cache.put(key, output_file)
+
+    def solver_config(self, settings=None):
+        """Returns everything besides the problem that can change the solution, the agent file by content.
+        The heap is left out: it decides whether a run succeeds, not the solution it finds, and the predicted
+        heap changes as the resource history grows."""
+        settings = settings or {'agent_file': self.agent_file, 'max_heap': self.max_heap}
+        agent_file = settings['agent_file']
+        return {
+            'agent': file_hash(agent_file) if os.path.exists(agent_file) else agent_file,
+            'timeout': self.timeout,
+            'classpath': self.classpath,
+        }
+
+    def solve(self, problem_file, output_file):
+        """Solves an instance and returns the parsed solution, from the cache if the same problem was solved before."""
+        settings = self.settings_for(problem_file)
+        key, cached = self.cached_solution(problem_file, output_file, settings)
+        if cached:
+            record_instance(output_file, problem_file)
+            return SolutionParserClass(output_file, load_symbol_table(problem_file))
+
+        self.logger.info(f"Solving {problem_file} with {settings['agent_file']} and {settings['max_heap']} heap")
+        if self.pool is None:
+            self.run_once(problem_file, output_file, settings)
+        else:
+            try:
+                self.pool.solve(problem_file, output_file, settings['agent_file'], self.timeout)
+            except WorkerError as error:
+                self.logger.warning(f"{error}, falling back to a one-shot launch")
+                self.run_once(problem_file, output_file, settings)
+
+        record_instance(output_file, problem_file)
+        self.store_solution(key, output_file)
+        return SolutionParserClass(output_file, load_symbol_table(problem_file))
+
+def create_solver(logger, solver_settings, cache_settings=None):
+    """Returns a FRODO2 solver from the solver section of the config, with a result cache if cache settings
+    are given, a pool of warm workers if the solver section has a worker entry, an algorithm selector
+    if it has a selection entry and a heap predictor if it has a prediction entry."""
+    solver_settings = dict(solver_settings)
+    worker_settings = solver_settings.pop('worker', None)
+    selection_settings = solver_settings.pop('selection', None)
+    prediction_settings = solver_settings.pop('prediction', None)
+    if worker_settings is not None and prediction_settings is not None:
+        raise ValueError("solver.worker and solver.prediction cannot be combined: warm workers keep the heap of their command, "
+                         "remove one of them")
+    cache = None if cache_settings is None else ResultCacheClass(logger=logger, **cache_settings)
+    pool = None if worker_settings is None else SolverWorkerPoolClass(logger=logger, **worker_settings)
+    selector = None if selection_settings is None else AlgorithmSelectorClass(logger=logger, **selection_settings)
+    predictor = None if prediction_settings is None else HeapPredictorClass(logger=logger, **prediction_settings)
+    return FrodoSolverClass(logger=logger, cache=cache, pool=pool, selector=selector, predictor=predictor, **solver_settings)
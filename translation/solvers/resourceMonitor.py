@@ -0,0 +1,155 @@
+import json
+import math
+import os
+import threading
+import time
+import numpy as np
+from translation.solvers.workerPool import process_rss
+
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+class ProcessMonitorClass:
+    """Samples the resident memory and CPU time of a running process from /proc in a background thread."""
+    def __init__(self, pid, interval=0.5):
+        self.pid = pid
+        self.interval = interval
+        self.peak_rss = None
+        self.cpu_time = None
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def run(self):
+        while not self.stopped.is_set():
+            self.sample()
+            self.stopped.wait(self.interval)
+
+    def sample(self):
+        rss = process_rss(self.pid)
+        if rss is not None:
+            self.peak_rss = max(self.peak_rss or 0, rss)
+        cpu_time = process_cpu_time(self.pid)
+        if cpu_time is not None:
+            self.cpu_time = cpu_time
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stopped.set()
+        self.thread.join()
+
+class ResourceHistoryClass:
+    """JSON lines history of the resources used by every solved instance, next to its structural statistics."""
+    def __init__(self, logger, path):
+        self.logger = logger
+        self.path = path
+        # Samples recorded by this process, for the predictor to refit when the history grows
+        self.records = 0
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    def record(self, stats, peak_rss, cpu_time, elapsed, max_heap, status):
+        sample = {
+            "stats": stats,
+            "peak_rss": peak_rss,
+            "cpu_time": cpu_time,
+            "elapsed": elapsed,
+            "max_heap": max_heap,
+            "status": status,
+            "time": time.time(),
+        }
+        with open(self.path, "a") as history:
+            history.write(json.dumps(sample) + "\n")
+        self.records += 1
+        self.logger.debug(f"Resource usage recorded: {peak_rss} bytes peak, {cpu_time} s CPU")
+
+    def samples(self):
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path) as history:
+            return [json.loads(line) for line in history if line.strip()]
+
+class HeapPredictorClass:
+    """Predicts the peak resident memory of an instance from the resource history of previous instances.
+
+    log10(peak RSS) is fitted by least squares on the log10 of the largest DPOP message, of the number
+    of variables and of the number of constraints of the successfully solved instances. The JVM heap is
+    the prediction times safety_factor. Below min_samples samples no prediction is made and the
+    configured heap is kept. The predictor is fitted again whenever samples were recorded since.
+    """
+    def __init__(self, logger, history_file='.cache/resource_history.jsonl', safety_factor=1.5, min_samples=5,
+                 min_heap_gb=1, max_heap_gb=8):
+        self.logger = logger
+        self.history = ResourceHistoryClass(logger, history_file)
+        self.safety_factor = safety_factor
+        self.min_samples = min_samples
+        self.min_heap_gb = min_heap_gb
+        self.max_heap_gb = max_heap_gb
+        self.coefficients = None
+        self.fitted_records = None
+
+    def fit(self):
+        """Fits the predictor on the history and returns False if there are not enough samples."""
+        self.fitted_records = self.history.records
+        samples = [sample for sample in self.history.samples() if sample["status"] == "ok" and sample["peak_rss"]]
+        if len(samples) < self.min_samples:
+            self.coefficients = None
+            return False
+        features = np.array([features_of(sample["stats"]) for sample in samples])
+        targets = np.log10([sample["peak_rss"] for sample in samples])
+        self.coefficients, *_ = np.linalg.lstsq(features, targets, rcond=None)
+        self.logger.info(f"Heap predictor fitted on {len(samples)} samples")
+        return True
+
+    def predict_rss(self, stats):
+        """Returns the predicted peak resident memory in bytes, or None if the predictor could not be fitted."""
+        if self.fitted_records != self.history.records:
+            self.fit()
+        if self.coefficients is None:
+            return None
+        return float(10 ** (np.array(features_of(stats)) @ self.coefficients))
+
+    def heap_for(self, stats, default):
+        """Returns the -Xmx value for an instance, the default one if no prediction can be made."""
+        predicted_rss = self.predict_rss(stats)
+        if predicted_rss is None:
+            return default
+        heap_gb = math.ceil(predicted_rss * self.safety_factor / 1024 ** 3)
+        return f"{min(self.max_heap_gb, max(self.min_heap_gb, heap_gb))}G"
+
+def features_of(stats):
+    return [
+        1.0,
+        min(stats["log10_max_message"], 30),
+        math.log10(max(1, stats["variables"])),
+        math.log10(max(1, stats["constraints"])),
+    ]
+
+def heap_bytes(heap):
+    """Converts a -Xmx value such as 512M or 8G to bytes."""
+    units = {"k": 1024, "m": 1024 ** 2, "g": 1024 ** 3}
+    heap = str(heap)
+    if heap[-1].lower() in units:
+        return int(float(heap[:-1]) * units[heap[-1].lower()])
+    return int(heap)
+
+def process_cpu_time(pid):
+    """Returns the user and system CPU seconds of a process, or None where /proc is not available."""
+    try:
+        with open(f"/proc/{pid}/stat") as stat:
+            fields = stat.read().rsplit(")", 1)[1].split()
+    except (OSError, IndexError):
+        return None
+    return (int(fields[11]) + int(fields[12])) / CLOCK_TICKS
+
+def available_memory():
+    """Returns the memory available on the node in bytes, or None where /proc is not available."""
+    try:
+        with open("/proc/meminfo") as meminfo:
+            for line in meminfo:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        return None
+    return None
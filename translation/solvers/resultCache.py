@@ -0,0 +1,66 @@
+import hashlib
+import json
+import os
+import shutil
+
+class ResultCacheClass:
+    """Local cache of solver outputs keyed by the problem content and the solver configuration.
+
+    Every entry is one solution file named after its key. Hits refresh the modification time of the
+    entry, which is the recency used to evict the least recently used entries above max_size bytes.
+    """
+    def __init__(self, logger, directory='.cache/solutions', max_size=512 * 1024 * 1024):
+        self.logger = logger
+        self.directory = directory
+        self.max_size = max_size
+        os.makedirs(self.directory, exist_ok=True)
+
+    def key(self, problem_file, solver_config):
+        """Returns the cache key of a problem solved with a solver configuration."""
+        digest = hashlib.sha256()
+        digest.update(file_hash(problem_file).encode())
+        digest.update(json.dumps(solver_config, sort_keys=True).encode())
+        return digest.hexdigest()
+
+    def entry_path(self, key):
+        return os.path.join(self.directory, f"{key}.xml")
+
+    def get(self, key, output_file):
+        """Copies the cached solution to output_file and returns True, or returns False on a miss."""
+        entry = self.entry_path(key)
+        if not os.path.exists(entry):
+            return False
+        shutil.copyfile(entry, output_file)
+        os.utime(entry)
+        self.logger.info(f"Solution {key[:12]} served from the cache")
+        return True
+
+    def put(self, key, solution_file):
+        """Stores a solution file and evicts the least recently used entries above the size bound."""
+        entry = self.entry_path(key)
+        temporary = f"{entry}.tmp"
+        shutil.copyfile(solution_file, temporary)
+        os.replace(temporary, entry)
+        self.evict()
+
+    def evict(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".xml"):
+                stat = os.stat(os.path.join(self.directory, name))
+                entries.append((stat.st_mtime, stat.st_size, name))
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            os.remove(os.path.join(self.directory, name))
+            total_size -= size
+            self.logger.debug(f"Evicted {name} from the solution cache")
+
+def file_hash(file_path):
+    """Returns the sha256 of a file, read in chunks as instances can be large."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
@@ -0,0 +1,202 @@
+import asyncio
+import re
+import statistics
+import time
+from collections import deque
+from translation.parsers.solutionParser import parse_valuation
+from translation.solvers.workerPool import process_rss
+from translation.solvers.resourceMonitor import process_cpu_time
+
+VALUATION_PATTERN = re.compile(r"(?:utility|cost|valuation)\s*[:=]\s*(-?infinity|-?[\d.]+(?:E-?\d+)?)", re.IGNORECASE)
+SOLVER_TIME_PATTERN = re.compile(r"finished in (\d+) ms", re.IGNORECASE)
+
+class SolverOrchestratorClass:
+    """Runs solver subprocesses concurrently on an asyncio event loop.
+
+    A job is a dictionary with a 'name' and a 'command' (argument list). The output of every job is
+    read line by line while it runs: every line is passed to on_progress and the reported valuation and
+    solver time are parsed. Jobs exceeding the wall-clock limit (seconds) or the memory limit (resident
+    bytes) are killed, independently of the -timeout given to FRODO2. Once half of the jobs are done,
+    stragglers running longer than straggler_factor times the median duration are killed as well. A caller
+    submitting jobs one by one as they become ready gives the number of jobs it will submit as
+    expected_jobs, so that the first jobs to end are not taken for the median of all of them.
+    on_result is called as soon as a job ends, so that its solution can be used while other jobs are
+    still running. With a memory budget (bytes), a job reserving 'memory' bytes only starts once the
+    reservations of the running jobs leave room for it, so that large instances run fewer at a time.
+    """
+    def __init__(self, logger, max_concurrency=2, wall_clock_limit=None, memory_limit=None, straggler_factor=None,
+                 poll_interval=1.0, on_progress=None, on_result=None, tail_lines=20, memory_budget=None,
+                 expected_jobs=0):
+        self.logger = logger
+        self.max_concurrency = max_concurrency
+        self.wall_clock_limit = wall_clock_limit
+        self.memory_limit = memory_limit
+        self.straggler_factor = straggler_factor
+        self.poll_interval = poll_interval
+        self.on_progress = on_progress
+        self.on_result = on_result
+        self.tail_lines = tail_lines
+        self.memory_budget = memory_budget
+        self.expected_jobs = expected_jobs
+        self.tasks = set()
+        self.semaphore = None
+        self.memory_available = None
+        self.reserved = 0
+        self.submitted = 0
+        self.durations = []
+
+    async def run(self, jobs):
+        """Runs the jobs of an iterable or asynchronous iterable as they arrive and returns their results in order."""
+        tasks = []
+        if hasattr(jobs, "__aiter__"):
+            async for job in jobs:
+                tasks.append(self.start(self.submit(job), job))
+        else:
+            for job in jobs:
+                tasks.append(self.start(self.submit(job), job))
+        return list(await asyncio.gather(*tasks))
+
+    async def submit(self, job):
+        """Runs a single job once fewer than max_concurrency jobs are running and returns its result. The
+        task awaiting it is tracked, so that cancel() reaches jobs submitted directly as well."""
+        self.submitted += 1
+        task = asyncio.current_task()
+        self.tasks.add(task)
+        if self.semaphore is None:
+            self.semaphore = asyncio.Semaphore(self.max_concurrency)
+        try:
+            async with self.semaphore:
+                memory = await self.reserve(job.get("memory", 0))
+                try:
+                    return await self.run_job(job)
+                finally:
+                    await self.free(memory)
+        finally:
+            self.tasks.discard(task)
+
+    async def reserve(self, memory):
+        """Waits until a job's memory fits in the budget; a job larger than the budget runs alone."""
+        if self.memory_budget is None:
+            return 0
+        if self.memory_available is None:
+            self.memory_available = asyncio.Condition()
+        async with self.memory_available:
+            await self.memory_available.wait_for(lambda: self.reserved == 0 or self.reserved + memory <= self.memory_budget)
+            self.reserved += memory
+        return memory
+
+    async def free(self, memory):
+        if self.memory_available is None:
+            return
+        async with self.memory_available:
+            self.reserved -= memory
+            self.memory_available.notify_all()
+
+    def start(self, coroutine, job):
+        task = asyncio.ensure_future(coroutine)
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+        self.logger.debug(f"Job {job['name']} queued")
+        return task
+
+    def cancel(self):
+        """Cancels every queued and running job, running processes being killed."""
+        for task in list(self.tasks):
+            task.cancel()
+
+    def run_jobs(self, jobs):
+        """Blocking entry point for callers that are not running an event loop."""
+        return asyncio.run(self.run(jobs))
+
+    async def run_job(self, job):
+        result = {
+            "name": job["name"],
+            "status": None,
+            "returncode": None,
+            "valuation": None,
+            "solver_time": None,
+            "peak_rss": None,
+            "cpu_time": None,
+            "started": time.time(),
+            "elapsed": None,
+            "output": deque(maxlen=self.tail_lines),
+        }
+        start = time.monotonic()
+        process = await asyncio.create_subprocess_exec(
+            *job["command"], stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT
+        )
+        self.logger.info(f"Job {job['name']} started as process {process.pid}")
+
+        reader = asyncio.ensure_future(self.read_output(job, process, result, start))
+        watchdog = asyncio.ensure_future(self.watch(process, result, start))
+        try:
+            done, _ = await asyncio.wait([reader, watchdog], timeout=self.wall_clock_limit, return_when=asyncio.FIRST_COMPLETED)
+            if reader in done:
+                result["returncode"] = await process.wait()
+                result["status"] = "ok" if result["returncode"] == 0 else "failed"
+            elif watchdog in done:
+                result["status"] = watchdog.result()
+            else:
+                result["status"] = "timeout"
+        except asyncio.CancelledError:
+            result["status"] = "cancelled"
+            raise
+        finally:
+            watchdog.cancel()
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+                result["returncode"] = process.returncode
+            reader.cancel()
+            result["elapsed"] = time.monotonic() - start
+            if result["status"] == "ok":
+                self.durations.append(result["elapsed"])
+            result["output"] = list(result["output"])
+            self.logger.info(f"Job {job['name']} {result['status']} after {result['elapsed']:.1f} s")
+            if self.on_result is not None and result["status"] != "cancelled":
+                self.on_result(job, result)
+        return result
+
+    async def read_output(self, job, process, result, start):
+        while True:
+            line = await process.stdout.readline()
+            if not line:
+                return
+            line = line.decode(errors="replace").rstrip()
+            result["output"].append(line)
+            parse_output_line(line, result)
+            if self.on_progress is not None:
+                self.on_progress(job, line, time.monotonic() - start)
+
+    async def watch(self, process, result, start):
+        """Returns 'memory' or 'straggler' once the process has to be killed, recording its peak resident memory and CPU time meanwhile."""
+        while process.returncode is None:
+            cpu_time = process_cpu_time(process.pid)
+            if cpu_time is not None:
+                result["cpu_time"] = cpu_time
+            rss = process_rss(process.pid)
+            if rss is not None:
+                result["peak_rss"] = max(result["peak_rss"] or 0, rss)
+                if self.memory_limit is not None and rss > self.memory_limit:
+                    self.logger.warning(f"Process {process.pid} uses {rss} bytes, above the limit of {self.memory_limit}")
+                    return "memory"
+            if self.is_straggler(time.monotonic() - start):
+                self.logger.warning(f"Process {process.pid} is a straggler after {time.monotonic() - start:.1f} s")
+                return "straggler"
+            await asyncio.sleep(self.poll_interval)
+        # The process ended, let the reader complete the job
+        await asyncio.Event().wait()
+
+    def is_straggler(self, elapsed):
+        if self.straggler_factor is None or not self.durations or len(self.durations) * 2 < max(self.submitted, self.expected_jobs):
+            return False
+        return elapsed > self.straggler_factor * statistics.median(self.durations)
+
+def parse_output_line(line, result):
+    """Records the valuation and the solver time reported on a line of solver output."""
+    valuation = VALUATION_PATTERN.search(line)
+    if valuation is not None:
+        result["valuation"] = parse_valuation(valuation.group(1).lower())
+    solver_time = SOLVER_TIME_PATTERN.search(line)
+    if solver_time is not None:
+        result["solver_time"] = int(solver_time.group(1)) / 1000
@@ -0,0 +1,167 @@
+import json
+import os
+import queue
+import selectors
+import subprocess
+import threading
+import time
+
+class WorkerError(RuntimeError):
+    """Raised when a worker dies, times out or breaks the protocol; the job can be retried elsewhere."""
+
+class SolverWorkerClass:
+    """A long-lived solver process speaking a JSON lines protocol over its stdin and stdout.
+
+    Every request is one line {"problem": ..., "output": ..., "agent": ..., "timeout": ...} and is
+    answered by one line {"status": "ok"} or {"status": "error", "message": ...}. A line
+    {"command": "exit"} asks the worker to stop.
+    """
+    def __init__(self, logger, command):
+        self.logger = logger
+        self.process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        self.buffer = b""
+        self.jobs = 0
+        self.logger.debug(f"Solver worker {self.process.pid} started")
+
+    def is_alive(self):
+        return self.process.poll() is None
+
+    def request(self, message, timeout):
+        """Sends a request and returns the decoded answer, raising WorkerError if none arrives in time."""
+        if not self.is_alive():
+            raise WorkerError(f"Solver worker {self.process.pid} exited with {self.process.returncode}")
+        try:
+            self.process.stdin.write(json.dumps(message).encode() + b"\n")
+            self.process.stdin.flush()
+        except OSError as error:
+            raise WorkerError(f"Solver worker {self.process.pid} does not accept requests: {error}")
+
+        line = self.read_line(timeout)
+        self.jobs += 1
+        try:
+            return json.loads(line)
+        except ValueError:
+            raise WorkerError(f"Solver worker {self.process.pid} answered {line!r}")
+
+    def read_line(self, timeout):
+        deadline = time.monotonic() + timeout
+        with selectors.DefaultSelector() as selector:
+            selector.register(self.process.stdout, selectors.EVENT_READ)
+            while b"\n" not in self.buffer:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not selector.select(remaining):
+                    raise WorkerError(f"Solver worker {self.process.pid} did not answer within {timeout} s")
+                chunk = os.read(self.process.stdout.fileno(), 65536)
+                if not chunk:
+                    raise WorkerError(f"Solver worker {self.process.pid} closed its output")
+                self.buffer += chunk
+        line, _, self.buffer = self.buffer.partition(b"\n")
+        return line.decode()
+
+    def rss(self):
+        return process_rss(self.process.pid)
+
+    def close(self):
+        if self.is_alive():
+            try:
+                self.process.stdin.write(json.dumps({"command": "exit"}).encode() + b"\n")
+                self.process.stdin.close()
+                self.process.wait(timeout=5)
+            except (OSError, subprocess.TimeoutExpired):
+                self.process.kill()
+                self.process.wait()
+        self.logger.debug(f"Solver worker {self.process.pid} stopped after {self.jobs} jobs")
+
+class SolverWorkerPoolClass:
+    """Pool of warm solver workers, started lazily and recycled after max_jobs jobs or above max_rss bytes.
+
+    The command starts a worker speaking the protocol of SolverWorkerClass. No FRODO2 worker ships with
+    the repository yet, only the stand-in of the tests. The -Xmx of a JVM worker is the heap of every job.
+    """
+    def __init__(self, logger, command, size=2, max_jobs=50, max_rss=None, timeout_margin=30):
+        self.logger = logger
+        self.command = command
+        self.size = size
+        self.max_jobs = max_jobs
+        self.max_rss = max_rss
+        self.timeout_margin = timeout_margin
+
+        self.idle = queue.Queue()
+        # Every running worker, idle or checked out, so that close stops them all
+        self.workers = set()
+        self.closed = False
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                if self.closed:
+                    raise WorkerError("Solver worker pool is closed")
+                if self.idle.empty() and len(self.workers) < self.size:
+                    try:
+                        worker = SolverWorkerClass(self.logger, self.command)
+                    except OSError as error:
+                        raise WorkerError(f"Solver worker could not be started: {error}")
+                    self.workers.add(worker)
+                    return worker
+            # Wait for a worker to be released, or for a stopped one to free its place
+            try:
+                return self.idle.get(timeout=1)
+            except queue.Empty:
+                continue
+
+    def release(self, worker, healthy):
+        """Returns a worker to the pool, or stops it if it failed or has to be recycled."""
+        rss = worker.rss() if healthy else None
+        with self.lock:
+            if not self.closed and healthy and worker.jobs < self.max_jobs and (self.max_rss is None or rss is None or rss < self.max_rss):
+                self.idle.put(worker)
+                return
+            self.workers.discard(worker)
+        worker.close()
+        if healthy:
+            self.logger.info(f"Solver worker {worker.process.pid} recycled after {worker.jobs} jobs ({rss} bytes resident)")
+
+    def solve(self, problem_file, output_file, agent_file, timeout):
+        """Solves a problem on a warm worker and returns its answer, timeout being the solver timeout in milliseconds."""
+        worker = self.acquire()
+        healthy = False
+        try:
+            answer = worker.request(
+                {"problem": problem_file, "output": output_file, "agent": agent_file, "timeout": timeout},
+                timeout / 1000 + self.timeout_margin
+            )
+            healthy = True
+        finally:
+            self.release(worker, healthy)
+        if answer.get("status") != "ok":
+            raise RuntimeError(f"Solver worker failed on {problem_file}: {answer.get('message')}")
+        return answer
+
+    def close(self):
+        """Stops every worker started by the pool, including the ones still solving a problem."""
+        with self.lock:
+            self.closed = True
+            workers = list(self.workers)
+            self.workers.clear()
+        while not self.idle.empty():
+            self.idle.get()
+        for worker in workers:
+            worker.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+def process_rss(pid):
+    """Returns the resident memory of a process in bytes, or None where /proc is not available."""
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        return None
+    return None
@@ -0,0 +1,141 @@
+import os
+import tempfile
+import unittest
+import pandas as pd
+from translation.agentFragments import add_agent_model, agent_data, generate_fragments
+from translation.xmlGenerator import XMLGeneratorClass
+from unittest.mock import MagicMock
+
+class TestAgentFragments(unittest.TestCase):
+
+    def setUp(self):
+        self.logger = MagicMock()
+
+    def fragment(self, agent, arity):
+        xml_generator = XMLGeneratorClass(self.logger)
+        xml_generator.add_variable_from_name(technologies=[f"{agent}COAL"], variables=[], agents=[agent])
+        xml_generator.add_predicate(name="withinMaxCapacity", parameters="int capacity int max_capacity", functional="le(capacity, max_capacity)")
+        xml_generator.add_constraint(
+            name=f"withinMaxCapacity_{agent}COAL_capacity",
+            arity=arity,
+            scope=f"{agent}COAL_capacity",
+            reference="withinMaxCapacity",
+            parameters=f"{agent}COAL_capacity 100"
+        )
+        return xml_generator.instance
+
+    def test_merge_fragment(self):
+        """Test if fragments are merged with shared predicates kept once and the max arity recomputed."""
+
+        xml_generator = XMLGeneratorClass(self.logger)
+        xml_generator.add_presentation(name="test", maximize="False")
+        xml_generator.add_agents(["ZA", "MZ"])
+        xml_generator.merge_fragment(self.fragment("ZA", 1))
+        xml_generator.merge_fragment(self.fragment("MZ", 3))
+
+        self.assertEqual([variable.attrib["name"] for variable in xml_generator.instance.find("variables")], ["ZACOAL_capacity", "MZCOAL_capacity"])
+        self.assertEqual(len(xml_generator.instance.find("predicates")), 1)
+        self.assertEqual(len(xml_generator.instance.find("constraints")), 2)
+        self.assertEqual(xml_generator.max_arity, 3)
+
+    def test_conflicting_fragments(self):
+        """Test if a predicate defined differently by two fragments is rejected."""
+
+        xml_generator = XMLGeneratorClass(self.logger)
+        xml_generator.merge_fragment(self.fragment("ZA", 1))
+        fragment = self.fragment("MZ", 1)
+        fragment.find("predicates/predicate/expression/functional").text = "ge(capacity, max_capacity)"
+        with self.assertRaises(ValueError):
+            xml_generator.merge_fragment(fragment)
+
+    def test_agent_data(self):
+        """Test if the rows of an agent are selected by country or by technology prefix."""
+
+        data = {
+            "selected_technologies": ["ZACOAL", "MZHYDRO"],
+            "timeslice_technologies_modes": ["S1_ZACOAL_1", "S1_MZHYDRO_1"],
+            "modes": [1],
+            "variable_domains": {},
+            "factors_df": pd.DataFrame({"COUNTRY": ["ZA", "ZA"], "TECHNOLOGY": ["ZACOAL", "MZHYDRO"]}),
+            "specified_annual_demand_df": pd.DataFrame({"COUNTRY": ["ZA", "MZ"]}),
+            "specified_demand_profile_df": pd.DataFrame({"COUNTRY": ["ZA", "MZ"]}),
+            "year_split_df": pd.DataFrame({"TIMESLICE": ["S1"]}),
+            "technology_parameters_df": pd.DataFrame({"COUNTRY": ["ZA", "MZ"], "TECHNOLOGY": ["ZACOAL", "MZHYDRO"]}),
+            "interconnectors_df": pd.DataFrame({"FROM": ["ZA", "MZ", "ZA"], "TO": ["MZ", "ZA", "BW"], "CAPACITY": [100, 100, 50]}),
+            "emission_factors_df": pd.DataFrame({"COUNTRY": ["ZA"], "TECHNOLOGY": ["ZACOAL"]}),
+            "emission_limits_df": pd.DataFrame({"COUNTRY": ["ZA"], "EMISSION": ["ZACO2"]}),
+        }
+        mz = agent_data(data, ["MZ"])
+        self.assertEqual(mz["selected_technologies"], ["MZHYDRO"])
+        self.assertEqual(mz["timeslice_technologies_modes"], ["S1_MZHYDRO_1"])
+        self.assertEqual(list(mz["factors_df"]["TECHNOLOGY"]), ["MZHYDRO"])
+        self.assertEqual(list(mz["specified_annual_demand_df"]["COUNTRY"]), ["MZ"])
+        self.assertEqual(list(mz["technology_parameters_df"]["TECHNOLOGY"]), ["MZHYDRO"])
+        self.assertEqual(list(mz["interconnectors_df"]["TO"]), ["MZ", "ZA"])
+        self.assertTrue(mz["emission_limits_df"].empty)
+
+    def test_parallel_build(self):
+        """Test if the fragments built in worker processes merge into the instance of the sequential build."""
+
+        data = {
+            "selected_technologies": ["ZACOAL", "MZHYDRO"],
+            "timeslice_technologies_modes": ["S1_ZACOAL_1", "S2_ZACOAL_1", "S1_MZHYDRO_1", "S2_MZHYDRO_1"],
+            "modes": [1],
+            "variable_domains": {"ZACOAL_capacity": "installable_capacity_domain_500_3000"},
+            "factors_df": pd.DataFrame({
+                "COUNTRY": ["ZA", "ZA", "MZ", "MZ"],
+                "TECHNOLOGY": ["ZACOAL", "ZACOAL", "MZHYDRO", "MZHYDRO"],
+                "TIMESLICE": ["S1", "S2", "S1", "S2"],
+                "CAPACITY_FACTOR": [0.9, 0.9, 0.5, 0.4],
+                "AVAILABILITY_FACTOR": [0.8, 0.8, 1.0, 1.0],
+                "CAPACITY_TO_ACTIVITY_UNIT": [31.536, 31.536, 31.536, 31.536],
+                "YEAR_SPLIT": [0.5, 0.5, 0.5, 0.5],
+            }),
+            "specified_annual_demand_df": pd.DataFrame({"FUEL": ["ELC", "ELC"], "COUNTRY": ["ZA", "MZ"], "SPECIFIED_ANNUAL_DEMAND": [900, 100]}),
+            "specified_demand_profile_df": pd.DataFrame({
+                "FUEL": ["ELC"] * 4,
+                "COUNTRY": ["ZA", "ZA", "MZ", "MZ"],
+                "TIMESLICE": ["S1", "S2", "S1", "S2"],
+                "SPECIFIED_DEMAND_PROFILE": [0.6, 0.4, 0.5, 0.5],
+            }),
+            "year_split_df": pd.DataFrame({"TIMESLICE": ["S1", "S2"], "YEAR_SPLIT": [0.5, 0.5]}),
+            "technology_parameters_df": pd.DataFrame({
+                "COUNTRY": ["ZA", "MZ"],
+                "TECHNOLOGY": ["ZACOAL", "MZHYDRO"],
+                "MIN_INSTALLED_CAPACITY": [500, 0],
+                "AMORTIZED_CAPITAL_COST": [120.4, 300.2],
+                "FIXED_COST": [40.1, 10.0],
+            }),
+            "interconnectors_df": pd.DataFrame({"FROM": ["ZA", "MZ"], "TO": ["MZ", "ZA"], "CAPACITY": [100, 100]}),
+            "emission_factors_df": pd.DataFrame({
+                "COUNTRY": ["ZA"], "TECHNOLOGY": ["ZACOAL"], "MODE_OF_OPERATION": [1], "EMISSION": ["ZACO2"], "EMISSION_ACTIVITY_RATIO": [0.09],
+            }),
+            "emission_limits_df": pd.DataFrame({"COUNTRY": ["ZA"], "EMISSION": ["ZACO2"], "DOMAIN": ["emission_domain_ZACO2"]}),
+        }
+
+        def skeleton():
+            xml_generator = XMLGeneratorClass(self.logger)
+            xml_generator.add_presentation(name="test", maximize="False")
+            xml_generator.add_agents(["ZA", "MZ"])
+            return xml_generator
+
+        sequential = skeleton()
+        add_agent_model(sequential, data, ["ZA", "MZ"])
+        parallel = skeleton()
+        for fragment in generate_fragments(data, ["ZA", "MZ"], max_workers=2):
+            parallel.merge_fragment(fragment)
+
+        self.assertGreater(len(parallel.instance.find("constraints")), 0)
+        self.assertEqual(parallel.max_arity, sequential.max_arity)
+        # The printed instances are canonical, the variables of the agents being added in another order
+        with tempfile.TemporaryDirectory() as directory:
+            outputs = []
+            for name, xml_generator in [("sequential", sequential), ("parallel", parallel)]:
+                output_file = os.path.join(directory, f"{name}.xml")
+                xml_generator.print_xml(output_file)
+                with open(output_file, "rb") as file:
+                    outputs.append(file.read())
+        self.assertEqual(outputs[0], outputs[1])
+
+if __name__ == '__main__':
+    unittest.main()
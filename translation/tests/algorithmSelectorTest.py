@@ -0,0 +1,52 @@
+import unittest
+from translation.xmlGenerator import XMLGeneratorClass
+from translation.solvers.algorithmSelector import AlgorithmSelectorClass, eliminate
+from unittest.mock import MagicMock
+
+import xml.etree.ElementTree as ET
+
+class TestAlgorithmSelectorClass(unittest.TestCase):
+
+    def setUp(self):
+        self.logger = MagicMock()
+        self.selector = AlgorithmSelectorClass(self.logger)
+
+    def build_instance(self, technologies, capacity_domain):
+        xml_generator = XMLGeneratorClass(self.logger)
+        xml_generator.add_presentation("selection", 'False')
+        xml_generator.add_agents(["ZA"])
+        xml_generator.add_domains({"installable_capacity_domain": capacity_domain})
+        xml_generator.add_variable_from_name(technologies, [], ["ZA"])
+        # A chain of pairwise constraints has an induced width of one
+        for first, second in zip(technologies, technologies[1:]):
+            xml_generator.add_constraint(
+                name=f"pair_{first}_{second}", arity=2, scope=f"{first}_capacity {second}_capacity",
+                reference="pair", parameters=f"{first}_capacity {second}_capacity"
+            )
+        return xml_generator.instance
+
+    def test_eliminate(self):
+        """Test if the induced width of a cycle of four variables is two."""
+
+        log_sizes = {name: 1 for name in "abcd"}
+        self.assertEqual(eliminate(log_sizes, [["a", "b"], ["b", "c"], ["c", "d"], ["d", "a"]]), (2, 2))
+
+    def test_small_instance(self):
+        """Test if exact DPOP is kept with a small heap for a chain of small domains."""
+
+        choice = self.selector.select(self.build_instance(["ZAWINDP00X", "ZANGCCP03N", "ZAHYDMS03X"], range(0, 4000, 500)))
+        self.assertEqual((choice["algorithm"], choice["max_heap"]), ("DPOP", "2G"))
+        self.assertEqual(choice["stats"]["induced_width"], 1)
+
+    def test_wide_instance(self):
+        """Test if a constraint over many large domains leads to local search."""
+
+        instance = self.build_instance([f"ZATECH{index:02d}" for index in range(12)], range(0, 40000, 10))
+        variables = " ".join(f"ZATECH{index:02d}_capacity" for index in range(12))
+        ET.SubElement(instance.find("constraints"), "constraint", {"name": "all", "arity": "12", "scope": variables, "reference": "all"})
+        choice = self.selector.select(instance)
+        self.assertEqual(choice["algorithm"], "MGM")
+        self.assertEqual(choice["stats"]["induced_width"], 11)
+
+if __name__ == '__main__':
+    unittest.main()
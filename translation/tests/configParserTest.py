@@ -0,0 +1,40 @@
+import os
+import tempfile
+import unittest
+from translation.parsers.configParser import ConfigParserClass, parse_override
+
+class TestConfigParserClass(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.config_file = os.path.join(self.directory.name, "config.yaml")
+        with open(self.config_file, "w") as file:
+            file.write("config:\n  name: ZA_limited\n  outline:\n    countries:\n    - ZA\n    year: 2030\n")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_overrides(self):
+        """Test if command line overrides replace entries and create the missing sections."""
+
+        overrides = dict(parse_override(assignment) for assignment in ["outline.countries=[ZA, MZ]", "outline.year=2040", "generation.max_workers=2"])
+        config_parser = ConfigParserClass(file_path=self.config_file, overrides=overrides)
+        self.assertEqual(config_parser.get_countries(), ["ZA", "MZ"])
+        self.assertEqual(config_parser.get_year(), 2040)
+        self.assertEqual(config_parser.get_generation(), {"max_workers": 2})
+        self.assertEqual(config_parser.get_problem_name(), "ZA_limited")
+
+        with self.assertRaises(ValueError):
+            parse_override("outline.year")
+
+    def test_pathway_defaults(self):
+        """Test if a pathway section without years solves the year of the outline."""
+
+        self.assertEqual(ConfigParserClass(file_path=self.config_file).get_pathway(), {"years": [2030]})
+        config_parser = ConfigParserClass(file_path=self.config_file, overrides={"outline.pathway.window": 2})
+        self.assertEqual(config_parser.get_pathway(), {"years": [2030], "window": 2})
+        config_parser = ConfigParserClass(file_path=self.config_file, overrides={"outline.pathway.years": [2030, 2040]})
+        self.assertEqual(config_parser.get_pathway(), {"years": [2030, 2040]})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import os
+import tempfile
+import unittest
+import pandas as pd
+from translation.parsers.dataStore import DataStoreClass
+from translation.parsers.localDataParser import localDataParserClass
+from unittest.mock import MagicMock, patch
+
+class TestDataStoreClass(unittest.TestCase):
+
+    def setUp(self):
+        self.logger = MagicMock()
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, name, content):
+        path = os.path.join(self.directory.name, name)
+        with open(path, "w") as file:
+            file.write(content)
+        return path
+
+    def test_read_once(self):
+        """Test if a table is parsed once per store, handed out as copies and reused from disk by a new store."""
+
+        path = self.write("table.csv", "a,b\n1,2\n")
+        cache_directory = os.path.join(self.directory.name, "cache")
+        store = DataStoreClass(self.logger, directory=cache_directory)
+        with patch("translation.parsers.dataStore.pd.read_csv", wraps=pd.read_csv) as read_csv:
+            table = store.read_csv(path)
+            table["a"] = 10
+            self.assertEqual(store.read_csv(path)["a"].tolist(), [1])
+            self.assertEqual(DataStoreClass(self.logger, directory=cache_directory).read_csv(path)["a"].tolist(), [1])
+            self.assertEqual(read_csv.call_count, 1)
+
+            # A modified file is read again
+            os.utime(path, ns=(0, 0))
+            DataStoreClass(self.logger, directory=cache_directory).read_csv(path)
+            self.assertEqual(read_csv.call_count, 2)
+
+    def test_local_data_parser(self):
+        """Test if the legacy powerplant and demand queries are answered from the indexed tables."""
+
+        powerplants_file = self.write("powerplants.csv", "id,Name,Fueltype,Country,Capacity,DateIn,DateOut\n"
+                                                         "0,a,Hydro,ZA,100,2000,2050\n1,b,Hard Coal,ZA,50,2010,2040\n"
+                                                         "2,c,Hard Coal,ZA,30,2025,2060\n3,d,Hydro,MZ,70,1990,2025\n")
+        demand_file = self.write("demand.csv", "region;2030;2040\nZA01;31.536;63.072\nMZ01;3.1536;6.3072\nZM01;1;1\n")
+        with patch("translation.parsers.localDataParser.POWERPLANTS_FILE_PATH", powerplants_file), \
+             patch("translation.parsers.localDataParser.DEMAND_FILE_PATH", demand_file):
+            parser = localDataParserClass(self.logger)
+
+            powerplants = parser.get_already_installed_powerplants_data(["ZA", "MZ"])
+            self.assertEqual(sorted(zip(powerplants["fueltype"], powerplants["country"], powerplants["already_installed_capacity"])),
+                             [("HardCoal", "ZA", 50), ("Hydro_RunOfRiver", "ZA", 100)])
+            powerplants = parser.get_already_installed_powerplants_data(["MZ"], commissioned_by=2000, in_service_year=2020)
+            self.assertEqual(powerplants["already_installed_capacity"].tolist(), [70])
+
+            demand = parser.get_annual_demand_data("2030", ["ZA", "MZ"])
+            self.assertEqual(demand.columns.tolist(), ["annual_demand_2030_GW", "country"])
+            self.assertEqual(demand.values.tolist(), [[1.0, "ZA"], [0.1, "MZ"]])
+            self.assertEqual(parser.get_annual_demand_data(2040, ["ZA"]).values.tolist(), [[2.0, "ZA"]])
+
+if __name__ == '__main__':
+    unittest.main()
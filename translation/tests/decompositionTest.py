@@ -0,0 +1,110 @@
+import itertools
+import os
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+from translation.decomposition import DecompositionClass, master_instance, subproblem_components, subproblem_instance
+from translation.feasibilityChecker import FeasibilityCheckerClass
+from translation.parsers.instanceParser import InstanceParserClass
+from translation.parsers.solutionParser import SolutionParserClass
+from translation.xmlGenerator import XMLGeneratorClass, add, boolean_ge, boolean_le, mul
+from unittest.mock import MagicMock
+
+class BruteForceSolver:
+    """Assigns the smallest values, by total, satisfying the hard constraints of a small instance."""
+    def __init__(self):
+        self.problems = []
+
+    def solve(self, problem_file, output_file):
+        self.problems.append(os.path.basename(problem_file))
+        instance = InstanceParserClass(problem_file)
+        checker = FeasibilityCheckerClass(MagicMock(), instance)
+        names = list(instance.variables)
+        candidates = sorted(itertools.product(*[instance.domain_values(name) for name in names]), key=sum)
+        solution = ET.Element("solution", {"valuation": "infinity"})
+        for values in candidates:
+            if checker.is_feasible(bounds={name: [value, value] for name, value in zip(names, values)}):
+                solution.attrib["valuation"] = "0"
+                for name, value in zip(names, values):
+                    ET.SubElement(solution, "assignment", {"variable": name, "value": str(value)})
+                break
+        return SolutionParserClass(solution)
+
+class TestDecompositionClass(unittest.TestCase):
+
+    def setUp(self):
+        self.logger = MagicMock()
+        xml_generator = XMLGeneratorClass(self.logger)
+        xml_generator.add_presentation("ZA", "False")
+        xml_generator.add_agents(["ZA"])
+        xml_generator.add_domains({"installable_capacity_domain": range(0, 3000, 500), "rate_activity_domain": range(0, 60, 10)})
+        xml_generator.add_variable_from_name(technologies=["ZACOAL"], variables=["S1_ZACOAL_1", "S2_ZACOAL_1"], agents=["ZA"])
+        xml_generator.add_predicate("maximumRate", "int rate int capacity int factor", boolean_le(mul("rate", "factor"), "capacity"))
+        xml_generator.add_predicate("demand", "int rate int demand", boolean_ge("rate", "demand"))
+        for timeslice, demand in [("S1", 20), ("S2", 40)]:
+            xml_generator.add_constraint(f"maximumRate_{timeslice}", 2, f"{timeslice}_ZACOAL_1_rateActivity ZACOAL_capacity", "maximumRate", f"{timeslice}_ZACOAL_1_rateActivity ZACOAL_capacity 50")
+            xml_generator.add_constraint(f"demand_{timeslice}", 1, f"{timeslice}_ZACOAL_1_rateActivity", "demand", f"{timeslice}_ZACOAL_1_rateActivity {demand}")
+        self.instance = xml_generator.instance
+
+    def test_split(self):
+        """Test if the timeslices are independent subproblems once the capacities are fixed."""
+
+        self.assertEqual(subproblem_components(self.instance), [["S1_ZACOAL_1_rateActivity"], ["S2_ZACOAL_1_rateActivity"]])
+
+        master = master_instance(self.instance, [{"ZACOAL_capacity": 1000}], "ZA_master")
+        self.assertEqual([variable.attrib["name"] for variable in master.find("variables")], ["ZACOAL_capacity"])
+        cut = master.find("constraints/constraint")
+        self.assertEqual(cut.attrib["reference"], "capacityCut_1")
+        self.assertEqual(cut.find("parameters").text, "ZACOAL_capacity 1000")
+
+        subproblem = subproblem_instance(self.instance, ["S2_ZACOAL_1_rateActivity"], {"ZACOAL_capacity": 1500}, "ZA_sub")
+        self.assertEqual([constraint.attrib["name"] for constraint in subproblem.find("constraints")], ["maximumRate_S2", "demand_S2"])
+        self.assertEqual(subproblem.find("variables/variable[@name='ZACOAL_capacity']").attrib["domain"], "fixed_1500")
+
+    def test_run(self):
+        """Test if capacity cuts are added until every dispatch subproblem is feasible."""
+
+        solver = BruteForceSolver()
+        with tempfile.TemporaryDirectory() as directory:
+            problem_file = os.path.join(directory, "ZA.xml")
+            ET.ElementTree(self.instance).write(problem_file)
+            solution = DecompositionClass(self.logger, solver, max_workers=2).run(problem_file, os.path.join(directory, "decomposition"))
+
+        # 40 units in S2 need 2000 of capacity, which the propagation of the demand gives the first master problem
+        self.assertEqual(solution.assignments, {"ZACOAL_capacity": 2000, "S1_ZACOAL_1_rateActivity": 20, "S2_ZACOAL_1_rateActivity": 40})
+        self.assertEqual([problem for problem in solver.problems if "master" in problem], ["ZA_master0.xml"])
+
+    def test_run_shared_demand(self):
+        """Test if lifted cuts converge when two technologies share the demand, so no capacity has a lower bound."""
+
+        xml_generator = XMLGeneratorClass(self.logger)
+        xml_generator.add_presentation("ZA", "False")
+        xml_generator.add_agents(["ZA"])
+        xml_generator.add_domains({"installable_capacity_domain": range(0, 3000, 500), "rate_activity_domain": range(0, 60, 10)})
+        xml_generator.add_variable_from_name(
+            technologies=["ZACOAL", "ZAGAS"],
+            variables=["S1_ZACOAL_1", "S2_ZACOAL_1", "S1_ZAGAS_1", "S2_ZAGAS_1"],
+            agents=["ZA"]
+        )
+        xml_generator.add_predicate("maximumRate", "int rate int capacity int factor", boolean_le(mul("rate", "factor"), "capacity"))
+        xml_generator.add_predicate("demand", "int rate_0 int rate_1 int demand", boolean_ge(add("rate_0", "rate_1"), "demand"))
+        for timeslice, demand in [("S1", 20), ("S2", 50)]:
+            for technology in ["ZACOAL", "ZAGAS"]:
+                rate = f"{timeslice}_{technology}_1_rateActivity"
+                xml_generator.add_constraint(f"maximumRate_{timeslice}_{technology}", 2, f"{rate} {technology}_capacity", "maximumRate", f"{rate} {technology}_capacity 50")
+            rates = f"{timeslice}_ZACOAL_1_rateActivity {timeslice}_ZAGAS_1_rateActivity"
+            xml_generator.add_constraint(f"demand_{timeslice}", 2, rates, "demand", f"{rates} {demand}")
+
+        solver = BruteForceSolver()
+        with tempfile.TemporaryDirectory() as directory:
+            problem_file = os.path.join(directory, "ZA.xml")
+            ET.ElementTree(xml_generator.instance).write(problem_file)
+            solution = DecompositionClass(self.logger, solver).run(problem_file, os.path.join(directory, "decomposition"))
+
+        # 50 units in S2 need 2500 of capacity in total, one step per capacity and per cut would not converge
+        # within the 12 capacity values
+        self.assertEqual(solution.assignments["ZACOAL_capacity"] + solution.assignments["ZAGAS_capacity"], 2500)
+        self.assertEqual([problem for problem in solver.problems if "master" in problem], [f"ZA_master{iteration}.xml" for iteration in range(6)])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+import math
+from translation.domainRefinement import DomainRefinementClass, solution_windows, intersect_bounds
+from translation.parsers.solutionParser import SolutionParserClass
+from unittest.mock import MagicMock
+
+import xml.etree.ElementTree as ET
+
+class TestDomainRefinementClass(unittest.TestCase):
+
+    def setUp(self):
+        self.logger = MagicMock()
+        self.model = MagicMock()
+        self.model.generate_domains.return_value = {
+            "rate_activity_domain": range(0, 2000000, 5000),
+            "installable_capacity_domain": range(0, 40000, 500),
+        }
+
+    def test_levels(self):
+        """Test if the steps are divided by the factor until the target steps are reached."""
+
+        refinement = DomainRefinementClass(self.logger, self.model, solver=MagicMock(), factor=5,
+                                           target_steps={"rate_activity_domain": 200, "installable_capacity_domain": 50})
+        self.assertEqual(refinement.levels(), [
+            {"rate_activity_domain": 5000, "installable_capacity_domain": 500},
+            {"rate_activity_domain": 1000, "installable_capacity_domain": 100},
+            {"rate_activity_domain": 200, "installable_capacity_domain": 50},
+        ])
+
+    def test_default_levels(self):
+        """Test if the steps are divided by the factor twice without target steps."""
+
+        refinement = DomainRefinementClass(self.logger, self.model, solver=MagicMock(), factor=5,
+                                           target_steps={"installable_capacity_domain": 250})
+        self.assertEqual(refinement.levels(), [
+            {"rate_activity_domain": 5000, "installable_capacity_domain": 500},
+            {"rate_activity_domain": 1000, "installable_capacity_domain": 250},
+            {"rate_activity_domain": 200, "installable_capacity_domain": 250},
+        ])
+
+    def test_windows(self):
+        """Test if the windows are centered on the previous solution and intersected with the capacity bounds."""
+
+        windows = solution_windows(
+            {"ZAWINDP00X_capacity": 1500, "S1D1_ZAWINDP00X_1_rateActivity": 0},
+            {"rate_activity_domain": 5000, "installable_capacity_domain": 500},
+            window=2
+        )
+        self.assertEqual(windows, {"ZAWINDP00X_capacity": (500, 2500), "S1D1_ZAWINDP00X_1_rateActivity": (-10000, 10000)})
+        self.assertEqual(
+            intersect_bounds({"ZAWINDP00X_capacity": (1000, None), "ZANGCCP03N_capacity": (0, 3000)}, windows),
+            {"ZAWINDP00X_capacity": (1000, 2500), "ZANGCCP03N_capacity": (0, 3000), "S1D1_ZAWINDP00X_1_rateActivity": (-10000, 10000)}
+        )
+
+    def test_solution_parser(self):
+        """Test if the assignments and an infinite valuation are read from a solution."""
+
+        solution = SolutionParserClass(ET.fromstring(
+            '<solution valuation="-infinity"><assignment variable="ZAWINDP00X_capacity" value="1500" /></solution>'
+        ))
+        self.assertEqual(solution.assignments, {"ZAWINDP00X_capacity": 1500})
+        self.assertEqual(solution.valuation, -math.inf)
+        self.assertFalse(solution.is_feasible())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,10 @@
 import unittest
+import pandas as pd
 from translation.energyModel import EnergyModelClass
+from translation.parsers.osemosysDataParser import localDataParserClass
+from translation.xmlGenerator import XMLGeneratorClass
 from translation.tests.xmlGeneratorTest import to_pretty_xml
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
 class TestEnergyModelClass(unittest.TestCase):
     def setUp(self):
@@ -12,4 +15,153 @@ class TestEnergyModelClass(unittest.TestCase):
     
 
 
-    
\ No newline at end of file
+    
+class TestCollectFactors(unittest.TestCase):
+    def setUp(self):
+        self.model = EnergyModelClass.__new__(EnergyModelClass)
+        self.model.countries = ["ZA", "MZ"]
+        self.model.year = 2030
+        self.model.power_tech = []
+        self.model.filter_data = lambda data, only_powerplants=True: data
+        self.model.data_parser = MagicMock()
+        self.model.data_parser.extract_capacity_factors.return_value = pd.DataFrame({
+            "COUNTRY": ["ZA", "ZA", "MZ"],
+            "TECHNOLOGY": ["ZACOAL", "ZACOAL", "MZHYDRO"],
+            "TIMESLICE": ["S1", "S2", "S1"],
+            "CAPACITY_FACTOR": [0.5, 0.6, 0.4],
+        })
+        self.model.data_parser.extract_availability_factors.return_value = pd.DataFrame({
+            "COUNTRY": ["ZA"], "TECHNOLOGY": ["ZACOAL"], "AVAILABILITY_FACTOR": [0.9],
+        })
+        self.model.data_parser.extract_capacity_to_activity_unit.return_value = pd.DataFrame({
+            "COUNTRY": ["MZ"], "TECHNOLOGY": ["MZHYDRO"], "CAPACITY_TO_ACTIVITY_UNIT": [30.0],
+        })
+        self.model.data_parser.extract_year_split.return_value = pd.DataFrame({
+            "TIMESLICE": ["S1", "S2"], "YEAR_SPLIT": [0.3, 0.7],
+        })
+        self.model.data_parser.extract_capital_costs.return_value = pd.DataFrame({
+            "COUNTRY": ["ZA", "MZ"], "TECHNOLOGY": ["ZACOAL", "MZHYDRO"], "CAPITAL_COST": [3000.0, 1e12],
+        })
+        self.model.data_parser.extract_technology_operational_life.return_value = pd.DataFrame({
+            "COUNTRY": ["ZA", "MZ"], "TECHNOLOGY": ["ZACOAL", "MZHYDRO"], "OPERATIONAL_LIFETIME": [30, 50],
+        })
+        self.model.data_parser.extract_fixed_costs.return_value = pd.DataFrame({
+            "COUNTRY": ["ZA"], "TECHNOLOGY": ["ZACOAL"], "FIXED_COST": [40.0],
+        })
+        self.residual_capacity_df = pd.DataFrame({
+            "COUNTRY": ["ZA"], "TECHNOLOGY": ["ZACOAL"], "MIN_INSTALLED_CAPACITY": [1500.0],
+        })
+
+    def test_collect_technology_parameters(self):
+        """Test if every technology gets its parameters in its own country, costs clipped and missing ones defaulted."""
+
+        parameters_df = self.model.collect_technology_parameters(["ZACOAL", "MZHYDRO", "MZSOLAR"], self.residual_capacity_df)
+
+        self.assertEqual(list(zip(parameters_df["COUNTRY"], parameters_df["TECHNOLOGY"])), [("ZA", "ZACOAL"), ("MZ", "MZHYDRO"), ("MZ", "MZSOLAR")])
+        self.assertEqual(list(parameters_df["MIN_INSTALLED_CAPACITY"]), [1500, 0, 0])
+        self.assertEqual(list(parameters_df["AMORTIZED_CAPITAL_COST"]), [100, 2**31 - 1, 4999])
+        self.assertEqual(list(parameters_df["FIXED_COST"]), [40, 4999, 4999])
+
+    def test_collect_factors(self):
+        """Test if only the technologies of each country are expanded to every timeslice, with default factors."""
+
+        factors_df = self.model.collect_factors(self.model.collect_technology_parameters(["ZACOAL", "MZHYDRO", "MZSOLAR"], self.residual_capacity_df))
+
+        self.assertEqual(
+            list(zip(factors_df["COUNTRY"], factors_df["TECHNOLOGY"], factors_df["TIMESLICE"])),
+            [("ZA", "ZACOAL", "S1"), ("ZA", "ZACOAL", "S2"), ("MZ", "MZHYDRO", "S1"), ("MZ", "MZHYDRO", "S2"), ("MZ", "MZSOLAR", "S1"), ("MZ", "MZSOLAR", "S2")]
+        )
+        self.assertEqual(list(factors_df["CAPACITY_FACTOR"]), [0.5, 0.6, 0.4, 0, 0, 0])
+        self.assertEqual(list(factors_df["AVAILABILITY_FACTOR"]), [0.9, 0.9, 1, 0, 0, 0])
+        self.assertEqual(list(factors_df["CAPACITY_TO_ACTIVITY_UNIT"]), [31.536, 31.536, 30.0, 31.536, 31.536, 31.536])
+        self.assertEqual(list(factors_df["YEAR_SPLIT"]), [1/3, 1/1, 1/3, 1/1, 1/3, 1/1])
+
+class TestSelectTechnologies(unittest.TestCase):
+    def setUp(self):
+        self.model = EnergyModelClass.__new__(EnergyModelClass)
+        self.model.logger = MagicMock()
+        self.model.countries = ["ZA"]
+        self.model.config_parser = MagicMock()
+        self.model.data_store = MagicMock()
+        self.model.data_store.read_csv.return_value = pd.DataFrame({"power_tech": ["NGCCP03N", "WINDP00X", "COBCP01O", "OILCP01O", "BACKSTOP01N"]})
+        self.residual_capacity_df = pd.DataFrame({
+            "COUNTRY": ["ZA", "ZA", "ZA"],
+            "TECHNOLOGY": ["ZACOBCP01O", "ZAOILCP01O", "ZAOIRFP00X"],
+            "MIN_INSTALLED_CAPACITY": [3000, 0, 500],
+        })
+
+    def test_all_technologies(self):
+        """Test if 'all' selects the new and extendable power technologies and the ones with residual capacity."""
+
+        self.model.config_parser.get_technologies.return_value = "all"
+        self.model.select_technologies(self.residual_capacity_df)
+
+        self.assertEqual(self.model.power_tech, ["COBCP01O", "NGCCP03N", "WINDP00X"])
+
+    def test_filter_data(self):
+        """Test if only the rows of the modelled countries and the selected technologies are kept."""
+
+        self.model.config_parser.get_technologies.return_value = ["NGCCP03N"]
+        self.model.select_technologies(self.residual_capacity_df)
+        data = pd.DataFrame({
+            "COUNTRY": ["ZA", "ZA", "MZ"],
+            "TECHNOLOGY": ["ZANGCCP03N", "ZACOBCP01O", "MZNGCCP03N"],
+        })
+
+        self.assertEqual(list(self.model.filter_data(data)["TECHNOLOGY"]), ["ZANGCCP03N"])
+        self.assertEqual(list(self.model.filter_data(data, only_powerplants=False)["TECHNOLOGY"]), ["ZANGCCP03N", "ZACOBCP01O"])
+
+class TestCapacityBounds(unittest.TestCase):
+    def setUp(self):
+        self.model = EnergyModelClass.__new__(EnergyModelClass)
+        self.model.logger = MagicMock()
+        self.model.countries = ["ZA"]
+        self.model.year = 2030
+        self.model.carried_capacity = {}
+        self.model.config_parser = MagicMock()
+        self.model.config_parser.get_technologies.return_value = ["NGCCP03N", "WINDP00X"]
+        data_store = MagicMock()
+        data_store.read_excel.return_value = pd.DataFrame({
+            "TECHNOLOGY": ["ZANGCCP03N", "ZAWINDP00X", "MZNGCCP03N", "ZACOBCP01O"],
+            2030: [1.5, 99999999, 2.0, 3.0],
+        })
+        self.model.data_parser = localDataParserClass(MagicMock(), "TEMBA.xlsx", data_store=data_store)
+
+    def test_maximum_capacity_domain(self):
+        """Test if the total annual maximum capacity of the workbook bounds the domain of its capacity variable."""
+
+        residual_capacity_df = pd.DataFrame({"COUNTRY": ["ZA"], "TECHNOLOGY": ["ZANGCCP03N"], "MIN_INSTALLED_CAPACITY": [500.0]})
+        self.model.select_technologies(residual_capacity_df)
+        max_capacity_installable_df = self.model.filter_data(self.model.data_parser.extract_total_annual_max_capacity(year=2030, unit='MW'))
+        bounds = self.model.collect_capacity_bounds(residual_capacity_df, max_capacity_installable_df)
+
+        self.assertEqual(bounds, {"ZANGCCP03N_capacity": (500, 1500)})
+        variable_domains = XMLGeneratorClass(self.model.logger).add_bounded_domains("installable_capacity_domain", range(0, 5000, 500), bounds)
+        self.assertEqual(variable_domains, {"ZANGCCP03N_capacity": "installable_capacity_domain_500_1500"})
+
+
+class TestSweep(unittest.TestCase):
+    def test_sweep_rebuilds_the_instance(self):
+        """Test if the sweep starts from a new instance, with bounds cut from the grid of the generator."""
+
+        model = EnergyModelClass.__new__(EnergyModelClass)
+        model.logger = MagicMock()
+        model.name = "ZA"
+        model.capacity_bounds = {}
+        model.domains = {"installable_capacity_domain": range(0, 5000, 500)}
+        model.refined_steps = {"installable_capacity_domain": 100}
+        # Left over from an earlier generate_xml on the same model
+        model.xml_generator = XMLGeneratorClass(model.logger)
+        model.xml_generator.add_presentation("ZA", "False")
+        model.xml_generator.add_agents(["ZA"])
+
+        def build_xml():
+            model.xml_generator.add_presentation("ZA", "False")
+            model.xml_generator.add_agents(["ZA"])
+        model.build_xml = build_xml
+
+        with patch("translation.energyModel.ModelSkeletonClass") as skeleton, patch("translation.energyModel.write_scenarios", return_value=[]):
+            model.sweep([], "scenarios")
+
+        self.assertEqual(len(skeleton.call_args.kwargs["instance"].find("agents")), 1)
+        self.assertEqual(skeleton.call_args.kwargs["capacity_domain_values"], range(0, 5000, 100))
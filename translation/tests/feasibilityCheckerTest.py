@@ -0,0 +1,87 @@
+import unittest
+from translation.xmlGenerator import XMLGeneratorClass
+from translation.feasibilityChecker import FeasibilityCheckerClass
+from unittest.mock import MagicMock
+
+import pandas as pd
+
+class TestFeasibilityCheckerClass(unittest.TestCase):
+
+    def setUp(self):
+        self.logger = MagicMock()
+        self.xml_generator = XMLGeneratorClass(self.logger)
+        self.xml_generator.add_presentation("feasibility", 'False')
+        self.xml_generator.add_agents(["ZA"])
+        self.xml_generator.add_domains({
+            "rate_activity_domain": range(0, 200000, 5000),
+            "installable_capacity_domain": range(0, 4000, 500),
+        })
+        self.xml_generator.add_variable_from_name(
+            technologies=["ZANGCCP03N", "ZAWINDP00X"],
+            variables=["S1D1_ZANGCCP03N_1", "S1D1_ZAWINDP00X_1"],
+            agents=["ZA"]
+        )
+        factors_df = pd.DataFrame({
+            'COUNTRY': ['ZA', 'ZA'],
+            'TECHNOLOGY': ['ZANGCCP03N', 'ZAWINDP00X'],
+            'TIMESLICE': ['S1D1', 'S1D1'],
+            'CAPACITY_FACTOR': [1, 0.5],
+            'AVAILABILITY_FACTOR': [1, 1],
+            'CAPACITY_TO_ACTIVITY_UNIT': [31.536, 31.536],
+        })
+        self.xml_generator.add_maximum_annual_activity_rate_per_timeslice_constraint(modes=[1], factors_df=factors_df)
+
+    def add_demand(self, demand):
+        self.xml_generator.add_minimum_respecting_demand(
+            timeslice_technologies_modes=["S1D1_ZANGCCP03N_1", "S1D1_ZAWINDP00X_1"],
+            specified_demand_profile_df=pd.DataFrame({'COUNTRY': ['ZA'], 'FUEL': ['ZAEL01'], 'TIMESLICE': ['S1D1'], 'SPECIFIED_DEMAND_PROFILE': [1]}),
+            specified_annual_demand_df=pd.DataFrame({'COUNTRY': ['ZA'], 'FUEL': ['ZAEL01'], 'SPECIFIED_ANNUAL_DEMAND': [demand]}),
+            year_split_df=pd.DataFrame({'TIMESLICE': ['S1D1'], 'YEAR_SPLIT': [1]})
+        )
+
+    def test_feasible_instance(self):
+        """Test if a demand that the installable capacity can cover passes the check."""
+
+        self.add_demand(100000)
+        checker = FeasibilityCheckerClass(self.logger, self.xml_generator.instance)
+        self.assertEqual(checker.check(), [])
+        self.assertTrue(checker.is_feasible())
+
+    def test_infeasible_demand(self):
+        """Test if a demand above the capacity limited activity is flagged with its constraint name."""
+
+        # At most 3500 MW * 32 + 3500 MW * 16 = 168000 can be produced with the rounded factors
+        self.add_demand(180000)
+        checker = FeasibilityCheckerClass(self.logger, self.xml_generator.instance)
+        issues = checker.check()
+        self.assertEqual(len(issues), 1)
+        self.assertEqual(issues[0]["constraint"], "minimumRespectingDemand_ZA_S1D1")
+        self.assertFalse(checker.is_feasible())
+
+    def test_empty_domain(self):
+        """Test if a bound outside of the domain grid is flagged."""
+
+        self.xml_generator.add_minimum_capacity_constraint("ZAWINDP00X_capacity", 5000)
+        issues = FeasibilityCheckerClass(self.logger, self.xml_generator.instance).check()
+        self.assertEqual([issue["constraint"] for issue in issues], ["alreadyInstalledCapacity_ZAWINDP00X_capacity"])
+
+    def test_empty_bounded_domain(self):
+        """Test if capacity bounds leaving no value of the domain are reported instead of failing the generation."""
+
+        xml_generator = XMLGeneratorClass(self.logger)
+        xml_generator.add_presentation("feasibility", 'False')
+        xml_generator.add_agents(["ZA"])
+        xml_generator.add_domains({"installable_capacity_domain": range(0, 4000, 500)})
+        variable_domains = xml_generator.add_bounded_domains(
+            domain_name="installable_capacity_domain",
+            domain_values=range(0, 4000, 500),
+            bounds={"ZAWINDP00X_capacity": (5000, None), "ZANGCCP03N_capacity": (2000, 1000)}
+        )
+        xml_generator.add_variable_from_name(technologies=["ZANGCCP03N", "ZAWINDP00X"], variables=[], agents=["ZA"], variable_domains=variable_domains)
+
+        self.assertEqual(variable_domains, {"ZAWINDP00X_capacity": "installable_capacity_domain_empty", "ZANGCCP03N_capacity": "installable_capacity_domain_empty"})
+        issues = FeasibilityCheckerClass(self.logger, xml_generator.instance).check()
+        self.assertEqual([issue["constraint"] for issue in issues], ["ZANGCCP03N_capacity", "ZAWINDP00X_capacity"])
+
+if __name__ == '__main__':
+    unittest.main()
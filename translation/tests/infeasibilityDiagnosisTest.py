@@ -0,0 +1,80 @@
+import unittest
+from translation.xmlGenerator import XMLGeneratorClass
+from translation.infeasibilityDiagnosis import InfeasibilityDiagnosisClass, source_rows
+from unittest.mock import MagicMock
+
+import pandas as pd
+
+class TestInfeasibilityDiagnosisClass(unittest.TestCase):
+
+    def setUp(self):
+        self.logger = MagicMock()
+        self.xml_generator = XMLGeneratorClass(self.logger)
+        self.xml_generator.add_presentation("diagnosis", 'False')
+        self.xml_generator.add_agents(["ZA"])
+        self.xml_generator.add_domains({
+            "rate_activity_domain": range(0, 200000, 5000),
+            "installable_capacity_domain": range(0, 4000, 500),
+        })
+        self.xml_generator.add_variable_from_name(
+            technologies=["ZANGCCP03N", "ZAWINDP00X", "ZACOALP01N"],
+            variables=["S1D1_ZANGCCP03N_1", "S1D1_ZAWINDP00X_1", "S1D1_ZACOALP01N_1"],
+            agents=["ZA"]
+        )
+        factors_df = pd.DataFrame({
+            'COUNTRY': ['ZA', 'ZA'],
+            'TECHNOLOGY': ['ZANGCCP03N', 'ZAWINDP00X'],
+            'TIMESLICE': ['S1D1', 'S1D1'],
+            'CAPACITY_FACTOR': [1, 0.5],
+            'AVAILABILITY_FACTOR': [1, 1],
+            'CAPACITY_TO_ACTIVITY_UNIT': [31.536, 31.536],
+        })
+        self.xml_generator.add_maximum_annual_activity_rate_per_timeslice_constraint(modes=[1], factors_df=factors_df)
+        # Irrelevant to the conflict: the coal plant is only bounded by an already installed capacity
+        self.xml_generator.add_minimum_capacity_constraint("ZACOALP01N_capacity", 1000)
+
+    def test_conflicting_set(self):
+        """Test if an unmet demand is reduced to the demand and the activity limits of the technologies covering it."""
+
+        # At most 3500 MW * 32 + 3500 MW * 16 = 168000 can be produced, the coal plant has no activity variable in the demand
+        self.xml_generator.add_minimum_respecting_demand(
+            timeslice_technologies_modes=["S1D1_ZANGCCP03N_1", "S1D1_ZAWINDP00X_1"],
+            specified_demand_profile_df=pd.DataFrame({'COUNTRY': ['ZA'], 'FUEL': ['ZAEL01'], 'TIMESLICE': ['S1D1'], 'SPECIFIED_DEMAND_PROFILE': [1]}),
+            specified_annual_demand_df=pd.DataFrame({'COUNTRY': ['ZA'], 'FUEL': ['ZAEL01'], 'SPECIFIED_ANNUAL_DEMAND': [180000]}),
+            year_split_df=pd.DataFrame({'TIMESLICE': ['S1D1'], 'YEAR_SPLIT': [1]})
+        )
+        diagnosis = InfeasibilityDiagnosisClass(self.logger, self.xml_generator.instance)
+        self.assertEqual(sorted(diagnosis.find_conflicting_set()), [
+            "maximumAnnualRateActivityPerTimeslice_mul_S1D1_ZANGCCP03N_1",
+            "maximumAnnualRateActivityPerTimeslice_mul_S1D1_ZAWINDP00X_1",
+            "minimumRespectingDemand_ZA_S1D1",
+        ])
+
+        members = {member["constraint"]: member["sources"] for member in diagnosis.diagnose()}
+        self.assertEqual(members["minimumRespectingDemand_ZA_S1D1"], [
+            "SpecifiedAnnualDemand[COUNTRY=ZA]",
+            "SpecifiedDemandProfile[COUNTRY=ZA, TIMESLICE=S1D1]",
+            "YearSplit[TIMESLICE=S1D1]",
+        ])
+
+    def test_feasible_instance(self):
+        """Test if no conflicting set is reported for a feasible instance."""
+
+        diagnosis = InfeasibilityDiagnosisClass(self.logger, self.xml_generator.instance)
+        self.assertEqual(diagnosis.find_conflicting_set(), [])
+        self.assertEqual(diagnosis.diagnose(), [])
+
+    def test_source_rows(self):
+        """Test if the workbook rows are derived from the variable names."""
+
+        self.assertEqual(
+            source_rows(["CapacityFactor", "ResidualCapacity"], ["S1D1_ZAWINDP00X_1_rateActivity", "ZAWINDP00X_capacity"]),
+            ["CapacityFactor[TECHNOLOGY=ZAWINDP00X, TIMESLICE=S1D1]", "ResidualCapacity[TECHNOLOGY=ZAWINDP00X]"]
+        )
+        self.assertEqual(
+            source_rows(["AnnualEmissionLimit", "YearSplit"], ["S1D1_emission_ZACO2"]),
+            ["AnnualEmissionLimit[COUNTRY=ZA]", "YearSplit[TIMESLICE=S1D1]"]
+        )
+
+if __name__ == '__main__':
+    unittest.main()
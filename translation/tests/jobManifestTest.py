@@ -0,0 +1,76 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from translation.jobManifest import JobManifestClass, PermanentJobError, job_id
+from unittest.mock import MagicMock
+
+class TestJobManifestClass(unittest.TestCase):
+
+    def setUp(self):
+        self.logger = MagicMock()
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "manifest.jsonl")
+        self.artifact = os.path.join(self.directory.name, "solution_ZA.xml")
+        self.calls = 0
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def manifest(self):
+        return JobManifestClass(self.logger, self.path, max_attempts=3, backoff=0)
+
+    def run_step(self, manifest, action):
+        return asyncio.run(manifest.run_step("ZA_2030", "solve", action, artifacts=[self.artifact]))
+
+    def test_resume_skips_done_steps(self):
+        """Test if a step done in a previous run is skipped while its artifacts exist."""
+
+        async def solve():
+            self.calls += 1
+            open(self.artifact, "w").close()
+            return {"valuation": 12}
+
+        state = self.run_step(self.manifest(), solve)
+        self.assertEqual((state["status"], state["valuation"]), ("done", 12))
+        self.run_step(self.manifest(), solve)
+        self.assertEqual(self.calls, 1)
+
+        os.remove(self.artifact)
+        self.run_step(self.manifest(), solve)
+        self.assertEqual(self.calls, 2)
+
+    def test_retries(self):
+        """Test if a failing step is retried and its attempts are recorded."""
+
+        async def flaky():
+            self.calls += 1
+            if self.calls < 3:
+                raise RuntimeError("java.lang.OutOfMemoryError")
+            open(self.artifact, "w").close()
+
+        state = self.run_step(self.manifest(), flaky)
+        self.assertEqual((state["status"], state["attempt"]), ("done", 3))
+
+        with open(self.path) as manifest:
+            self.assertEqual(len(manifest.readlines()), 6)
+
+    def test_permanent_failure(self):
+        """Test if a permanent failure is neither retried nor run again on resume."""
+
+        async def infeasible():
+            self.calls += 1
+            raise PermanentJobError("infeasible")
+
+        self.assertIsNone(self.run_step(self.manifest(), infeasible))
+        self.assertIsNone(self.run_step(self.manifest(), infeasible))
+        self.assertEqual(self.calls, 1)
+
+    def test_job_id(self):
+        """Test if the job identifier depends on the configuration content only."""
+
+        self.assertEqual(job_id(["ZA"], 2030, {"a": 1, "b": 2}), job_id(["ZA"], 2030, {"b": 2, "a": 1}))
+        self.assertNotEqual(job_id(["ZA"], 2030, {"a": 1}), job_id(["ZA"], 2030, {"a": 2}))
+
+if __name__ == '__main__':
+    unittest.main()
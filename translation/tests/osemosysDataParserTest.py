@@ -0,0 +1,33 @@
+import unittest
+import pandas as pd
+from translation.parsers.osemosysDataParser import localDataParserClass
+from unittest.mock import MagicMock, patch
+
+ATLAS = pd.DataFrame({
+    "Country": ["South Africa", "South Africa", "South Africa", "Mozambique"],
+    "Capacity": [600, 100, 300, 2000],
+    "Size Type": ["Large", "Small", "Large", "Large"],
+    "First Year": [1980, 2028, 1920, 1975],
+})
+COUNTRY_CODES = pd.DataFrame({"Country Name": ["South Africa", "Mozambique"], "Country code": ["ZA", "MZ"]})
+
+class TestLocalDataParserClass(unittest.TestCase):
+
+    def setUp(self):
+        self.parser = localDataParserClass(MagicMock(), "TEMBA.xlsx")
+
+    @patch("translation.parsers.osemosysDataParser.pd.read_csv", return_value=COUNTRY_CODES)
+    @patch("translation.parsers.osemosysDataParser.pd.read_excel", return_value=ATLAS)
+    def test_extract_AHA_dataset(self, read_excel, read_csv):
+        """Test if the atlas is read once and the capacity of the 100 years up to each year is looked up."""
+
+        capacity = lambda year: {row.TECHNOLOGY: row.Capacity for row in self.parser.extract_AHA_dataset(year).itertuples()}
+
+        self.assertEqual(capacity(2030), {"MZHYDMS03X": 2.0, "ZAHYDMS03X": 0.6, "ZAHYDMS01X": 0.1})
+        self.assertEqual(capacity(2020), {"MZHYDMS03X": 2.0, "ZAHYDMS03X": 0.9})
+        self.assertEqual(capacity(1930), {"ZAHYDMS03X": 0.3})
+        self.assertEqual(capacity(1900), {})
+        self.assertEqual(read_excel.call_count, 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import os
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+from translation.pathway import PathwayClass
+from translation.parsers.solutionParser import SolutionParserClass
+from unittest.mock import MagicMock
+
+class TestPathwayClass(unittest.TestCase):
+
+    def setUp(self):
+        self.logger = MagicMock()
+        self.model = MagicMock()
+        self.model.year = 2020
+        self.model.name = "ZA"
+        self.model.generate_domains.return_value = {"installable_capacity_domain": range(0, 40000, 500)}
+
+    def test_vintages(self):
+        """Test if the capacity installed above the lower bound is carried over until it retires."""
+
+        pathway = PathwayClass(self.logger, self.model, solver=MagicMock(), years=[2025, 2030, 2035])
+        self.model.capacity_bounds = {"ZACOAL_capacity": (1000, None)}
+        pathway.record_vintages(2025, {"ZACOAL_capacity": 3000, "ZAWIND_capacity": 500, "S1_ZACOAL_1_rateActivity": 10000})
+        self.assertEqual(pathway.vintages, [("ZACOAL_capacity", 2025, 2000), ("ZAWIND_capacity", 2025, 500)])
+
+        lives = {"ZAWIND_capacity": 10}
+        self.assertEqual(pathway.carried_capacity(2030, lives), {"ZACOAL_capacity": 2000, "ZAWIND_capacity": 500})
+        self.assertEqual(pathway.carried_capacity(2035, lives), {"ZACOAL_capacity": 2000})
+        self.assertEqual(
+            pathway.capacity_windows({"ZACOAL_capacity": 2000}, {"ZACOAL_capacity": 3000, "ZAWIND_capacity": 500}, step=500),
+            {"ZACOAL_capacity": (2000, 5000), "ZAWIND_capacity": (0, 2500)}
+        )
+
+    def test_run(self):
+        """Test if the years are solved in order with the carried-over capacity, and the model restored afterwards."""
+
+        self.model.data_parser.extract_technology_operational_life.return_value = MagicMock(**{"dropna.return_value.iterrows.return_value": []})
+        self.model.capacity_bounds = {}
+        carried = []
+        self.model.build_xml.side_effect = lambda: carried.append((self.model.year, dict(self.model.carried_capacity)))
+        solver = MagicMock()
+        solver.solve.side_effect = [
+            SolutionParserClass(ET.fromstring('<solution valuation="5"><assignment variable="ZACOAL_capacity" value="1000" /></solution>')),
+            SolutionParserClass(ET.fromstring('<solution valuation="infinity" />')),
+            SolutionParserClass(ET.fromstring('<solution valuation="infinity" />')),
+            None,
+        ]
+
+        with tempfile.TemporaryDirectory() as directory:
+            solutions = PathwayClass(self.logger, self.model, solver, years=[2025, 2030, 2035]).run(directory)
+            self.assertEqual(solver.solve.call_args_list[0].args[0], os.path.join(directory, "ZA_2025.xml"))
+
+        # 2030 is infeasible within its windows and on the full domains
+        self.assertEqual(list(solutions), [2025])
+        self.assertEqual(carried, [(2025, {}), (2030, {"ZACOAL_capacity": 1000}), (2030, {"ZACOAL_capacity": 1000})])
+        self.assertEqual(self.model.year, 2020)
+        self.assertEqual(self.model.carried_capacity, {})
+
+    def test_run_without_windows(self):
+        """Test if a year the capacity windows make infeasible is solved again on the full domains."""
+
+        self.model.data_parser.extract_technology_operational_life.return_value = MagicMock(**{"dropna.return_value.iterrows.return_value": []})
+        self.model.capacity_bounds = {}
+        windows = []
+        self.model.build_xml.side_effect = lambda: windows.append((self.model.year, dict(self.model.domain_windows)))
+        solver = MagicMock()
+        solver.solve.side_effect = [
+            SolutionParserClass(ET.fromstring('<solution valuation="5"><assignment variable="ZACOAL_capacity" value="1000" /></solution>')),
+            SolutionParserClass(ET.fromstring('<solution valuation="infinity" />')),
+            SolutionParserClass(ET.fromstring('<solution valuation="8"><assignment variable="ZACOAL_capacity" value="6000" /></solution>')),
+        ]
+
+        with tempfile.TemporaryDirectory() as directory:
+            solutions = PathwayClass(self.logger, self.model, solver, years=[2025, 2030], window=4).run(directory)
+            self.assertEqual(solver.solve.call_args_list[2].args[0], os.path.join(directory, "ZA_2030_full.xml"))
+
+        # The demand of 2030 needs more than the 1000 + 4 * 500 MW of its window
+        self.assertEqual(windows, [(2025, {}), (2030, {"ZACOAL_capacity": (1000, 3000)}), (2030, {})])
+        self.assertEqual({year: solution.assignments for year, solution in solutions.items()}, {
+            2025: {"ZACOAL_capacity": 1000},
+            2030: {"ZACOAL_capacity": 6000},
+        })
+        self.assertEqual(self.model.domain_windows, {})
+
+    def test_years_order(self):
+        """Test if unordered years are rejected."""
+
+        with self.assertRaises(ValueError):
+            PathwayClass(self.logger, self.model, solver=MagicMock(), years=[2030, 2025])
+
+if __name__ == '__main__':
+    unittest.main()
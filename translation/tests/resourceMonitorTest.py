@@ -0,0 +1,74 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from translation.solvers.resourceMonitor import HeapPredictorClass, ProcessMonitorClass, heap_bytes
+from unittest.mock import MagicMock
+
+def stats(message, variables):
+    return {"log10_max_message": message, "variables": variables, "constraints": 2 * variables}
+
+class TestResourceMonitor(unittest.TestCase):
+
+    def setUp(self):
+        self.logger = MagicMock()
+        self.directory = tempfile.TemporaryDirectory()
+        self.history_file = os.path.join(self.directory.name, "history", "resources.jsonl")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_process_monitor(self):
+        """Test if the peak resident memory and CPU time of a process are sampled."""
+
+        process = subprocess.Popen([sys.executable, "-c", "data = bytearray(50 * 1024 ** 2); sum(range(10 ** 7))"])
+        with ProcessMonitorClass(process.pid, interval=0.01) as monitor:
+            process.wait()
+        if not os.path.exists("/proc"):
+            self.skipTest("/proc is not available")
+        self.assertGreater(monitor.peak_rss, 10 * 1024 ** 2)
+        self.assertGreaterEqual(monitor.cpu_time, 0)
+
+    def test_heap_prediction(self):
+        """Test if the heap is kept without enough history, then predicted from the fitted usage."""
+
+        predictor = HeapPredictorClass(self.logger, history_file=self.history_file, safety_factor=1.5, min_samples=3, max_heap_gb=16)
+        self.assertEqual(predictor.heap_for(stats(6, 100), "8G"), "8G")
+
+        # Peak usage of 10^(message - 1) bytes, whatever the number of variables
+        for message, variables in [(8, 100), (9, 300), (10, 200), (11, 500)]:
+            predictor.history.record(stats(message, variables), 10 ** (message - 1), 1.0, 2.0, "8G", "ok")
+        predictor.history.record(stats(3, 100), 10 ** 12, 1.0, 2.0, "8G", "failed")
+
+        self.assertAlmostEqual(predictor.predict_rss(stats(10, 400)), 10 ** 9, delta=10 ** 6)
+        self.assertEqual(predictor.heap_for(stats(10, 400), "8G"), "2G")
+        self.assertEqual(predictor.heap_for(stats(4, 400), "8G"), "1G")
+        self.assertEqual(predictor.heap_for(stats(12, 400), "8G"), "16G")
+
+        with open(self.history_file) as history:
+            self.assertEqual(len([json.loads(line) for line in history]), 5)
+
+    def test_refit_on_new_samples(self):
+        """Test if the predictor learns from the samples recorded after its first fit."""
+
+        predictor = HeapPredictorClass(self.logger, history_file=self.history_file, min_samples=3)
+        for message, variables in [(8, 100), (9, 300), (10, 200)]:
+            predictor.history.record(stats(message, variables), 10 ** (message - 1), 1.0, 2.0, "8G", "ok")
+        self.assertAlmostEqual(predictor.predict_rss(stats(10, 400)), 10 ** 9, delta=10 ** 6)
+
+        # Ten times more memory per message from now on
+        for message, variables in [(8, 100), (9, 300), (10, 200)] * 10:
+            predictor.history.record(stats(message, variables), 10 ** message, 1.0, 2.0, "8G", "ok")
+        self.assertGreater(predictor.predict_rss(stats(10, 400)), 5 * 10 ** 9)
+
+    def test_heap_bytes(self):
+        """Test if -Xmx values are converted to bytes."""
+
+        self.assertEqual(heap_bytes("8G"), 8 * 1024 ** 3)
+        self.assertEqual(heap_bytes("512m"), 512 * 1024 ** 2)
+        self.assertEqual(heap_bytes(1024), 1024)
+
+if __name__ == '__main__':
+    unittest.main()
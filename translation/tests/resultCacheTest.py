@@ -0,0 +1,94 @@
+import os
+import tempfile
+import unittest
+from translation.solvers.frodoSolver import FrodoSolverClass
+from translation.solvers.resultCache import ResultCacheClass
+from translation.xmlGenerator import XMLGeneratorClass
+from unittest.mock import MagicMock
+
+class TestResultCacheClass(unittest.TestCase):
+
+    def setUp(self):
+        self.logger = MagicMock()
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = ResultCacheClass(self.logger, directory=os.path.join(self.directory.name, "cache"), max_size=100)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, name, content):
+        path = os.path.join(self.directory.name, name)
+        with open(path, "w") as file:
+            file.write(content)
+        return path
+
+    def test_key(self):
+        """Test if the key depends on the problem content and the solver configuration only."""
+
+        first = self.write("first.xml", "<instance />")
+        second = self.write("second.xml", "<instance />")
+        self.assertEqual(self.cache.key(first, {"timeout": 60000}), self.cache.key(second, {"timeout": 60000}))
+        self.assertNotEqual(self.cache.key(first, {"timeout": 60000}), self.cache.key(first, {"timeout": 1000}))
+
+    def test_heap_not_in_key(self):
+        """Test if a problem solved with another heap is served from the cache, the heap not changing the solution."""
+
+        problem_file = self.write("problem.xml", "<instance />")
+        solver = FrodoSolverClass(self.logger, cache=self.cache)
+        self.assertEqual(
+            self.cache.key(problem_file, solver.solver_config({"agent_file": "agent.xml", "max_heap": "2G"})),
+            self.cache.key(problem_file, solver.solver_config({"agent_file": "agent.xml", "max_heap": "6G"}))
+        )
+
+    def test_lru_eviction(self):
+        """Test if the least recently used entry is evicted once the size bound is exceeded."""
+
+        self.cache.put("a", self.write("a.xml", "a" * 40))
+        os.utime(self.cache.entry_path("a"), (1000, 1000))
+        self.cache.put("b", self.write("b.xml", "b" * 40))
+        os.utime(self.cache.entry_path("b"), (2000, 2000))
+        output_file = os.path.join(self.directory.name, "output.xml")
+        # A hit makes the entry the most recently used
+        self.assertTrue(self.cache.get("a", output_file))
+        self.assertGreater(os.stat(self.cache.entry_path("a")).st_mtime, 2000)
+        self.cache.put("c", self.write("c.xml", "c" * 40))
+
+        self.assertTrue(self.cache.get("a", output_file))
+        self.assertFalse(self.cache.get("b", output_file))
+        self.assertTrue(self.cache.get("c", output_file))
+
+    def test_solver_cache_helpers(self):
+        """Test if the solver looks up and stores solutions in its cache only when it has one."""
+
+        problem_file = self.write("problem.xml", "<instance />")
+        output_file = os.path.join(self.directory.name, "output.xml")
+        settings = {"agent_file": "agent.xml", "max_heap": "2G"}
+
+        self.assertEqual(FrodoSolverClass(self.logger).cached_solution(problem_file, output_file, settings), (None, False))
+
+        solver = FrodoSolverClass(self.logger, cache=self.cache)
+        key, cached = solver.cached_solution(problem_file, output_file, settings)
+        self.assertFalse(cached)
+        solver.store_solution(key, self.write("solution.xml", "<solution />"))
+        self.assertEqual(solver.cached_solution(problem_file, output_file, settings), (key, True))
+
+    def test_canonical_order(self):
+        """Test if instances built in a different order are printed identically."""
+
+        outputs = []
+        for technologies in (["ZAWINDP00X", "ZANGCCP03N"], ["ZANGCCP03N", "ZAWINDP00X"]):
+            xml_generator = XMLGeneratorClass(self.logger)
+            xml_generator.add_presentation("canonical", 'False')
+            xml_generator.add_agents(["ZA"])
+            xml_generator.add_domains({"installable_capacity_domain": range(0, 2000, 500)})
+            xml_generator.add_variable_from_name(technologies, [], ["ZA"])
+            for technology in technologies:
+                xml_generator.add_minimum_capacity_constraint(f"{technology}_capacity", 500)
+            output_file = os.path.join(self.directory.name, f"{technologies[0]}.xml")
+            xml_generator.print_xml(output_file=output_file)
+            with open(output_file) as file:
+                outputs.append(file.read())
+        self.assertEqual(outputs[0], outputs[1])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import unittest
+from translation.xmlGenerator import XMLGeneratorClass, boolean_le, mul
+from translation.scenarioSweep import ModelSkeletonClass
+from unittest.mock import MagicMock
+
+import xml.etree.ElementTree as ET
+
+class TestModelSkeletonClass(unittest.TestCase):
+
+    def setUp(self):
+        self.logger = MagicMock()
+        self.xml_generator = XMLGeneratorClass(self.logger)
+        self.xml_generator.add_presentation("sweep", 'False')
+        self.xml_generator.add_agents(["ZA"])
+        self.domain_values = range(0, 5000, 500)
+        self.xml_generator.add_domains({"installable_capacity_domain": self.domain_values})
+        self.capacity_bounds = {"ZAWINDP00X_capacity": (1000, None)}
+        variable_domains = self.xml_generator.add_bounded_domains("installable_capacity_domain", self.domain_values, self.capacity_bounds)
+        self.xml_generator.add_variable_from_name(["ZAWINDP00X", "ZANGCCP03N"], [], ["ZA"], variable_domains=variable_domains)
+        self.xml_generator.add_installing_cost_minimization_constraint(1, "ZAWINDP00X_capacity", 0, 100, extra_name="amortized")
+        self.xml_generator.add_installing_cost_minimization_constraint(1, "ZANGCCP03N_capacity", 0, 50, extra_name="amortized")
+
+        self.skeleton = ModelSkeletonClass(
+            instance=self.xml_generator.instance,
+            capacity_domain_name="installable_capacity_domain",
+            capacity_domain_values=self.domain_values,
+            capacity_bounds=self.capacity_bounds
+        )
+
+    def test_render_base_scenario(self):
+        """Test if the base scenario reproduces the generated instance."""
+
+        tree = ET.ElementTree(self.xml_generator.instance)
+        ET.indent(tree, space="  ", level=0)
+        expected = "<?xml version='1.0' encoding='utf-8'?>\n" + ET.tostring(self.xml_generator.instance, encoding="unicode")
+        self.assertEqual(self.skeleton.render({"name": "base"}), expected)
+
+    def test_render_scenario(self):
+        """Test if multipliers, overrides and capacity bounds are substituted."""
+
+        instance = ET.fromstring(self.skeleton.render({
+            "name": "expensive",
+            "parameters": {"minimize_installingCost": {"cost_per_MW": 1.5}},
+            "overrides": {"minimize_installingCost_ZANGCCP03N_*": {"oldCapacity": 500}},
+            "capacity_bounds": {"ZA*_capacity": (None, 2000)},
+        }))
+
+        parameters = [constraint.find("parameters").text for constraint in instance.iter("constraint")]
+        self.assertEqual(parameters, ["1 ZAWINDP00X_capacity 0 150", "1 ZANGCCP03N_capacity 500 75"])
+
+        domains = {domain.attrib["name"]: domain.text for domain in instance.iter("domain")}
+        self.assertEqual(domains["installable_capacity_domain_1000_2000"], "1000 1500 2000")
+        self.assertEqual(domains["installable_capacity_domain_0_2000"], "0 500 1000 1500 2000")
+
+        variables = {variable.attrib["name"]: variable.attrib["domain"] for variable in instance.iter("variable")}
+        self.assertEqual(variables["ZAWINDP00X_capacity"], "installable_capacity_domain_1000_2000")
+        self.assertEqual(variables["ZANGCCP03N_capacity"], "installable_capacity_domain_0_2000")
+
+    def test_render_deduplicated_scenario(self):
+        """Test if the rules keep matching the per-country definitions once they are merged into one."""
+
+        xml_generator = XMLGeneratorClass(self.logger)
+        xml_generator.add_presentation("sweep", 'False')
+        xml_generator.add_agents(["MZ", "ZA"])
+        xml_generator.add_domains({"installable_capacity_domain": self.domain_values})
+        xml_generator.add_variable_from_name(["ZACOAL", "MZHYD"], [], ["ZA", "MZ"])
+        xml_generator.add_predicate("cost_ZA", "int x int cost_ZACOAL", boolean_le(mul("x", "cost_ZACOAL"), 10000))
+        xml_generator.add_predicate("cost_MZ", "int x int cost_MZHYD", boolean_le(mul("x", "cost_MZHYD"), 10000))
+        xml_generator.add_constraint("cost_ZA_ZACOAL", 1, "ZACOAL_capacity", "cost_ZA", "ZACOAL_capacity 4")
+        xml_generator.add_constraint("cost_MZ_MZHYD", 1, "MZHYD_capacity", "cost_MZ", "MZHYD_capacity 6")
+        skeleton = ModelSkeletonClass(
+            instance=xml_generator.instance,
+            capacity_domain_name="installable_capacity_domain",
+            capacity_domain_values=self.domain_values,
+            capacity_bounds={},
+            deduplicate=True
+        )
+
+        for rules, expected in [
+            ({"cost_ZA": {"cost_ZACOAL": 2}}, {"cost_ZA_ZACOAL": "ZACOAL_capacity 8", "cost_MZ_MZHYD": "MZHYD_capacity 6"}),
+            ({"cost_MZ": {"cost_MZHYD": 2}}, {"cost_ZA_ZACOAL": "ZACOAL_capacity 4", "cost_MZ_MZHYD": "MZHYD_capacity 12"}),
+        ]:
+            instance = ET.fromstring(skeleton.render({"name": "scenario", "parameters": rules}))
+            self.assertEqual([predicate.attrib["name"] for predicate in instance.iter("predicate")], ["cost_MZ"])
+            self.assertEqual({constraint.attrib["name"]: constraint.attrib["reference"] for constraint in instance.iter("constraint")},
+                             {"cost_ZA_ZACOAL": "cost_MZ", "cost_MZ_MZHYD": "cost_MZ"})
+            self.assertEqual({constraint.attrib["name"]: constraint.find("parameters").text for constraint in instance.iter("constraint")}, expected)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import asyncio
+import sys
+import unittest
+from translation.solvers.solverOrchestrator import SolverOrchestratorClass
+from unittest.mock import MagicMock
+
+def python_job(name, code):
+    return {"name": name, "command": [sys.executable, "-c", code]}
+
+class TestSolverOrchestratorClass(unittest.TestCase):
+
+    def setUp(self):
+        self.logger = MagicMock()
+
+    def test_streamed_output(self):
+        """Test if progress lines are streamed and the valuation and solver time are parsed."""
+
+        progress = []
+        orchestrator = SolverOrchestratorClass(self.logger, on_progress=lambda job, line, elapsed: progress.append(line), poll_interval=0.05)
+        results = orchestrator.run_jobs([
+            python_job("ZA", "print('Algorithm finished in 120 ms'); print('Total optimal cost: 42')"),
+            python_job("MZ", "import sys; sys.exit(3)"),
+        ])
+
+        self.assertEqual([result["status"] for result in results], ["ok", "failed"])
+        self.assertEqual(results[0]["valuation"], 42)
+        self.assertEqual(results[0]["solver_time"], 0.12)
+        self.assertEqual(results[1]["returncode"], 3)
+        self.assertIn("Total optimal cost: 42", progress)
+
+    def test_limits(self):
+        """Test if jobs above the wall-clock or memory limit are killed."""
+
+        orchestrator = SolverOrchestratorClass(self.logger, wall_clock_limit=0.5, poll_interval=0.05)
+        result, = orchestrator.run_jobs([python_job("ZA", "import time; time.sleep(30)")])
+        self.assertEqual(result["status"], "timeout")
+        self.assertLess(result["elapsed"], 10)
+
+        orchestrator = SolverOrchestratorClass(self.logger, memory_limit=1, poll_interval=0.05)
+        result, = orchestrator.run_jobs([python_job("ZA", "import time; time.sleep(30)")])
+        self.assertEqual(result["status"], "memory")
+
+    def test_stragglers(self):
+        """Test if a job much slower than the others is cancelled."""
+
+        orchestrator = SolverOrchestratorClass(self.logger, max_concurrency=3, straggler_factor=5, poll_interval=0.05)
+        results = orchestrator.run_jobs([
+            python_job("ZA", "pass"),
+            python_job("MZ", "pass"),
+            python_job("ZM", "import time; time.sleep(30)"),
+        ])
+        self.assertEqual([result["status"] for result in results], ["ok", "ok", "straggler"])
+
+    def test_submitted_stragglers(self):
+        """Test if jobs submitted one by one are not judged against the first job to end."""
+
+        orchestrator = SolverOrchestratorClass(self.logger, max_concurrency=3, straggler_factor=5, poll_interval=0.05, expected_jobs=3)
+
+        async def submit_one_by_one():
+            small = await orchestrator.submit(python_job("LS", "pass"))
+            large = asyncio.ensure_future(orchestrator.submit(python_job("ZA", "import time; time.sleep(1)")))
+            await asyncio.sleep(0.2)
+            self.assertEqual(orchestrator.submitted, 2)
+            self.assertEqual(len(orchestrator.tasks), 1)
+            return small, await large
+
+        small, large = asyncio.run(submit_one_by_one())
+        self.assertEqual([small["status"], large["status"]], ["ok", "ok"])
+        self.assertEqual(orchestrator.tasks, set())
+
+    def test_memory_budget(self):
+        """Test if jobs whose memory reservations exceed the budget together run one after the other."""
+
+        orchestrator = SolverOrchestratorClass(self.logger, max_concurrency=3, memory_budget=100, poll_interval=0.05)
+        results = orchestrator.run_jobs([
+            {**python_job("ZA", "import time; time.sleep(0.3)"), "memory": 60},
+            {**python_job("MZ", "import time; time.sleep(0.3)"), "memory": 60},
+            {**python_job("ZM", "pass"), "memory": 500},
+        ])
+        self.assertEqual([result["status"] for result in results], ["ok", "ok", "ok"])
+        self.assertGreaterEqual(results[1]["started"], results[0]["started"] + results[0]["elapsed"] - 0.01)
+        self.assertEqual(orchestrator.reserved, 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,28 @@
+"""Stand-in solver worker speaking the protocol of SolverWorkerClass, used to test the orchestration without FRODO2.
+
+Every variable is assigned the first value of its domain and every answer carries the pid of the worker.
+"""
+import json
+import os
+import sys
+import xml.etree.ElementTree as ET
+from translation.parsers.instanceParser import InstanceParserClass
+
+def solve(problem_file, output_file):
+    instance = InstanceParserClass(problem_file)
+    solution = ET.Element("solution", {"valuation": "0"})
+    for variable_name in instance.variables:
+        ET.SubElement(solution, "assignment", {"variable": variable_name, "value": str(instance.domain_values(variable_name)[0])})
+    ET.ElementTree(solution).write(output_file, encoding="utf-8", xml_declaration=True)
+
+if __name__ == "__main__":
+    for line in sys.stdin:
+        request = json.loads(line)
+        if request.get("command") == "exit":
+            break
+        try:
+            solve(request["problem"], request["output"])
+            answer = {"status": "ok", "worker": os.getpid()}
+        except Exception as error:
+            answer = {"status": "error", "message": str(error), "worker": os.getpid()}
+        print(json.dumps(answer), flush=True)
@@ -0,0 +1,71 @@
+import unittest
+from translation.timesliceAggregator import TimesliceAggregatorClass
+from unittest.mock import MagicMock
+
+import pandas as pd
+
+TIMESLICES = ['S1D1', 'S1D2', 'S2D1', 'S2D2']
+
+class TestTimesliceAggregatorClass(unittest.TestCase):
+
+    def setUp(self):
+        self.logger = MagicMock()
+        self.data_parser = MagicMock()
+        self.data_parser.extract_year_split.side_effect = lambda year: pd.DataFrame({
+            'TIMESLICE': TIMESLICES,
+            'YEAR_SPLIT': [0.1, 0.4, 0.25, 0.25],
+        })
+        self.data_parser.extract_capacity_factors.side_effect = lambda year, timeslices: pd.DataFrame({
+            'COUNTRY': ['ZA'] * 4,
+            'TECHNOLOGY': ['ZAWINDP00X'] * 4,
+            'TIMESLICE': TIMESLICES,
+            'CAPACITY_FACTOR': [0.8, 0.3, 0.5, 0.5],
+        })
+        self.data_parser.extract_specified_demand_profile.side_effect = lambda year, timeslices: pd.DataFrame({
+            'COUNTRY': ['ZA'] * 4,
+            'FUEL': ['ZAEL01'] * 4,
+            'TIMESLICE': TIMESLICES,
+            'SPECIFIED_DEMAND_PROFILE': [0.1, 0.4, 0.25, 0.25],
+        })
+        self.data_parser.extract_technologies_per_country.side_effect = lambda impose_one_mode: pd.DataFrame({
+            'COUNTRY': ['ZA'] * 4,
+            'TECHNOLOGY': ['ZAWINDP00X'] * 4,
+            'VARIABLE': [f"{l}_ZAWINDP00X_1" for l in TIMESLICES],
+            'MODE_OF_OPERATION': [1] * 4,
+        })
+        self.aggregator = TimesliceAggregatorClass(self.logger, self.data_parser, year=2030, countries=['ZA'], method='season')
+
+    def test_season_aggregation(self):
+        """Test if timeslices are aggregated per season with year split weighted factors."""
+
+        year_split_df = self.aggregator.extract_year_split(year=2030).set_index('TIMESLICE')
+        self.assertAlmostEqual(year_split_df.loc['S1', 'YEAR_SPLIT'], 0.5)
+        self.assertAlmostEqual(year_split_df.loc['S2', 'YEAR_SPLIT'], 0.5)
+
+        capacity_factors_df = self.aggregator.extract_capacity_factors(year=2030, timeslices=True).set_index('TIMESLICE')
+        self.assertAlmostEqual(capacity_factors_df.loc['S1', 'CAPACITY_FACTOR'], (0.8 * 0.1 + 0.3 * 0.4) / 0.5)
+        self.assertAlmostEqual(capacity_factors_df.loc['S2', 'CAPACITY_FACTOR'], 0.5)
+
+        demand_profile_df = self.aggregator.extract_specified_demand_profile(year=2030, timeslices=True).set_index('TIMESLICE')
+        self.assertAlmostEqual(demand_profile_df['SPECIFIED_DEMAND_PROFILE'].sum(), 1)
+
+        variables = self.aggregator.extract_technologies_per_country(impose_one_mode=True)['VARIABLE'].tolist()
+        self.assertEqual(variables, ['S1_ZAWINDP00X_1', 'S2_ZAWINDP00X_1'])
+
+    def test_cluster_aggregation(self):
+        """Test if clustering merges the most similar timeslices into the requested number of groups."""
+
+        aggregator = TimesliceAggregatorClass(self.logger, self.data_parser, year=2030, countries=['ZA'], method='cluster', n_clusters=3)
+        mapping = aggregator.get_timeslice_mapping(2030)
+
+        self.assertEqual(len(set(mapping.values())), 3)
+        self.assertEqual(mapping['S2D1'], mapping['S2D2'], "Identical timeslices should be merged first")
+
+    def test_delegation(self):
+        """Test if methods unrelated to timeslices are delegated to the wrapped parser."""
+
+        self.aggregator.extract_capital_costs(year=2030, unit='M$')
+        self.data_parser.extract_capital_costs.assert_called_with(year=2030, unit='M$')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import os
+import sys
+import tempfile
+import unittest
+from translation.solvers.workerPool import SolverWorkerPoolClass, WorkerError
+from translation.solvers.frodoSolver import FrodoSolverClass, create_solver
+from translation.xmlGenerator import XMLGeneratorClass
+from unittest.mock import MagicMock
+
+STAND_IN_WORKER = [sys.executable, "-m", "translation.tests.standInWorker"]
+
+class TestSolverWorkerPoolClass(unittest.TestCase):
+
+    def setUp(self):
+        self.logger = MagicMock()
+        self.directory = tempfile.TemporaryDirectory()
+        self.problem_file = os.path.join(self.directory.name, "problem.xml")
+        self.output_file = os.path.join(self.directory.name, "solution.xml")
+
+        xml_generator = XMLGeneratorClass(self.logger)
+        xml_generator.add_presentation("pool", 'False')
+        xml_generator.add_agents(["ZA"])
+        xml_generator.add_domains({"installable_capacity_domain": range(0, 2000, 500)})
+        xml_generator.add_variable_from_name(["ZAWINDP00X"], [], ["ZA"])
+        xml_generator.print_xml(output_file=self.problem_file)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_warm_workers_are_recycled(self):
+        """Test if a worker serves several problems and is replaced after max_jobs jobs."""
+
+        with SolverWorkerPoolClass(self.logger, STAND_IN_WORKER, size=1, max_jobs=2) as pool:
+            workers = [pool.solve(self.problem_file, self.output_file, "agent.xml", 1000)["worker"] for _ in range(3)]
+        self.assertEqual(workers[0], workers[1])
+        self.assertNotEqual(workers[1], workers[2])
+
+    def test_solver_uses_pool(self):
+        """Test if the solver reads the solution written by a pool worker."""
+
+        with SolverWorkerPoolClass(self.logger, STAND_IN_WORKER, size=1) as pool:
+            solver = FrodoSolverClass(self.logger, pool=pool)
+            solution = solver.solve(self.problem_file, self.output_file)
+        self.assertEqual(solution.assignments, {"ZAWINDP00X_capacity": 0})
+        self.assertTrue(solution.is_feasible())
+
+    def test_fallback_to_one_shot(self):
+        """Test if a worker that dies before answering makes the solver fall back to a one-shot launch."""
+
+        with SolverWorkerPoolClass(self.logger, [sys.executable, "-c", "pass"], size=1) as pool:
+            solver = FrodoSolverClass(self.logger, pool=pool)
+            solver.run_once = MagicMock(side_effect=lambda problem_file, output_file, settings: open(output_file, "w").write('<solution valuation="5" />'))
+            solution = solver.solve(self.problem_file, self.output_file)
+        solver.run_once.assert_called_once_with(self.problem_file, self.output_file, solver.settings_for(self.problem_file))
+        self.assertEqual(solution.valuation, 5)
+
+    def test_close_stops_checked_out_workers(self):
+        """Test if closing the pool stops the workers still checked out and no worker starts afterwards."""
+
+        pool = SolverWorkerPoolClass(self.logger, STAND_IN_WORKER, size=2)
+        idle_worker = pool.acquire()
+        busy_worker = pool.acquire()
+        pool.release(idle_worker, True)
+        pool.close()
+
+        self.assertFalse(idle_worker.is_alive())
+        self.assertFalse(busy_worker.is_alive())
+        pool.release(busy_worker, True)
+        self.assertEqual(pool.workers, set())
+        with self.assertRaises(WorkerError):
+            pool.acquire()
+
+    def test_pool_and_predictor_are_rejected(self):
+        """Test if a pool, whose workers keep the heap of their command, cannot be combined with a heap predictor."""
+
+        with self.assertRaises(ValueError):
+            create_solver(self.logger, {"worker": {"command": STAND_IN_WORKER}, "prediction": {}})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,11 @@
+import math
+import os
+import tempfile
 import unittest
+import pandas as pd
 from translation.xmlGenerator import XMLGeneratorClass
+from translation.parsers.solutionParser import SolutionParserClass, load_symbol_table, record_instance
+from solutions.merge import merge_solutions
 from unittest.mock import MagicMock
 
 import xml.etree.ElementTree as ET
@@ -255,6 +261,173 @@ class TestXMLGeneratorClass(unittest.TestCase):
         if PRINT_INTERMIDIATE_XML:
             print(to_pretty_xml(self.xml_generator.instance))
 
+    def test_add_bounded_domains(self):
+        """Test if unary capacity bounds are folded into deduplicated per-bound domains."""
+
+        domain_values = range(0, 5000, 500)
+        variable_domains = self.xml_generator.add_bounded_domains(
+            domain_name="installable_capacity_domain",
+            domain_values=domain_values,
+            bounds={
+                "solarCapacityA_capacity": (1200, None),
+                "gasCapacityA_capacity": (1500, None),
+                "windCapacityA_capacity": (None, 2000),
+                "hydroCapacityA_capacity": (0, None),
+            }
+        )
+
+        self.assertEqual(variable_domains["solarCapacityA_capacity"], "installable_capacity_domain_1500_4500")
+        self.assertEqual(variable_domains["gasCapacityA_capacity"], "installable_capacity_domain_1500_4500")
+        self.assertEqual(variable_domains["windCapacityA_capacity"], "installable_capacity_domain_0_2000")
+        self.assertNotIn("hydroCapacityA_capacity", variable_domains, "Unrestrictive bounds should keep the shared domain")
+
+        domains_element = self.xml_generator.instance.find("domains")
+        self.assertIsNotNone(domains_element, "Missing <domains> section")
+        domain_list = domains_element.findall("domain")
+        self.assertEqual(len(domain_list), 2, "Identical bounded domains should be emitted once")
+
+        domain = domains_element.find("domain[@name='installable_capacity_domain_1500_4500']")
+        self.assertEqual(domain.attrib["nbValues"], "7")
+        self.assertEqual(domain.text, "1500 2000 2500 3000 3500 4000 4500")
+
+        variable_domains = self.xml_generator.add_bounded_domains("installable_capacity_domain", domain_values, {"nuclearCapacityA_capacity": (6000, None)})
+        self.assertEqual(variable_domains, {"nuclearCapacityA_capacity": "installable_capacity_domain_empty"})
+        self.assertEqual(domains_element.find("domain[@name='installable_capacity_domain_empty']").attrib["nbValues"], "0")
+
+        if PRINT_INTERMIDIATE_XML:
+            print(to_pretty_xml(self.xml_generator.instance))
+
+    def test_deduplicate_definitions(self):
+        """Test if predicates differing only by name and parameter names are merged into one definition."""
+
+        for agent in ["ZA", "MZ"]:
+            self.xml_generator.add_predicate(
+                name=f"minimumRespectingDemand_{agent}",
+                parameters=f"int specified_demand int {agent}COAL int {agent}HYDRO",
+                functional=f"ge(add({agent}COAL, {agent}HYDRO), specified_demand)"
+            )
+            self.xml_generator.add_constraint(
+                name=f"minimumRespectingDemand_{agent}_S1",
+                arity=2,
+                scope=f"{agent}COAL {agent}HYDRO",
+                reference=f"minimumRespectingDemand_{agent}",
+                parameters=f"100 {agent}COAL {agent}HYDRO"
+            )
+        self.xml_generator.add_predicate(name="minimumRespectingDemand_ZM", parameters="int specified_demand int ZMCOAL", functional="ge(ZMCOAL, specified_demand)")
+
+        aliases = self.xml_generator.deduplicate_definitions()
+
+        self.assertEqual(aliases, {"minimumRespectingDemand_ZA": "minimumRespectingDemand_MZ"})
+        predicates = self.xml_generator.instance.find("predicates")
+        self.assertEqual([predicate.attrib["name"] for predicate in predicates], ["minimumRespectingDemand_MZ", "minimumRespectingDemand_ZM"])
+        kept = predicates.find("predicate[@name='minimumRespectingDemand_MZ']")
+        self.assertEqual(kept.find("parameters").text, "int specified_demand int p1 int p2")
+        self.assertEqual(kept.find("expression/functional").text, "ge(add(p1, p2), specified_demand)")
+        references = [constraint.attrib["reference"] for constraint in self.xml_generator.instance.find("constraints")]
+        self.assertEqual(references, ["minimumRespectingDemand_MZ", "minimumRespectingDemand_MZ"])
+
+    def test_compact_names(self):
+        """Test if compact instances use short ids and their solutions are decoded with the symbol table."""
+
+        self.xml_generator.add_presentation("testName", 'False')
+        self.xml_generator.add_variable_from_name(technologies=["ZACOAL"], variables=["S1_ZACOAL_1"], agents=["ZA"])
+        self.xml_generator.add_maximum_capacity_constraint("ZACOAL_capacity", 1000)
+
+        with tempfile.TemporaryDirectory() as directory:
+            instance_file = os.path.join(directory, "instance.xml")
+            self.xml_generator.print_xml(instance_file, compact=True)
+            instance = ET.parse(instance_file).getroot()
+            symbol_table = load_symbol_table(instance_file)
+
+            constraint = instance.find("constraints/constraint")
+            self.assertEqual(constraint.attrib["name"], "c0")
+            self.assertEqual(constraint.attrib["scope"], "v1")
+            self.assertEqual(constraint.attrib["reference"], "pr0")
+            self.assertEqual(constraint.find("parameters").text, "v1 1000")
+            self.assertEqual(symbol_table["variables"], {"v0": "S1_ZACOAL_1_rateActivity", "v1": "ZACOAL_capacity"})
+            self.assertEqual(symbol_table["constraints"], {"c0": "withinMaxCapacity_ZACOAL_capacity"})
+
+            solution = ET.fromstring('<solution valuation="5"><assignment variable="v1" value="500" /></solution>')
+            self.assertEqual(SolutionParserClass(solution, symbol_table).assignments, {"ZACOAL_capacity": 500})
+
+            # The instance in memory keeps its names, and a full instance removes the stale symbol table
+            self.assertEqual(self.xml_generator.instance.find("constraints/constraint").attrib["scope"], "ZACOAL_capacity")
+            self.xml_generator.print_xml(instance_file)
+            self.assertIsNone(load_symbol_table(instance_file))
+
+    def test_merge_compact_solutions(self):
+        """Test if merged solutions are decoded with the symbol table of the instance recorded in them, whatever it is named."""
+
+        self.xml_generator.add_presentation("testName", 'False')
+        self.xml_generator.add_variable_from_name(technologies=["ZACOAL"], variables=["S1_ZACOAL_1"], agents=["ZA"])
+        self.xml_generator.add_maximum_capacity_constraint("ZACOAL_capacity", 1000)
+
+        with tempfile.TemporaryDirectory() as directory:
+            instance_file = os.path.join(directory, "problems", "any_name.xml")
+            os.makedirs(os.path.dirname(instance_file))
+            self.xml_generator.print_xml(instance_file, compact=True)
+            outputs = os.path.join(directory, "outputs")
+            os.makedirs(outputs)
+            for country, valuation in [("ZA", "5"), ("MZ", "-infinity")]:
+                solution_file = os.path.join(outputs, f"solution_{country}.xml")
+                ET.ElementTree(ET.fromstring(f'<solution valuation="{valuation}"><assignment variable="v1" value="500" /></solution>')).write(solution_file)
+                record_instance(solution_file, instance_file)
+
+            self.assertEqual(ET.parse(solution_file).getroot().attrib["instance"], os.path.join("..", "problems", "any_name.xml"))
+            combined_file = os.path.join(directory, "combined.xml")
+            self.assertEqual(merge_solutions(outputs, combined_file), -math.inf)
+            combined = ET.parse(combined_file).getroot()
+            self.assertEqual(combined.attrib["valuation"], "-infinity")
+            self.assertEqual({assignment.attrib["variable"] for assignment in combined}, {"ZACOAL_capacity"})
+
+    def test_add_transmission_variables(self):
+        """Test if only the interconnected countries get transmission variables, coupled into their demand constraints."""
+
+        interconnectors_df = pd.DataFrame({"FROM": ["ZA", "MZ"], "TO": ["MZ", "ZA"], "CAPACITY": [1000, 1000]})
+        variables = self.xml_generator.add_transmission_variables(["S1"], interconnectors_df, {"S1_transmission_ZA_MZ": "transmission_domain_0_500"})
+        self.assertEqual(variables, ["S1_transmission_ZA_MZ", "S1_transmission_MZ_ZA"])
+        variable = self.xml_generator.instance.find("variables/variable")
+        self.assertEqual(variable.attrib, {"name": "S1_transmission_ZA_MZ", "domain": "transmission_domain_0_500", "agent": "ZA"})
+
+        self.xml_generator.add_minimum_respecting_demand(
+            timeslice_technologies_modes=["S1_ZACOAL_1", "S1_MZHYDRO_1", "S1_BWCOAL_1"],
+            specified_demand_profile_df=pd.DataFrame({"FUEL": ["ELC"] * 3, "COUNTRY": ["ZA", "MZ", "BW"], "TIMESLICE": ["S1"] * 3, "SPECIFIED_DEMAND_PROFILE": [1, 1, 1]}),
+            specified_annual_demand_df=pd.DataFrame({"FUEL": ["ELC"] * 3, "COUNTRY": ["ZA", "MZ", "BW"], "SPECIFIED_ANNUAL_DEMAND": [100, 50, 10]}),
+            year_split_df=pd.DataFrame({"TIMESLICE": ["S1"], "YEAR_SPLIT": [1]}),
+            interconnectors_df=interconnectors_df
+        )
+        constraints = {constraint.attrib["name"]: constraint for constraint in self.xml_generator.instance.find("constraints")}
+        self.assertEqual(constraints["minimumRespectingDemand_ZA_S1"].attrib["scope"], "S1_ZACOAL_1_rateActivity S1_transmission_MZ_ZA S1_transmission_ZA_MZ")
+        self.assertEqual(constraints["minimumRespectingDemand_BW_S1"].attrib["scope"], "S1_BWCOAL_1_rateActivity")
+        predicate = self.xml_generator.instance.find("predicates/predicate[@name='minimumRespectingDemand_ZA']")
+        self.assertEqual(predicate.find("expression/functional").text, "ge(sub(add(ZACOAL_1_rateActivity, transmission_MZ_ZA), transmission_ZA_MZ), specified_demand)")
+
+    def test_add_emission_accounting_constraint(self):
+        """Test if the emission of an agent is chained through one auxiliary variable per timeslice."""
+
+        variables = self.xml_generator.add_emission_accounting_constraint(
+            agent_name="ZA",
+            emission_name="ZACO2",
+            timeslice_technologies_modes=["S1_ZACOAL_1", "S1_ZAWIND_1", "S2_ZACOAL_1", "S2_ZAWIND_1"],
+            emission_factors_df=pd.DataFrame({"TECHNOLOGY": ["ZACOAL", "ZAWIND"], "EMISSION": ["ZACO2"] * 2, "MODE_OF_OPERATION": [1, 1], "EMISSION_ACTIVITY_RATIO": [0.1, 0]}),
+            year_split_df=pd.DataFrame({"TIMESLICE": ["S1", "S2"], "YEAR_SPLIT": [0.25, 0.75]}),
+            domain_name="emission_domain_ZACO2"
+        )
+        self.assertEqual(variables, ["S1_emission_ZACO2", "S2_emission_ZACO2"])
+        self.assertEqual(self.xml_generator.instance.find("variables/variable").attrib["agent"], "ZA")
+
+        constraints = list(self.xml_generator.instance.find("constraints"))
+        self.assertEqual(constraints[0].attrib["scope"], "S1_emission_ZACO2 S1_ZACOAL_1_rateActivity")
+        self.assertEqual(constraints[0].find("parameters").text, "0 S1_emission_ZACO2 4 S1_ZACOAL_1_rateActivity 100")
+        self.assertEqual(constraints[1].attrib["scope"], "S1_emission_ZACO2 S2_emission_ZACO2 S2_ZACOAL_1_rateActivity")
+        self.assertEqual(self.xml_generator.max_arity, 3)
+
+        # No emitting technology, no auxiliary variable
+        self.assertEqual(self.xml_generator.add_emission_accounting_constraint(
+            "MZ", "MZCO2", ["S1_MZHYDRO_1"], pd.DataFrame({"TECHNOLOGY": [], "EMISSION": [], "MODE_OF_OPERATION": [], "EMISSION_ACTIVITY_RATIO": []}),
+            pd.DataFrame({"TIMESLICE": ["S1"], "YEAR_SPLIT": [1]}), "emission_domain_MZCO2"
+        ), [])
+
     def test_add_maximum_capacity_factor_constraint(self):
         """Test if the maximum capacity factor constraint is correctly added."""
 
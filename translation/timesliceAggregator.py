@@ -0,0 +1,145 @@
+import re
+import numpy as np
+import pandas as pd
+
+class TimesliceAggregatorClass:
+    """Wraps a data parser and serves its timeslice data on a coarser set of timeslices.
+
+    Every method that is not related to timeslices is delegated unchanged to the wrapped parser,
+    so the aggregator can replace the parser in the energy model without further changes.
+    """
+    def __init__(self, logger, data_parser, year, countries, method='season', n_clusters=None, mapping=None):
+        self.logger = logger
+        self.data_parser = data_parser
+        self.year = year
+        self.countries = countries
+        self.method = method
+        self.n_clusters = n_clusters
+        self.mapping = mapping
+        self.timeslice_mappings = {}
+
+        if method not in ('season', 'daypart', 'cluster', 'mapping'):
+            raise ValueError("Timeslice aggregation method must be 'season', 'daypart', 'cluster' or 'mapping'")
+        if method == 'cluster' and (n_clusters is None or n_clusters < 1):
+            raise ValueError("n_clusters must be a positive integer when clustering timeslices")
+        if method == 'mapping' and not mapping:
+            raise ValueError("An explicit mapping is required when method is 'mapping'")
+
+        self.logger.info(f"Timeslice aggregator initialized with method {method}")
+
+    def __getattr__(self, name):
+        if name == 'data_parser':
+            raise AttributeError(name)
+        return getattr(self.data_parser, name)
+
+    def get_timeslice_mapping(self, year):
+        """Returns the mapping from every original timeslice to its aggregated timeslice."""
+        if year not in self.timeslice_mappings:
+            timeslices = self.data_parser.extract_year_split(year=year)['TIMESLICE'].tolist()
+            if self.method == 'season':
+                mapping = {l: split_timeslice_name(l)[0] for l in timeslices}
+            elif self.method == 'daypart':
+                mapping = {l: split_timeslice_name(l)[1] for l in timeslices}
+            elif self.method == 'mapping':
+                mapping = {l: aggregated for aggregated, originals in self.mapping.items() for l in originals}
+                missing = [l for l in timeslices if l not in mapping]
+                if missing:
+                    raise ValueError(f"Timeslices {missing} are not part of the aggregation mapping")
+            else:
+                mapping = self.cluster_timeslices(year)
+
+            for aggregated in set(mapping.values()):
+                if '_' in aggregated:
+                    raise ValueError(f"Aggregated timeslice {aggregated} must not contain '_'")
+            self.logger.debug(f"Timeslice mapping for {year}: {mapping}")
+            self.timeslice_mappings[year] = mapping
+        return self.timeslice_mappings[year]
+
+    def cluster_timeslices(self, year):
+        """Greedily merges the timeslices with the most similar capacity factor and demand profiles."""
+        year_split_df = self.data_parser.extract_year_split(year=year)
+        capacity_factor_df = self.data_parser.extract_capacity_factors(year=year, timeslices=True)
+        capacity_factor_df = capacity_factor_df[capacity_factor_df['COUNTRY'].isin(self.countries)]
+        demand_profile_df = self.data_parser.extract_specified_demand_profile(year=year, timeslices=True)
+        demand_profile_df = demand_profile_df[demand_profile_df['COUNTRY'].isin(self.countries)]
+
+        timeslices = year_split_df['TIMESLICE'].tolist()
+        weights = year_split_df.set_index('TIMESLICE')['YEAR_SPLIT'].reindex(timeslices).astype(float)
+
+        # Demand is compared as intensity, otherwise long timeslices would look different from short ones
+        demand_intensity = demand_profile_df.pivot_table(index='TIMESLICE', columns='FUEL', values='SPECIFIED_DEMAND_PROFILE', aggfunc='sum')
+        demand_intensity = demand_intensity.reindex(timeslices).div(weights, axis=0)
+        capacity_factors = capacity_factor_df.pivot_table(index='TIMESLICE', columns='TECHNOLOGY', values='CAPACITY_FACTOR', aggfunc='mean')
+        capacity_factors = capacity_factors.reindex(timeslices)
+
+        features = pd.concat([capacity_factors, demand_intensity], axis=1).fillna(0)
+        scale = features.abs().max().replace(0, 1)
+        features = (features / scale).to_numpy()
+
+        clusters = [[i] for i in range(len(timeslices))]
+        centroids = [features[i] for i in range(len(timeslices))]
+        cluster_weights = [weights.iloc[i] for i in range(len(timeslices))]
+        while len(clusters) > self.n_clusters:
+            best = None
+            for a in range(len(clusters)):
+                for b in range(a + 1, len(clusters)):
+                    # Ward criterion: increase of the weighted within-cluster variance
+                    cost = cluster_weights[a] * cluster_weights[b] / (cluster_weights[a] + cluster_weights[b])
+                    cost *= float(np.sum((centroids[a] - centroids[b]) ** 2))
+                    if best is None or cost < best[0]:
+                        best = (cost, a, b)
+            _, a, b = best
+            merged_weight = cluster_weights[a] + cluster_weights[b]
+            centroids[a] = (centroids[a] * cluster_weights[a] + centroids[b] * cluster_weights[b]) / merged_weight
+            cluster_weights[a] = merged_weight
+            clusters[a] = sorted(clusters[a] + clusters[b])
+            del clusters[b], centroids[b], cluster_weights[b]
+
+        clusters.sort(key=lambda members: members[0])
+        return {timeslices[i]: f"C{index + 1}" for index, members in enumerate(clusters) for i in members}
+
+    def extract_year_split(self, year):
+        year_split_df = self.data_parser.extract_year_split(year=year)
+        year_split_df['TIMESLICE'] = year_split_df['TIMESLICE'].map(self.get_timeslice_mapping(year))
+        return year_split_df.groupby('TIMESLICE', as_index=False, sort=False)['YEAR_SPLIT'].sum()
+
+    def extract_capacity_factors(self, year, timeslices=False):
+        if not timeslices:
+            return self.data_parser.extract_capacity_factors(year=year, timeslices=False)
+
+        capacity_factors_df = self.data_parser.extract_capacity_factors(year=year, timeslices=True)
+        year_split_df = self.data_parser.extract_year_split(year=year)
+        capacity_factors_df = capacity_factors_df.merge(year_split_df, on='TIMESLICE', how='left')
+        capacity_factors_df['TIMESLICE'] = capacity_factors_df['TIMESLICE'].map(self.get_timeslice_mapping(year))
+
+        # Year split weighted average, so that the annual energy of every technology is preserved
+        capacity_factors_df['WEIGHTED_CAPACITY_FACTOR'] = capacity_factors_df['CAPACITY_FACTOR'] * capacity_factors_df['YEAR_SPLIT']
+        capacity_factors_df = capacity_factors_df.groupby(['COUNTRY', 'TECHNOLOGY', 'TIMESLICE'], as_index=False, sort=False).agg(
+            {'WEIGHTED_CAPACITY_FACTOR': 'sum', 'YEAR_SPLIT': 'sum'}
+        )
+        capacity_factors_df['CAPACITY_FACTOR'] = capacity_factors_df['WEIGHTED_CAPACITY_FACTOR'] / capacity_factors_df['YEAR_SPLIT']
+        return capacity_factors_df[['COUNTRY', 'TECHNOLOGY', 'TIMESLICE', 'CAPACITY_FACTOR']]
+
+    def extract_specified_demand_profile(self, year, timeslices=False):
+        if not timeslices:
+            return self.data_parser.extract_specified_demand_profile(year=year, timeslices=False)
+
+        # The profile is the share of the annual demand in each timeslice, so shares simply add up
+        demand_profile_df = self.data_parser.extract_specified_demand_profile(year=year, timeslices=True)
+        demand_profile_df['TIMESLICE'] = demand_profile_df['TIMESLICE'].map(self.get_timeslice_mapping(year))
+        return demand_profile_df.groupby(['COUNTRY', 'FUEL', 'TIMESLICE'], as_index=False, sort=False)['SPECIFIED_DEMAND_PROFILE'].sum()
+
+    def extract_technologies_per_country(self, impose_one_mode=False):
+        technologies_df = self.data_parser.extract_technologies_per_country(impose_one_mode=impose_one_mode)
+        mapping = self.get_timeslice_mapping(self.year)
+
+        timeslice_and_rest = technologies_df['VARIABLE'].str.split('_', n=1, expand=True)
+        technologies_df['VARIABLE'] = timeslice_and_rest[0].map(mapping) + '_' + timeslice_and_rest[1]
+        return technologies_df.drop_duplicates(subset=['VARIABLE']).reset_index(drop=True)
+
+def split_timeslice_name(timeslice):
+    """Splits a timeslice name such as S1D2 into its season (S1) and daypart (D2)."""
+    match = re.match(r'^(.+?)(D\d+)$', timeslice)
+    if match is None:
+        return timeslice, timeslice
+    return match.group(1), match.group(2)
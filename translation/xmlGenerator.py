@@ -1,6 +1,16 @@
+import copy
+import json
+import os
+import re
 import xml.etree.ElementTree as ET
 from deprecated import deprecated
 import pandas as pd
+from translation.parsers.solutionParser import symbol_table_path
+
+SECTION_ORDER = ["presentation", "agents", "domains", "variables", "predicates", "functions", "constraints"]
+IDENTIFIER_PATTERN = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+# Sections whose element names are replaced by short ids in compact mode, with the prefix of the ids
+COMPACT_PREFIXES = {"variables": "v", "predicates": "pr", "functions": "fn", "constraints": "c"}
 
 class XMLGeneratorClass:
     def __init__(self, logger):
@@ -46,39 +56,75 @@ class XMLGeneratorClass:
         for name, values in domain_values.items():
             ET.SubElement(domains_element, "domain", {"name": name, "nbValues": str(len(values))}).text = " ".join(map(str, values))
 
-    def add_variable_from_name(self, technologies, variables, agents):
+    def add_bounded_domains(self, domain_name, domain_values, bounds):
+        """Intersects unary (min, max) bounds with a shared domain and adds one domain per distinct result.
+
+        Returns the mapping from variable name to the domain it has to reference. Variables whose
+        bounds do not remove any value keep using the shared domain and are not part of the mapping.
+        Bounds that remove every value give the empty <domain>_empty domain, left for the feasibility
+        check to report like any other infeasible input.
+        """
+        bounded_domains = {}
+        variable_domains = {}
+        for variable_name, (min_value, max_value) in bounds.items():
+            values = bounded_domain_values(domain_values, min_value, max_value)
+            if len(values) == 0:
+                self.logger.warning(f"Bounds [{min_value}, {max_value}] of {variable_name} leave {domain_name} empty")
+            elif len(values) == len(domain_values):
+                continue
+
+            bounded_name = bounded_domain_name(domain_name, values)
+            bounded_domains[bounded_name] = values
+            variable_domains[variable_name] = bounded_name
+
+        self.add_domains(bounded_domains)
+        return variable_domains
+
+    def add_variable_from_name(self, technologies, variables, agents, variable_domains=None):
 
         variables_element = self.instance.find("variables")
         if variables_element is None:
             variables_element = ET.SubElement(self.instance, "variables")
+        if variable_domains is None:
+            variable_domains = {}
 
         variable_list = []
         for tech_capacity in technologies:
             ET.SubElement(variables_element, "variable", {
                     "name": f"{tech_capacity}_capacity", 
-                    "domain": "installable_capacity_domain", 
+                    "domain": variable_domains.get(f"{tech_capacity}_capacity", "installable_capacity_domain"), 
                     "agent": tech_capacity[:2]
                 })
             variable_list.append(f"{tech_capacity}_capacity")
         for variable_rateOfCapacity in variables:
             ET.SubElement(variables_element, "variable", {
                 "name": f"{variable_rateOfCapacity}_rateActivity", 
-                "domain": "rate_activity_domain", 
+                "domain": variable_domains.get(f"{variable_rateOfCapacity}_rateActivity", "rate_activity_domain"), 
                 "agent": variable_rateOfCapacity.split('_')[1][:2]
             })
             variable_list.append(f"{variable_rateOfCapacity}_rateActivity")
 
-        #TODO: change once the agent_names are not only neighboring
-        # for fuel in fuels:
-        #     for agent in agents:
-        #         for agent2 in agents:
-        #             if agent != agent2:
-        #                 ET.SubElement(variables_element, "variable", {
-        #                     "name": f"transmission_{agent}_{agent2}",
-        #                     "domain": "trasferable_capacity_domain",
-        #                     "agent": agent
-        #                 })
-        #                 variable_list.append(f"transmission_{agent}_{agent2}")
+        return variable_list
+
+    def add_transmission_variables(self, timeslices, interconnectors_df, variable_domains=None):
+        """Adds a <timeslice>_transmission_<from>_<to> variable per timeslice and directed interconnector,
+        owned by the exporting agent. Only the connected pairs get a variable."""
+        variables_element = self.instance.find("variables")
+        if variables_element is None:
+            variables_element = ET.SubElement(self.instance, "variables")
+        if variable_domains is None:
+            variable_domains = {}
+
+        variable_list = []
+        for l in timeslices:
+            for from_country, to_country in zip(interconnectors_df['FROM'], interconnectors_df['TO']):
+                variable_name = transmission_variable_name(l, from_country, to_country)
+                ET.SubElement(variables_element, "variable", {
+                    "name": variable_name,
+                    "domain": variable_domains.get(variable_name, "transmission_domain"),
+                    "agent": from_country
+                })
+                variable_list.append(variable_name)
 
         return variable_list
 
@@ -231,7 +277,9 @@ class XMLGeneratorClass:
         )
 
     #TODO: to implement again - quick wrap up
-    def add_minimum_respecting_demand(self, timeslice_technologies_modes, specified_demand_profile_df, specified_annual_demand_df, year_split_df):
+    def add_minimum_respecting_demand(self, timeslice_technologies_modes, specified_demand_profile_df, specified_annual_demand_df, year_split_df, interconnectors_df=None):
+        """Adds an hard constraint per agent and timeslice that enforces the demand to be met by the activity
+        of the agent, plus its imports and minus its exports over the interconnectors if any."""
         def build_recursive(variables):
             if len(variables) == 1:
                 return variables[0]
@@ -244,18 +292,29 @@ class XMLGeneratorClass:
         timeslices = specified_demand_profile_df['TIMESLICE'].unique()
 
         for r in agents:
+            imports, exports = [], []
+            if interconnectors_df is not None:
+                imports = interconnectors_df.loc[interconnectors_df['TO'] == r, 'FROM'].tolist()
+                exports = interconnectors_df.loc[interconnectors_df['FROM'] == r, 'TO'].tolist()
             for l in timeslices:
                 yearsplit_constant = year_split_df[(year_split_df['TIMESLICE'] == l)]['YEAR_SPLIT'].values[0]
                 yearsplit_constant = round(1/yearsplit_constant)
                 per_timeslice_country_variables = [var + "_rateActivity" for var in timeslice_technologies_modes if var.split('_')[0] == l and var.split('_')[1][:2] == r]
+                import_variables = [transmission_variable_name(l, country, r) for country in imports]
+                export_variables = [transmission_variable_name(l, r, country) for country in exports]
                 specified_demand = demand_df[(demand_df['COUNTRY'] == r) & (demand_df['TIMESLICE'] == l)]['DEMAND_PER_TIMESLICE'].values[0]
 
                 if not self.find_predicate(f"minimumRespectingDemand_{r}"):
+                    supply = build_recursive([var.replace(f'{l}_', '', 1) for var in per_timeslice_country_variables + import_variables])
+                    for variable in export_variables:
+                        supply = sub(supply, variable.replace(f'{l}_', '', 1))
                     self.add_predicate(
                         name=f"minimumRespectingDemand_{r}", 
-                        parameters="int specified_demand int " + " int ".join([var.replace(f'{l}_', '') for var in per_timeslice_country_variables]),
-                        functional=boolean_ge(build_recursive([var.replace(f'{l}_', '') for var in per_timeslice_country_variables]), "specified_demand")
+                        parameters="int specified_demand int " + " int ".join([var.replace(f'{l}_', '', 1) for var in per_timeslice_country_variables + import_variables + export_variables]),
+                        functional=boolean_ge(supply, "specified_demand")
                     )
+
+                per_timeslice_country_variables += import_variables + export_variables
                 
                 self.add_constraint(
                     name=f"minimumRespectingDemand_{r}_{l}", 
@@ -553,15 +612,69 @@ class XMLGeneratorClass:
             if len(timeslices) * len(modes) > self.max_arity:
                 self.max_arity = len(timeslices) * len(modes)
 
-    # def add_emission_accounting_constraint(self, emission_name, variables, modes, max_emission_limit, emission_factors_df, year_split_df):
-    #     def build_recursive(timeslices, modes, technologies, emission_factor_df):
-    #         if len(timeslices) == 1:
+    def add_emission_accounting_constraint(self, agent_name, emission_name, timeslice_technologies_modes, emission_factors_df, year_split_df, domain_name):
+        """Adds an hard constraint per timeslice that accounts the emission of an agent through auxiliary variables.
 
-    #         expression = ""
-    #         factor = emission_factor_df[(emission_factor_df['TECHNOLOGY'] == technology) & (emission_factor_df['MODE_OF_OPERATION'] == mode) & (emission_factor_df['TIMESLICE'])]['EMISSION_FACTOR'].values[0]
-        
+        The <timeslice>_emission_<emission> variable holds the emission up to the end of its timeslice (in the year
+        split order), in t: it is at least the previous one plus the emission of the timeslice technologies, so the
+        arity only exceeds the number of technologies by two. The annual limit is the largest value of domain_name.
+        Returns the auxiliary variables, none if no technology of the agent emits.
+        """
+        def build_recursive(variables, factors):
+            if len(variables) == 1:
+                return mul(variables[0], factors[0])
+            return add(mul(variables[0], factors[0]), build_recursive(variables[1:], factors[1:]))
+
+        # Activities are in TJ/year and emission activity ratios in Mt/PJ, the emissions are accounted in t
+        emission_factors = {
+            f"{row['TECHNOLOGY']}_{row['MODE_OF_OPERATION']}": round(row['EMISSION_ACTIVITY_RATIO'] * 1000)
+            for index, row in emission_factors_df[emission_factors_df['EMISSION'] == emission_name].iterrows()
+            if round(row['EMISSION_ACTIVITY_RATIO'] * 1000) != 0
+        }
+        emitting_variables = [var for var in timeslice_technologies_modes if var.split('_', 1)[1] in emission_factors]
+        if not emitting_variables:
+            return []
 
+        variables_element = self.instance.find("variables")
+        if variables_element is None:
+            variables_element = ET.SubElement(self.instance, "variables")
 
+        emission_variables = []
+        previous_emission = "0"
+        for l in year_split_df['TIMESLICE'].unique():
+            per_timeslice_variables = [var for var in emitting_variables if var.split('_')[0] == l]
+            if not per_timeslice_variables:
+                continue
+            yearsplit_constant = round(1/year_split_df[(year_split_df['TIMESLICE'] == l)]['YEAR_SPLIT'].values[0])
+            emission_variable = f"{l}_emission_{emission_name}"
+            ET.SubElement(variables_element, "variable", {"name": emission_variable, "domain": domain_name, "agent": agent_name})
+            emission_variables.append(emission_variable)
+
+            # The factors are parameters, so that every agent and timeslice with as many technologies shares the predicate
+            rate_variables = [f"rateActivity_{i}" for i in range(len(per_timeslice_variables))]
+            factor_parameters = [f"factor_{i}" for i in range(len(per_timeslice_variables))]
+            predicate_name = f"emissionAccounting_{len(per_timeslice_variables)}"
+            if not self.find_predicate(predicate_name):
+                self.add_predicate(
+                    name=predicate_name,
+                    parameters=" ".join([f"int {parameter}" for parameter in ["previous_emission", "emission", "year_split"] + rate_variables + factor_parameters]),
+                    functional=boolean_ge("emission", add("previous_emission", div(build_recursive(rate_variables, factor_parameters), "year_split")))
+                )
+
+            scope = ([] if previous_emission == "0" else [previous_emission]) + [emission_variable] + [f"{var}_rateActivity" for var in per_timeslice_variables]
+            self.add_constraint(
+                name=f"emissionAccounting_{emission_name}_{l}",
+                arity=len(scope),
+                scope=" ".join(scope),
+                reference=predicate_name,
+                parameters=f"{previous_emission} {emission_variable} {yearsplit_constant} {' '.join([f'{var}_rateActivity' for var in per_timeslice_variables])} {' '.join([str(emission_factors[var.split('_', 1)[1]]) for var in per_timeslice_variables])}"
+            )
+
+            if len(scope) > self.max_arity:
+                self.max_arity = len(scope)
+            previous_emission = emission_variable
+
+        return emission_variables
 
     def add_min_transmission_capacity_constraint(self, transmission_variable_name, min_transmission_capacity):
         """Adds an hard constraint to the XML instance that enforces minimum transmission capacity."""
@@ -910,16 +1023,79 @@ class XMLGeneratorClass:
             self.max_arity = len(rateActivity_variables)
         
     
-    def print_xml(self, output_file = "defaultName_problem.xml"):
-        """Prints the XML instance to a file."""
-        self.set_max_arity_contraints()
+    def print_xml(self, output_file = "defaultName_problem.xml", compact=False):
+        """Prints the XML instance to a file.
 
-        tree = ET.ElementTree(self.instance)
-        ET.indent(tree, space="  ", level=0)
+        In compact mode the names are replaced by short ids and the indentation is left out, the full
+        names being written to the symbol table next to the instance, see symbol_table_path. The
+        instance kept in memory keeps its full names.
+        """
+        self.set_max_arity_contraints()
+        self.deduplicate_definitions()
+        self.canonicalize()
+
+        if compact:
+            instance, symbol_table = compact_instance(self.instance)
+            with open(symbol_table_path(output_file), "w") as file:
+                json.dump(symbol_table, file)
+            tree = ET.ElementTree(instance)
+        else:
+            if os.path.exists(symbol_table_path(output_file)):
+                os.remove(symbol_table_path(output_file))
+            tree = ET.ElementTree(self.instance)
+            ET.indent(tree, space="  ", level=0)
         tree.write(output_file, encoding="utf-8", xml_declaration=True)
 
         self.logger.info(f"XML generated and saved to {output_file}")
 
+    def merge_fragment(self, fragment):
+        """Merges the sections of an instance built for other agents, recomputing the max arity.
+
+        Predicates and functions with the same name are kept once and must have the same definition.
+        """
+        for section in fragment:
+            if section.tag == "presentation":
+                continue
+            merged_section = self.instance.find(section.tag)
+            if merged_section is None:
+                merged_section = ET.SubElement(self.instance, section.tag)
+            if section.tag in ("predicates", "functions", "domains"):
+                existing = {element.attrib["name"]: element for element in merged_section}
+                for element in section:
+                    if element.attrib["name"] not in existing:
+                        merged_section.append(element)
+                    elif ET.tostring(existing[element.attrib["name"]]) != ET.tostring(element):
+                        raise ValueError(f"Fragments define {section.tag[:-1]} {element.attrib['name']} differently")
+            else:
+                merged_section.extend(section)
+
+        constraints = self.instance.find("constraints")
+        if constraints is not None:
+            self.max_arity = max([self.max_arity] + [int(constraint.attrib["arity"]) for constraint in constraints])
+
+    def deduplicate_definitions(self):
+        """Keeps a single predicate or function per structural shape and makes the constraints reference it,
+        see merge_definitions. Returns the mapping from removed to kept definition names."""
+        aliases = merge_definitions(self.instance)
+        if aliases:
+            self.logger.info(f"{len(aliases)} predicates and functions merged into a structurally identical definition")
+        return aliases
+
+    def canonicalize(self):
+        """Orders the sections and their elements by name, so that the same model always gives the same bytes."""
+        sections = {child.tag: child for child in self.instance}
+        for child in list(self.instance):
+            self.instance.remove(child)
+        for tag in SECTION_ORDER:
+            if tag in sections:
+                self.instance.append(sections.pop(tag))
+        for section in sections.values():
+            self.instance.append(section)
+
+        for section in self.instance:
+            if section.tag != "presentation":
+                section[:] = sorted(section, key=lambda element: element.attrib.get("name", ""))
+
     def set_max_arity_contraints(self):
         """Changes the max arity of constraints in the XML instance."""
         presentation = self.instance.find("presentation")
@@ -928,6 +1104,117 @@ class XMLGeneratorClass:
         else:
             raise ValueError("Presentation element not found in XML instance")
 
+def compact_instance(instance):
+    """Returns a copy of an instance whose variables, predicates, functions and constraints are named by
+    short ids, and the symbol table {section: {id: name}} to decode them."""
+    instance = copy.deepcopy(instance)
+    symbol_table = {}
+    short_names = {}
+    for tag, prefix in COMPACT_PREFIXES.items():
+        symbol_table[tag] = {}
+        section = instance.find(tag)
+        if section is None:
+            continue
+        for index, element in enumerate(section):
+            short_name = f"{prefix}{index}"
+            symbol_table[tag][short_name] = element.attrib["name"]
+            if tag != "constraints":
+                short_names[element.attrib["name"]] = short_name
+            element.attrib["name"] = short_name
+
+    constraints = instance.find("constraints")
+    if constraints is not None:
+        for constraint in constraints:
+            constraint.attrib["scope"] = " ".join(short_names[name] for name in constraint.attrib["scope"].split())
+            constraint.attrib["reference"] = short_names[constraint.attrib["reference"]]
+            parameters = constraint.find("parameters")
+            parameters.text = " ".join(short_names.get(token, token) for token in parameters.text.split())
+    return instance, symbol_table
+
+def merge_definitions(instance):
+    """Keeps a single predicate or function per structural shape in an instance and makes the constraints reference it.
+
+    Two definitions have the same shape when they only differ by their name and the names of their
+    formal parameters, e.g. minimumRespectingDemand_MZ and minimumRespectingDemand_ZA with the same
+    number of technologies. The definition with the smallest name is kept, its formal parameters whose
+    names differ between the merged definitions being renamed after their position. The positions of the
+    constraint parameters are left unchanged. Returns the mapping from removed to kept definition names.
+    """
+    aliases = {}
+    for tag in ("predicates", "functions"):
+        section = instance.find(tag)
+        if section is None:
+            continue
+        shapes = {}
+        for definition in section:
+            shapes.setdefault(definition_shape(definition), []).append(definition)
+        for group in shapes.values():
+            if len(group) == 1:
+                continue
+            group.sort(key=lambda definition: definition.attrib["name"])
+            kept = group[0]
+            names = [formal_parameters(definition)[1] for definition in group]
+            renames = {
+                name: f"p{position}"
+                for position, name in enumerate(names[0])
+                if any(other[position] != name for other in names[1:])
+            }
+            rename_parameters(kept, renames)
+            for definition in group[1:]:
+                aliases[definition.attrib["name"]] = kept.attrib["name"]
+                section.remove(definition)
+
+    constraints = instance.find("constraints")
+    if aliases and constraints is not None:
+        for constraint in constraints:
+            constraint.attrib["reference"] = aliases.get(constraint.attrib["reference"], constraint.attrib["reference"])
+    return aliases
+
+def formal_parameters(definition):
+    """Returns the types and the names of the formal parameters of a predicate or function."""
+    tokens = definition.find("parameters").text.split()
+    return tokens[0::2], tokens[1::2]
+
+def definition_shape(definition):
+    """Returns what a predicate or function computes, independently of its name and the names of its parameters."""
+    types, names = formal_parameters(definition)
+    positions = {name: f"p{position}" for position, name in enumerate(names)}
+    functional = IDENTIFIER_PATTERN.sub(lambda match: positions.get(match.group(0), match.group(0)), definition.find("expression/functional").text)
+    attributes = tuple(sorted((key, value) for key, value in definition.attrib.items() if key != "name"))
+    return definition.tag, attributes, tuple(types), functional
+
+def rename_parameters(definition, renames):
+    """Renames formal parameters in the parameter list and the expression of a predicate or function."""
+    if not renames:
+        return
+    rename = lambda match: renames.get(match.group(0), match.group(0))
+    parameters = definition.find("parameters")
+    parameters.text = IDENTIFIER_PATTERN.sub(rename, parameters.text)
+    functional = definition.find("expression/functional")
+    functional.text = IDENTIFIER_PATTERN.sub(rename, functional.text)
+
+def bounded_domain_values(domain_values, min_value=None, max_value=None):
+    """Returns the values of a domain that lie within the (optional) min and max bounds."""
+    if isinstance(domain_values, range) and domain_values.step > 0:
+        # Slice the range instead of scanning it, refined domains can hold many values
+        start = 0 if min_value is None else max(0, int(-((domain_values.start - min_value) // domain_values.step)))
+        stop = len(domain_values) if max_value is None else max(0, int((max_value - domain_values.start) // domain_values.step) + 1)
+        return list(domain_values[start:stop])
+    return [
+        value for value in domain_values
+        if (min_value is None or value >= min_value) and (max_value is None or value <= max_value)
+    ]
+
+def bounded_domain_name(domain_name, values):
+    """Returns a name shared by every bounded domain with the same effective values."""
+    if len(values) == 0:
+        return f"{domain_name}_empty"
+    return f"{domain_name}_{values[0]}_{values[-1]}"
+
+def transmission_variable_name(timeslice, from_country, to_country):
+    """Returns the name of the variable of the flow from a country to another over their interconnector."""
+    return f"{timeslice}_transmission_{from_country}_{to_country}"
+
 def boolean_not(a):
     return f"not({a})"
 